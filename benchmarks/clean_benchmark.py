@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节广告清理基准测试
+在确定性生成的章节语料上比较广告清理引擎（AdCleaner）与原逐条re.sub实现的耗时，并校验两者输出完全一致
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from novel_crawler import AdCleaner
+
+
+# 插入正文的广告样本（覆盖各类规则，包括大小写变化和删除后会拼出新匹配的情况）
+AD_SAMPLES = [
+    '请收藏本站：https://www.biquge.com。笔趣阁手机版：m.biquge.com',
+    '收藏网址：WWW.BQGAM.COM',
+    '本章来自笔趣阁，更新最快的小说站',
+    '(来源:笔趣阁)',
+    '『点此报错』『加入书签』',
+    '[点此报错]请大家收藏',
+    '威信公众号，平台搜索方法见下',
+    '腾讯威博扫描二维码',
+    '(未完待续，请关注威信)',
+    '忘语的威信号是wang--yu----1234',
+    '等了三天，正文开始上传',
+    '实体签名书、神秘大奖等你来拿',
+    '(注)  (',
+    '未完待续……',
+    '最新章节请到本站阅读',
+    '字数统计：3012',
+    '&nbsp;&nbsp;\\u3000',
+    'HTTP://M.BIQUGE.CC/book/1.html',
+    'WWW.BİQUGE.COM，httpſ://m.bıquge.net',
+    '\n\n\n\n',
+]
+
+
+with open(os.path.join(ROOT_DIR, 'ad_rules.json'), 'r', encoding='utf-8') as f:
+    LEGACY_PATTERNS = [rule['pattern'] for rule in json.load(f)['rules']]
+
+
+def legacy_clean_chapter_content(content):
+    """原 _clean_chapter_content 实现（逐条执行未编译的规则），作为对照基准
+
+    Args:
+        content (str): 原始章节内容
+
+    Returns:
+        str: 清理后的章节内容
+    """
+    if not content:
+        return content
+
+    cleaned_content = content
+    for pattern in LEGACY_PATTERNS:
+        cleaned_content = re.sub(pattern, '', cleaned_content, flags=re.IGNORECASE)
+
+    cleaned_content = re.sub(r'[ \t]+', ' ', cleaned_content)
+    cleaned_content = re.sub(r'\n[ \t]+', '\n', cleaned_content)
+    cleaned_content = re.sub(r'[ \t]+\n', '\n', cleaned_content)
+    cleaned_content = re.sub(r'\n{3,}', '\n\n', cleaned_content)
+    return cleaned_content.strip()
+
+
+def build_corpus(count, seed=20240101):
+    """生成确定性的章节语料
+
+    Args:
+        count (int): 章节数
+        seed (int): 随机种子
+
+    Returns:
+        list: 章节正文列表
+    """
+    rng = random.Random(seed)
+    words = '韩立 盘膝 而坐 默默 运转 功法 体内 法力 缓缓 流转 周身 灵气 聚集 墨大夫 七玄门 神手谷 ， 。 “ ” ！ ？'.split()
+    corpus = []
+    for _ in range(count):
+        paragraphs = []
+        for _ in range(rng.randint(30, 60)):
+            paragraph = '　　' + ''.join(rng.choice(words) for _ in range(rng.randint(10, 40)))
+            if rng.random() < 0.08:
+                paragraph += rng.choice(AD_SAMPLES)
+            paragraphs.append(paragraph)
+        separator = rng.choice(['\n', '\n\n', '\n \n'])
+        corpus.append(separator.join(paragraphs))
+    return corpus
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='章节广告清理基准测试')
+    parser.add_argument('--chapters', type=int, default=300, help='语料章节数')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.chapters)
+    cleaner = AdCleaner()
+
+    start = time.perf_counter()
+    legacy_outputs = [legacy_clean_chapter_content(text) for text in corpus]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine_outputs = [cleaner.clean(text) for text in corpus]
+    engine_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy_outputs, engine_outputs) if a != b)
+    total_chars = sum(len(text) for text in corpus)
+    print(f"语料: {len(corpus)} 章，{total_chars:,} 字符")
+    print(f"输出一致: {'是' if mismatches == 0 else f'否（{mismatches} 章不同）'}")
+    print(f"原实现   : {legacy_time / len(corpus) * 1000:.3f} ms/章")
+    print(f"AdCleaner: {engine_time / len(corpus) * 1000:.3f} ms/章")
+    print(f"提速: {legacy_time / engine_time:.1f}x")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节内容解析基准测试
+比较BeautifulSoup、lxml完整解析、lxml流式部分解析在单个章节页面上的解析耗时，并确认提取结果一致
+"""
+
+import os
+import sys
+import timeit
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from novel_crawler import NovelCrawler, SiteProfiles
+
+
+def build_sample_page(paragraphs=80, recommendations=300):
+    """构造一个典型的笔趣阁章节页面（正文之后带有大量推荐链接和脚本）
+
+    Args:
+        paragraphs (int): 正文段落数
+        recommendations (int): 正文之后的推荐链接数
+
+    Returns:
+        str: HTML文本
+    """
+    nav = ''.join(f'<li><a href="/sort/{i}/">分类{i}</a></li>' for i in range(30))
+    recommend = ''.join(f'<li><a href="/book/{i}/">推荐小说{i}</a><span class="s2">作者{i}</span></li>'
+                        for i in range(recommendations))
+    body = '<br/><br/>'.join(f'　　第{i}段，韩立盘膝而坐，默默运转功法，体内法力缓缓流转，周身灵气聚集。' for i in range(paragraphs))
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>第一章 山边小村_凡人修仙传_笔趣阁</title>
+<script>var bookid = 123; function loadAd() {{ return 1; }}</script>
+<style>.content {{ font-size: 18px; }}</style></head>
+<body>
+<div class="header"><ul class="nav">{nav}</ul></div>
+<div class="book reader">
+  <div class="path wap_none"><a href="/">首页</a> &gt; <a href="/book/123/">凡人修仙传</a></div>
+  <h1 class="wap_none">第一章 山边小村</h1>
+  <div id="chaptercontent" class="Readarea ReadAjax_content">{body}</div>
+  <div class="Readpage pagedown"><a href="/book/123/1.html">上一章</a><a href="/book/123/3.html">下一章</a></div>
+</div>
+<div class="listmain"><ul>{recommend}</ul></div>
+<div class="footer">本站所有小说为转载作品</div>
+<script>{'var stat = [' + ','.join(str(i) for i in range(2000)) + '];'}</script>
+</body></html>"""
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='章节内容解析基准测试')
+    parser.add_argument('--number', type=int, default=200, help='每轮解析次数')
+    parser.add_argument('--repeat', type=int, default=5, help='重复轮数（取最快一轮）')
+    parser.add_argument('--html', help='使用指定的HTML文件代替内置样例页面')
+    args = parser.parse_args()
+
+    if args.html:
+        with open(args.html, 'r', encoding='utf-8') as f:
+            html_text = f.read()
+    else:
+        html_text = build_sample_page()
+
+    crawler = NovelCrawler(domains_file=os.path.join(ROOT_DIR, 'all_domains.json'), use_selenium=False)
+    # 使用不落盘的站点配置，先完整解析一次让 benchmark 域名记录选择器
+    crawler.site_profiles = SiteProfiles()
+    crawler._extract_content_lxml(html_text, 'benchmark')
+    engines = {
+        'bs4': crawler._extract_content_bs4,
+        'lxml': crawler._extract_content_lxml,
+        'partial': lambda text: crawler._extract_content_lxml(text, 'benchmark')
+    }
+
+    results = {name: extract(html_text) for name, extract in engines.items()}
+    print(f"页面大小: {len(html_text):,} 字符")
+    consistent = results['lxml'] == results['bs4'] == results['partial']
+    print(f"提取结果一致: {'是' if consistent else '否'}")
+
+    timings = {}
+    for name, extract in engines.items():
+        best = min(timeit.repeat(lambda: extract(html_text), number=args.number, repeat=args.repeat))
+        timings[name] = best / args.number * 1000
+        print(f"{name:7s}: {timings[name]:.3f} ms/页")
+
+    print(f"lxml 相对 bs4 提速: {timings['bs4'] / timings['lxml']:.1f}x，"
+          f"流式部分解析相对 bs4 提速: {timings['bs4'] / timings['partial']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
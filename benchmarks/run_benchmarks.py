@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线基准测试
+使用 benchmarks/fixtures 中保存的各站点布局页面（章节页、目录页、搜索页），不访问网络：
+先将章节内容提取、章节列表、搜索和广告清理的结果与 golden.json 比对，再报告各阶段的
+吞吐量（页/秒）、p50/p99 耗时和峰值内存
+"""
+
+import os
+import io
+import sys
+import json
+import math
+import time
+import argparse
+import tracemalloc
+import contextlib
+from urllib.parse import urlparse, unquote
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+sys.path.insert(0, ROOT_DIR)
+
+from novel_crawler import NovelCrawler, SiteProfiles, CharsetDecoder
+
+
+class FixtureServer:
+    """按 manifest.json 把请求URL映射到保存的页面文件，代替真实的HTTP请求"""
+
+    def __init__(self, layouts):
+        """初始化
+
+        Args:
+            layouts (list): load_layouts 返回的布局列表
+        """
+        self.routes = {}
+        for layout in layouts:
+            netloc = urlparse(layout['domain']).netloc
+            for path, filename in layout['pages'].items():
+                self.routes[(netloc, path)] = os.path.join(layout['dir'], filename) if filename else None
+
+    def get(self, domain, url, **kwargs):
+        """返回保存的页面（签名与 NovelCrawler._http_get 一致）
+
+        Args:
+            domain (str): 域名
+            url (str): 请求URL
+            **kwargs: 忽略的请求参数
+
+        Returns:
+            requests.Response: 页面存在时为200响应，manifest中值为null的URL返回空的200响应，其他URL返回404
+        """
+        parsed = urlparse(url)
+        path = unquote(parsed.path + (f'?{parsed.query}' if parsed.query else ''))
+        response = requests.Response()
+        response.url = url
+        key = (parsed.netloc, path)
+        if key not in self.routes:
+            response.status_code = 404
+            response._content = b''
+            return response
+        response.status_code = 200
+        filename = self.routes[key]
+        if filename is None:
+            response._content = b''
+        else:
+            with open(filename, 'rb') as f:
+                response._content = f.read()
+        # 与多数镜像站一致，不在响应头中声明字符集
+        response.headers['Content-Type'] = 'application/json' if filename and filename.endswith('.json') else 'text/html'
+        return response
+
+
+def load_layouts(fixtures_dir=FIXTURES_DIR, names=None):
+    """加载各站点布局的 manifest.json
+
+    Args:
+        fixtures_dir (str): 页面目录
+        names (list, optional): 只加载这些布局
+
+    Returns:
+        list: [{'name': 布局名, 'dir': 目录, 'domain', 'keyword', 'book_url', 'chapter_url', 'pages'}]
+    """
+    layouts = []
+    for name in sorted(os.listdir(fixtures_dir)):
+        manifest_path = os.path.join(fixtures_dir, name, 'manifest.json')
+        if (names and name not in names) or not os.path.exists(manifest_path):
+            continue
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            layout = json.load(f)
+        layout.update(name=name, dir=os.path.join(fixtures_dir, name))
+        layouts.append(layout)
+    return layouts
+
+
+def create_crawler(server):
+    """创建只使用保存页面、不写状态文件的爬虫实例
+
+    Args:
+        server (FixtureServer): 页面服务
+
+    Returns:
+        NovelCrawler: 爬虫实例
+    """
+    crawler = NovelCrawler(domains_file=os.path.join(ROOT_DIR, 'all_domains.json'), use_selenium=False)
+    crawler.site_profiles = SiteProfiles()
+    crawler.charsets = CharsetDecoder(crawler.site_profiles)
+    crawler._http_get = server.get
+    return crawler
+
+
+def chapter_html(crawler, server, layout):
+    """获取布局章节页的解码文本
+
+    Args:
+        crawler (NovelCrawler): 爬虫实例
+        server (FixtureServer): 页面服务
+        layout (dict): 布局
+
+    Returns:
+        str: 章节页HTML文本
+    """
+    response = server.get(layout['domain'], layout['domain'].rstrip('/') + layout['chapter_url'])
+    return crawler.charsets.decode(layout['domain'], response)[0]
+
+
+def collect_outputs(crawler, server, layout):
+    """计算布局的各项提取结果
+
+    Args:
+        crawler (NovelCrawler): 爬虫实例
+        server (FixtureServer): 页面服务
+        layout (dict): 布局
+
+    Returns:
+        dict: 与 golden.json 结构相同的结果
+    """
+    domain = layout['domain']
+    html_text = chapter_html(crawler, server, layout)
+    with contextlib.redirect_stdout(io.StringIO()):
+        title, content = crawler._extract_content_lxml(html_text, domain)
+        chapters = crawler.get_chapter_list(domain, layout['book_url'])
+        _, search_results = crawler.search_novel_single_domain(domain, layout['keyword'])
+    return {
+        'charset': crawler.site_profiles.get(domain).get('charset'),
+        'chapter': {
+            'title': title,
+            'content': content,
+            'cleaned': crawler._clean_chapter_content(content) if content else None
+        },
+        'chapter_list': [[chapter['id'], chapter['title'], chapter['url']] for chapter in chapters],
+        'search': {
+            'api_template': crawler.site_profiles.get(domain).get('search_api'),
+            'results': [result.get('articlename') for result in search_results]
+        }
+    }
+
+
+def check_outputs(crawler, server, layout, outputs):
+    """将提取结果与 golden.json 比对，三种解析方式都要与 golden 一致
+
+    Args:
+        crawler (NovelCrawler): 爬虫实例
+        server (FixtureServer): 页面服务
+        layout (dict): 布局
+        outputs (dict): collect_outputs 的结果
+
+    Returns:
+        list: 不一致项的描述
+    """
+    golden_path = os.path.join(layout['dir'], 'golden.json')
+    if not os.path.exists(golden_path):
+        return ['缺少 golden.json（使用 --update-golden 生成）']
+    with open(golden_path, 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+
+    errors = [f'{key} 与 golden 不一致' for key in golden if outputs.get(key) != golden[key]]
+    html_text = chapter_html(crawler, server, layout)
+    expected = (golden['chapter']['title'], golden['chapter']['content'])
+    engines = {
+        'bs4': crawler._extract_content_bs4(html_text),
+        'lxml': crawler._extract_content_lxml(html_text),
+        'partial': crawler._extract_content_lxml(html_text, layout['domain'])
+    }
+    errors += [f'{name} 提取结果与 golden 不一致' for name, result in engines.items() if result != expected]
+    return errors
+
+
+def percentile(values, p):
+    """计算百分位数（最近秩法）
+
+    Args:
+        values (list): 已排序的数值
+        p (float): 百分位（0-100）
+
+    Returns:
+        float: 百分位数
+    """
+    return values[max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))]
+
+
+def measure(func, iterations):
+    """测量函数的逐次耗时和峰值内存
+
+    峰值内存由tracemalloc统计，只包括Python对象分配的内存，不包括lxml（libxml2）在C层分配的内存。
+
+    Args:
+        func (callable): 被测函数
+        iterations (int): 次数
+
+    Returns:
+        dict: {'rate': 次/秒, 'p50': 毫秒, 'p99': 毫秒, 'peak': 峰值内存（KiB）}
+    """
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()  # 预热
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - start)
+        # tracemalloc会拖慢执行，单独运行一次测量峰值内存
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    latencies.sort()
+    return {
+        'rate': len(latencies) / sum(latencies),
+        'p50': percentile(latencies, 50) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'peak': peak / 1024
+    }
+
+
+def benchmark_layout(crawler, server, layout, iterations):
+    """测量布局上各阶段的性能
+
+    Args:
+        crawler (NovelCrawler): 爬虫实例
+        server (FixtureServer): 页面服务
+        layout (dict): 布局
+        iterations (int): 每个阶段的次数
+
+    Returns:
+        dict: {阶段名: measure 的结果}
+    """
+    domain = layout['domain']
+    html_text = chapter_html(crawler, server, layout)
+    content = crawler._extract_content_lxml(html_text, domain)[1]
+    stages = {
+        'extract_bs4': lambda: crawler._extract_content_bs4(html_text),
+        'extract_lxml': lambda: crawler._extract_content_lxml(html_text),
+        'extract_partial': lambda: crawler._extract_content_lxml(html_text, domain),
+        'clean': lambda: crawler._clean_chapter_content(content),
+        'chapter_list': lambda: crawler.get_chapter_list(domain, layout['book_url']),
+        'search': lambda: crawler.search_novel_single_domain(domain, layout['keyword'])
+    }
+    return {name: measure(func, iterations) for name, func in stages.items()}
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='离线基准测试（保存的页面 + golden 结果校验）')
+    parser.add_argument('--iterations', type=int, default=30, help='每个阶段的测量次数')
+    parser.add_argument('--layout', action='append', help='只测试指定布局（可重复）')
+    parser.add_argument('--check-only', action='store_true', help='只校验 golden 结果，不测量性能')
+    parser.add_argument('--update-golden', action='store_true', help='用当前实现的结果重新生成 golden.json')
+    args = parser.parse_args()
+
+    layouts = load_layouts(names=args.layout)
+    if not layouts:
+        print(f"没有找到页面布局: {FIXTURES_DIR}")
+        return 1
+    server = FixtureServer(layouts)
+
+    failed = False
+    print("结果校验:")
+    for layout in layouts:
+        crawler = create_crawler(server)
+        outputs = collect_outputs(crawler, server, layout)
+        if args.update_golden:
+            with open(os.path.join(layout['dir'], 'golden.json'), 'w', encoding='utf-8') as f:
+                json.dump(outputs, f, ensure_ascii=False, indent=2)
+            print(f"  {layout['name']:8s}: 已更新 golden.json（{len(outputs['chapter_list'])} 章）")
+            continue
+        errors = check_outputs(crawler, server, layout, outputs)
+        failed = failed or bool(errors)
+        print(f"  {layout['name']:8s}: {'通过' if not errors else '失败 - ' + '；'.join(errors)}")
+
+    if args.check_only or args.update_golden:
+        return 1 if failed else 0
+
+    print(f"\n性能（每阶段 {args.iterations} 次）:")
+    print(f"  {'布局':8s} {'阶段':16s} {'页/秒':>10s} {'p50(ms)':>9s} {'p99(ms)':>9s} {'峰值内存(KiB)':>14s}")
+    for layout in layouts:
+        crawler = create_crawler(server)
+        collect_outputs(crawler, server, layout)  # 先记录站点配置，与实际爬取的稳定状态一致
+        for stage, result in benchmark_layout(crawler, server, layout, args.iterations).items():
+            print(f"  {layout['name']:8s} {stage:16s} {result['rate']:10.1f} {result['p50']:9.3f} "
+                  f"{result['p99']:9.3f} {result['peak']:14.1f}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,7 +7,7 @@
 
 import os
 import sys
-from novel_crawler import NovelCrawler
+from novel_crawler import NovelCrawler, find_data_file, open_data_file
 
 class InteractiveMergeMenu:
     """交互式合并菜单类"""
@@ -184,9 +184,9 @@ class InteractiveMergeMenu:
                 result_dir = os.path.join(self.crawler.output_dir, self.novel_title, 'merged_best')
                 if os.path.exists(result_dir):
                     print(f"\n📁 合并结果保存在: {result_dir}")
-                    txt_file = os.path.join(result_dir, f"{self.novel_title}_merged.txt")
+                    txt_file = find_data_file(os.path.join(result_dir, f"{self.novel_title}_merged.txt"))
                     info_file = os.path.join(result_dir, f"{self.novel_title}_merged_info.json")
-                    if os.path.exists(txt_file):
+                    if txt_file:
                         print(f"📄 文本文件: {txt_file}")
                     if os.path.exists(info_file):
                         print(f"📊 信息文件: {info_file}")
@@ -413,9 +413,9 @@ class InteractiveMergeMenu:
             result_dir = os.path.join(self.crawler.output_dir, self.novel_title, 'merged_best')
             if os.path.exists(result_dir):
                 print(f"\n📁 合并结果保存在: {result_dir}")
-                txt_file = os.path.join(result_dir, f"{self.novel_title}_merged.txt")
+                txt_file = find_data_file(os.path.join(result_dir, f"{self.novel_title}_merged.txt"))
                 info_file = os.path.join(result_dir, f"{self.novel_title}_merged_info.json")
-                if os.path.exists(txt_file):
+                if txt_file:
                     print(f"📄 文本文件: {txt_file}")
                 if os.path.exists(info_file):
                     print(f"📊 信息文件: {info_file}")
@@ -456,7 +456,7 @@ class InteractiveMergeMenu:
             
             # 统计域名数量
             domains = [d for d in os.listdir(novel_path) 
-                      if os.path.isdir(os.path.join(novel_path, d)) and d != 'merged_best']
+                      if os.path.isdir(os.path.join(novel_path, d)) and d not in ('merged_best', 'blobs')]
             
             # 检查是否有合并结果
             merged_path = os.path.join(novel_path, 'merged_best')
@@ -468,8 +468,8 @@ class InteractiveMergeMenu:
             
             if has_merged:
                 # 显示合并文件信息
-                txt_file = os.path.join(merged_path, f"{novel}_merged.txt")
-                if os.path.exists(txt_file):
+                txt_file = find_data_file(os.path.join(merged_path, f"{novel}_merged.txt"))
+                if txt_file:
                     file_size = os.path.getsize(txt_file)
                     print(f"   📄 文件大小: {file_size:,} 字节")
             print()
@@ -513,24 +513,31 @@ class InteractiveMergeMenu:
         
         # 显示域名信息
         domains = [d for d in os.listdir(novel_path) 
-                  if os.path.isdir(os.path.join(novel_path, d)) and d != 'merged_best']
+                  if os.path.isdir(os.path.join(novel_path, d)) and d not in ('merged_best', 'blobs')]
         
         print(f"📊 爬取域名 ({len(domains)} 个):")
         for domain in domains:
-            domain_path = os.path.join(novel_path, domain)
-            if os.path.exists(domain_path):
-                files = [f for f in os.listdir(domain_path) if f.endswith('.txt')]
-                print(f"  • {domain}: {len(files)} 个章节")
+            # 逐行读取章节文本统计章节数（压缩文件透明解压）
+            txt_file = find_data_file(os.path.join(novel_path, domain, f"{novel_title}.txt"))
+            if not txt_file:
+                print(f"  • {domain}: 无章节文本")
+                continue
+            try:
+                with open_data_file(txt_file) as f:
+                    chapter_count = sum(1 for line in f if line.rstrip('\n') == '=' * 50)
+                print(f"  • {domain}: {chapter_count} 个章节（{os.path.basename(txt_file)}，{os.path.getsize(txt_file):,} 字节）")
+            except Exception:
+                print(f"  • {domain}: ⚠️  无法读取 {os.path.basename(txt_file)}")
         
         # 显示合并信息
         merged_path = os.path.join(novel_path, 'merged_best')
         if os.path.exists(merged_path):
             print("\n🔄 合并信息:")
             
-            txt_file = os.path.join(merged_path, f"{novel_title}_merged.txt")
+            txt_file = find_data_file(os.path.join(merged_path, f"{novel_title}_merged.txt"))
             info_file = os.path.join(merged_path, f"{novel_title}_merged_info.json")
             
-            if os.path.exists(txt_file):
+            if txt_file:
                 file_size = os.path.getsize(txt_file)
                 print(f"  📄 合并文本: {file_size:,} 字节")
                 
@@ -653,6 +660,7 @@ class InteractiveMergeMenu:
             if self.crawler.driver:
                 self.crawler.driver.quit()
                 self.crawler.driver = None
+            self.crawler.driver_pool.shutdown()
             print("\n✅ Selenium已禁用")
         else:
             print("\n✅ Selenium模式保持不变")
@@ -716,9 +724,12 @@ class InteractiveMergeMenu:
         choice = input("\n请选择清理类型 (1-4): ").strip()
         
         if choice == '1' or choice == '4':
-            if self.crawler.driver:
+            pool_stats = self.crawler.driver_pool.get_stats()
+            if self.crawler.driver or pool_stats['idle']:
                 try:
-                    self.crawler.driver.delete_all_cookies()
+                    if self.crawler.driver:
+                        self.crawler.driver.delete_all_cookies()
+                    self.crawler.driver_pool.delete_all_cookies()
                     print("✅ 浏览器缓存已清理")
                 except Exception as e:
                     print(f"⚠️  清理浏览器缓存失败: {e}")
@@ -728,6 +739,7 @@ class InteractiveMergeMenu:
         if choice == '2' or choice == '4':
             try:
                 self.crawler.session.cookies.clear()
+                self.crawler.sessions.clear_cookies()
                 print("✅ 会话数据已清理")
             except Exception as e:
                 print(f"⚠️  清理会话数据失败: {e}")
@@ -7,15 +7,35 @@
 """
 
 import json
+import asyncio
 import requests
 import re
 import time
 import os
 import hashlib
-from urllib.parse import urljoin, quote, urlparse
+import codecs
+import sqlite3
+import gzip
+import io
+import shutil
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python 3.10 及更早版本
+    import sre_parse
+    import sre_constants
+from urllib.parse import urljoin, quote, urlparse, urlunparse
 from bs4 import BeautifulSoup
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # 未安装lxml时只使用BeautifulSoup解析
+    etree = lxml_html = None
+try:
+    import zstandard
+except ImportError:  # 未安装zstandard时只能使用gzip压缩
+    zstandard = None
 import argparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from difflib import SequenceMatcher
 from collections import defaultdict
 from selenium import webdriver
@@ -27,8 +47,203 @@ from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import threading
+import multiprocessing
+import queue
+import itertools
+import heapq
+
+
+# 压缩格式对应的文件后缀
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def data_file_path(path, compression=None):
+    """获取按压缩格式保存时的文件路径
+
+    Args:
+        path (str): 未压缩时的文件路径
+        compression (str, optional): 压缩格式（'gzip' 或 'zstd'），为空时不压缩
+
+    Returns:
+        str: 加上压缩后缀的文件路径
+    """
+    return path + COMPRESSION_SUFFIXES.get(compression, '')
+
+
+def saved_compression(path):
+    """获取已保存数据文件的压缩格式（按文件后缀判断）
+
+    Args:
+        path (str): 未压缩时的文件路径
+
+    Returns:
+        str: 压缩格式（'gzip' 或 'zstd'），文件不存在或未压缩时返回None
+    """
+    existing = find_data_file(path)
+    if existing is None:
+        return None
+    return next((name for name, suffix in COMPRESSION_SUFFIXES.items() if existing.endswith(suffix)), None)
+
+
+def find_data_file(path):
+    """查找已保存的数据文件（未压缩或任一压缩格式）
+
+    Args:
+        path (str): 未压缩时的文件路径
+
+    Returns:
+        str: 存在的文件路径，都不存在时返回None
+    """
+    for candidate in [path] + [path + suffix for suffix in COMPRESSION_SUFFIXES.values()]:
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def open_data_file(path, mode='r', compression=None):
+    """打开数据文件，压缩文件透明地压缩和解压（逐块读写，不整体读入内存）
+
+    Args:
+        path (str): 文件路径
+        mode (str): 'r'、'w'、'a'，加 'b' 时以二进制方式打开，否则按UTF-8文本打开
+        compression (str, optional): 压缩格式；为空时按文件后缀（.gz/.zst）判断
+
+    Returns:
+        file: 文件对象
+    """
+    binary = 'b' in mode
+    base_mode = mode.replace('b', '').replace('t', '')
+    if compression is None:
+        compression = next((name for name, suffix in COMPRESSION_SUFFIXES.items() if path.endswith(suffix)), None)
+    if compression == 'gzip':
+        if binary:
+            return gzip.open(path, base_mode + 'b', compresslevel=6)
+        return gzip.open(path, base_mode + 't', compresslevel=6, encoding='utf-8')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError(f"读写 {path} 需要安装 zstandard")
+        raw = open(path, base_mode + 'b')
+        if base_mode == 'r':
+            # 追加写入的文件由多个帧组成，需要连续读取所有帧
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+        return stream if binary else io.TextIOWrapper(stream, encoding='utf-8')
+    if binary:
+        return open(path, mode)
+    return open(path, mode, encoding='utf-8')
+
+
+def _convert_data_file(path, compression=None):
+    """把已保存的数据文件转换为指定的压缩格式（追加写入前调用，格式相同时不做任何事）
+
+    Args:
+        path (str): 未压缩时的文件路径
+        compression (str, optional): 目标压缩格式
+
+    Returns:
+        str: 目标格式的文件路径
+    """
+    target = data_file_path(path, compression)
+    existing = find_data_file(path)
+    if existing and existing != target:
+        with open_data_file(existing, 'rb') as source, open_data_file(f"{target}.tmp", 'wb', compression) as output:
+            while True:
+                chunk = source.read(1 << 20)
+                if not chunk:
+                    break
+                output.write(chunk)
+        os.replace(f"{target}.tmp", target)
+        _remove_other_data_files(path, compression)
+    return target
+
+
+def _remove_data_files(path):
+    """删除数据文件的所有格式版本（改用其他文件格式保存时调用）
+
+    Args:
+        path (str): 未压缩时的文件路径
+    """
+    for candidate in [path] + [path + suffix for suffix in COMPRESSION_SUFFIXES.values()]:
+        if os.path.exists(candidate):
+            os.remove(candidate)
+
+
+def _remove_other_data_files(path, compression=None):
+    """删除数据文件其他压缩格式的旧版本（切换压缩格式后重新保存时调用）
+
+    Args:
+        path (str): 未压缩时的文件路径
+        compression (str, optional): 保留的压缩格式
+    """
+    target = data_file_path(path, compression)
+    for candidate in [path] + [path + suffix for suffix in COMPRESSION_SUFFIXES.values()]:
+        if candidate != target and os.path.exists(candidate):
+            os.remove(candidate)
+
+
+def _parse_css_selector(selector):
+    """解析简单CSS选择器（支持 tag、.class、#id、tag.class、tag[attr*="value"]）
+
+    Args:
+        selector (str): CSS选择器
+
+    Returns:
+        tuple: (标签, 前缀 '.' 或 '#', 类名或id, 属性名, 属性包含的值)
+    """
+    match = re.fullmatch(r'([\w-]*)(?:([.#])([\w-]+)|\[([\w-]+)\*="([^"]*)"\])?', selector)
+    if not match:
+        raise ValueError(f"不支持的选择器: {selector}")
+    return match.groups()
+
+
+def css_to_xpath(selector):
+    """将简单CSS选择器转换为XPath
+
+    Args:
+        selector (str): CSS选择器
+
+    Returns:
+        str: 匹配文档中第一个元素的XPath表达式
+    """
+    tag, prefix, name, attr, value = _parse_css_selector(selector)
+    if prefix == '.':
+        condition = f"[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+    elif prefix == '#':
+        condition = f"[@id='{name}']"
+    elif attr:
+        condition = f"[contains(@{attr}, '{value}')]"
+    else:
+        condition = ''
+    return f"(//{tag or '*'}{condition})[1]"
+
+
+def css_element_matcher(selector):
+    """将简单CSS选择器转换为判断单个元素是否匹配的函数（流式解析时使用，规则与 css_to_xpath 一致）
+
+    Args:
+        selector (str): CSS选择器
+
+    Returns:
+        function: 接收lxml元素、返回是否匹配的函数
+    """
+    tag, prefix, name, attr, value = _parse_css_selector(selector)
+
+    def matches(elem):
+        if tag and elem.tag != tag:
+            return False
+        if prefix == '.':
+            return name in re.split(r'[ \t\r\n]+', elem.get('class', ''))
+        if prefix == '#':
+            return elem.get('id') == name
+        if attr:
+            return value in elem.get(attr, '')
+        return True
+
+    return matches
 
 
 class CrawlDisplay:
@@ -323,237 +538,2690 @@ class CrawlDisplay:
             print()  # 添加一个空行分隔
 
 
-class NovelCrawler:
-    """小说爬虫类"""
-    
-    def __init__(self, domains_file='all_domains.json', output_dir='novel_output', use_selenium=True, reference_sources=None):
-        """初始化爬虫
-        
-        Args:
-            domains_file (str): 域名配置文件路径
-            output_dir (str): 输出目录
-            use_selenium (bool): 是否使用Selenium
-            reference_sources (list): 基准源列表，用于内容合并时的优先级设置
-        """
-        self.domains_file = domains_file
-        self.output_dir = output_dir
-        self.domains = self.load_domains()
-        self.session = requests.Session()
-        self.use_selenium = use_selenium
-        self.driver = None
-        self.display = CrawlDisplay()  # 添加美化显示器
-        
-        # 设置基准源优先级（默认值）
-        self.reference_sources = reference_sources or ['bqgam', 'biquge', '675m', 'bqg67', 'biqu10']
-        
-        # 合并策略配置
-        self.merge_config = {
-            'enable_diff_merge': True,  # 是否启用差分合并
-            'length_priority_weight': 0.6,  # 长度优先权重
-            'quality_weight': 0.4,  # 质量评估权重
-            'min_content_length': 200,  # 最小内容长度
-            'merge_threshold': 1.1,  # 合并阈值（合并后内容增长比例）
-            'similarity_threshold': 0.8  # 相似度阈值
-        }
-        
-        # 设置请求头，模拟浏览器
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
-        
-        if use_selenium:
-            self._init_selenium()
-        
-        # 创建输出目录
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
-    
-    def configure_merge_strategy(self, **kwargs):
-        """配置合并策略参数
-        
+class DomainRateLimiter:
+    """按域名的自适应令牌桶限速器
+
+    每个域名一个令牌桶：响应持续正常时逐步提高速率（加性增加），
+    遇到 429/5xx/超时 时速率减半（乘性减少）。每个域名最近一次确认安全的速率会持久化到状态文件，
+    下次运行时从该速率开始。
+    """
+
+    # 视为需要退避的HTTP状态码
+    THROTTLE_STATUS = {429, 500, 502, 503, 504, 520, 521, 522, 524}
+
+    def __init__(self, state_file=None, initial_rate=1.25, min_rate=0.2, max_rate=8.0,
+                 burst=2, increase_step=0.25, increase_every=10, decrease_factor=0.5):
+        """初始化限速器
+
         Args:
-            **kwargs: 合并策略配置参数
-                - reference_sources: 基准源列表
-                - enable_diff_merge: 是否启用差分合并
-                - length_priority_weight: 长度优先权重
-                - quality_weight: 质量评估权重
-                - min_content_length: 最小内容长度
-                - merge_threshold: 合并阈值
-                - similarity_threshold: 相似度阈值
+            state_file (str, optional): 速率状态持久化文件路径
+            initial_rate (float): 无历史记录的域名的初始速率（请求/秒）
+            min_rate (float): 最低速率
+            max_rate (float): 最高速率
+            burst (int): 令牌桶容量（允许的瞬时突发请求数）
+            increase_step (float): 每次提速增加的速率
+            increase_every (int): 连续多少次正常响应后提速一次
+            decrease_factor (float): 退避时速率乘以的系数
         """
-        if 'reference_sources' in kwargs:
-            self.reference_sources = kwargs['reference_sources']
-            
-        for key, value in kwargs.items():
-            if key in self.merge_config:
-                self.merge_config[key] = value
-                
-        print(f"合并策略已更新: {kwargs}")
-    
-    def load_domains(self):
-        """加载域名配置文件
-        
+        self.state_file = state_file
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.increase_every = increase_every
+        self.decrease_factor = decrease_factor
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.saved_rates = self._load_state()
+
+    def _load_state(self):
+        """加载持久化的域名速率
+
         Returns:
-            list: 域名列表
+            dict: {域名: 安全速率}
         """
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
         try:
-            with open(self.domains_file, 'r', encoding='utf-8') as f:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                return data.get('domains', [])
+            return {domain: float(info['safe_rate']) for domain, info in data.get('domains', {}).items()}
         except Exception as e:
-            print(f"加载域名配置文件失败: {e}")
-            return []
-    
-    def search_novel_single_domain(self, domain, keyword):
-        """在单个域名中搜索小说
-        
+            print(f"加载限速状态失败: {e}")
+            return {}
+
+    def _get_bucket(self, domain):
+        """获取域名对应的令牌桶（调用方需持有锁）"""
+        bucket = self.buckets.get(domain)
+        if bucket is None:
+            rate = self.saved_rates.get(domain, self.initial_rate)
+            rate = min(max(rate, self.min_rate), self.max_rate)
+            bucket = {
+                'rate': rate,
+                'safe_rate': rate,
+                'tokens': 1.0,
+                'last_refill': time.monotonic(),
+                'blocked_until': 0.0,
+                'healthy_streak': 0,
+                'requests': 0,
+                'throttled': 0
+            }
+            self.buckets[domain] = bucket
+        return bucket
+
+    def acquire(self, domain):
+        """阻塞直到该域名的令牌桶中有可用令牌
+
         Args:
             domain (str): 域名
-            keyword (str): 搜索关键字
-            
+        """
+        while True:
+            with self.lock:
+                bucket = self._get_bucket(domain)
+                now = time.monotonic()
+                elapsed = now - bucket['last_refill']
+                bucket['tokens'] = min(self.burst, bucket['tokens'] + elapsed * bucket['rate'])
+                bucket['last_refill'] = now
+
+                if now < bucket['blocked_until']:
+                    wait = bucket['blocked_until'] - now
+                elif bucket['tokens'] >= 1.0:
+                    bucket['tokens'] -= 1.0
+                    bucket['requests'] += 1
+                    return
+                else:
+                    wait = (1.0 - bucket['tokens']) / bucket['rate']
+            time.sleep(wait)
+
+    def report(self, domain, status_code=None, error=None, retry_after=None):
+        """反馈一次请求结果，调整该域名的速率
+
+        Args:
+            domain (str): 域名
+            status_code (int, optional): HTTP状态码
+            error (Exception, optional): 请求异常（超时、连接错误等）
+            retry_after (str, optional): 响应头中的 Retry-After 值
+        """
+        throttled = error is not None or status_code in self.THROTTLE_STATUS
+        with self.lock:
+            bucket = self._get_bucket(domain)
+            if throttled:
+                bucket['throttled'] += 1
+                bucket['healthy_streak'] = 0
+                bucket['rate'] = max(self.min_rate, bucket['rate'] * self.decrease_factor)
+                bucket['safe_rate'] = min(bucket['safe_rate'], bucket['rate'])
+                bucket['tokens'] = 0.0
+                delay = self._retry_after_seconds(retry_after)
+                if delay is not None:
+                    bucket['blocked_until'] = time.monotonic() + delay
+            elif status_code is not None and status_code < 400:
+                bucket['healthy_streak'] += 1
+                if bucket['healthy_streak'] >= self.increase_every:
+                    # 当前速率已连续稳定，记为安全速率后继续试探提速
+                    bucket['healthy_streak'] = 0
+                    bucket['safe_rate'] = bucket['rate']
+                    bucket['rate'] = min(self.max_rate, bucket['rate'] + self.increase_step)
+
+    @staticmethod
+    def _retry_after_seconds(retry_after):
+        """解析 Retry-After 响应头（秒数或HTTP日期两种形式）
+
+        Args:
+            retry_after (str): Retry-After 值
+
         Returns:
-            tuple: (域名, 搜索结果列表)
+            float: 需要等待的秒数，无法解析时返回None
         """
+        if not retry_after:
+            return None
+        value = str(retry_after).strip()
+        if value.isdigit():
+            return int(value)
         try:
-            # 构建搜索URL
-            search_url = f"{domain.rstrip('/')}/s?q={quote(keyword)}"
-            print(f"尝试搜索: {search_url}")
-            
-            response = self.session.get(search_url, timeout=10)
-            response.raise_for_status()
-            
-            # 解析搜索结果
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 查找搜索结果的JavaScript代码
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string and 'loadmore' in script.string:
-                    # 尝试获取搜索API
-                    api_match = re.search(r'\$.getJSON\("([^"]+)"', script.string)
-                    if api_match:
-                        api_url = api_match.group(1)
-                        if not api_url.startswith('http'):
-                            api_url = urljoin(domain, api_url)
-                        
-                        # 确保API URL包含搜索关键字
-                        if '?q=' in api_url and not api_url.endswith('?q='):
-                            # API URL已经包含完整的查询参数
-                            pass
-                        elif '?q=' in api_url and api_url.endswith('?q='):
-                            # API URL缺少查询关键字，添加关键字
-                            api_url += quote(keyword)
-                        else:
-                            # API URL不包含查询参数，添加完整的查询参数
-                            separator = '&' if '?' in api_url else '?'
-                            api_url += f"{separator}q={quote(keyword)}"
-                        
-                        # 先调用hm.html API（根据网站的搜索逻辑）
-                        hm_url = urljoin(domain, f"/user/hm.html?q={quote(keyword)}")
-                        try:
-                            hm_response = self.session.get(hm_url, timeout=10)
-                        except:
-                            pass  # hm.html可能不存在，继续执行
-                        
-                        # 调用搜索API
-                        api_response = self.session.get(api_url, timeout=10)
-                        if api_response.status_code == 200:
-                            try:
-                                search_results = api_response.json()
-                                if search_results and isinstance(search_results, list) and len(search_results) > 0:
-                                    print(f"在 {domain} 找到 {len(search_results)} 个结果")
-                                    return domain, search_results
-                            except json.JSONDecodeError:
-                                continue
-            
-            time.sleep(1)  # 避免请求过快
-            
+            until = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if until is None:
+            return None
+        if until.tzinfo is None:
+            until = until.replace(tzinfo=timezone.utc)  # HTTP日期均为GMT
+        return max(0.0, (until - datetime.now(timezone.utc)).total_seconds())
+
+    def get_rate(self, domain):
+        """获取域名当前速率
+
+        Args:
+            domain (str): 域名
+
+        Returns:
+            float: 当前速率（请求/秒）
+        """
+        with self.lock:
+            return self._get_bucket(domain)['rate']
+
+    def save_state(self):
+        """将各域名的安全速率写入状态文件"""
+        if not self.state_file:
+            return
+        with self.lock:
+            domains = dict((domain, {'safe_rate': rate}) for domain, rate in self.saved_rates.items())
+            for domain, bucket in self.buckets.items():
+                domains[domain] = {
+                    'safe_rate': round(bucket['safe_rate'], 3),
+                    'requests': bucket['requests'],
+                    'throttled': bucket['throttled']
+                }
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'domains': domains
+                }, f, ensure_ascii=False, indent=2)
         except Exception as e:
-            print(f"搜索 {domain} 失败: {e}")
-        
-        return domain, []
-    
-    def search_novel_all_domains(self, keyword, max_workers=3):
-        """在所有域名中并行搜索小说
-        
+            print(f"保存限速状态失败: {e}")
+
+
+class DomainMethodProfiles:
+    """按域名记录各章节获取方式的成功率
+
+    每个域名对每种获取方式（geturl、selenium、直接访问、备用API）维护成功/失败计数，
+    按平滑后的成功率 (成功+1)/(总数+2) 从高到低排序，成功率相同时保持默认顺序。
+    计数超过上限时整体减半，使较早的结果逐渐失去权重，网站改版后顺序能够重新调整。
+    """
+
+    def __init__(self, state_file=None, decay_threshold=100):
+        """初始化方式记录
+
         Args:
-            keyword (str): 搜索关键字
-            max_workers (int): 最大并发数
-            
+            state_file (str, optional): 记录持久化文件路径
+            decay_threshold (int): 单个方式计数总数超过该值时计数减半
+        """
+        self.state_file = state_file
+        self.decay_threshold = decay_threshold
+        self.lock = threading.Lock()
+        self.profiles = self._load_state()
+
+    def _load_state(self):
+        """加载持久化的方式记录
+
         Returns:
-            dict: {域名: 搜索结果列表}
+            dict: {域名: {方式: {'success': 成功次数, 'failure': 失败次数}}}
         """
-        results = {}
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有搜索任务
-            future_to_domain = {
-                executor.submit(self.search_novel_single_domain, domain, keyword): domain 
-                for domain in self.domains
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {
+                domain: {
+                    method: {'success': int(counts.get('success', 0)), 'failure': int(counts.get('failure', 0))}
+                    for method, counts in methods.items()
+                }
+                for domain, methods in data.get('domains', {}).items()
             }
-            
-            # 收集结果
-            for future in as_completed(future_to_domain):
-                domain, search_results = future.result()
-                domain_name = self.get_domain_name(domain)
-                if search_results:
-                    results[domain] = search_results
-                    self.display.print_search_result(domain_name, len(search_results))
-                else:
-                    print(f"    ❌ {domain_name} - 未找到结果")
-        
-        return results
-    
-    def get_chapter_list(self, domain, book_url):
-        """获取章节列表
-        
+        except Exception as e:
+            print(f"加载获取方式记录失败: {e}")
+            return {}
+
+    def order(self, domain, methods):
+        """按该域名的历史成功率排列获取方式
+
         Args:
             domain (str): 域名
-            book_url (str): 小说详情页URL
-            
+            methods (list): 默认顺序的方式名称列表
+
         Returns:
-            list: 章节链接列表
+            list: 排序后的方式名称列表
         """
-        try:
-            # 构建完整URL
-            if not book_url.startswith('http'):
-                full_url = urljoin(domain, book_url)
-            else:
-                full_url = book_url
+        with self.lock:
+            profile = self.profiles.get(domain, {})
+            scores = {}
+            for method in methods:
+                counts = profile.get(method, {'success': 0, 'failure': 0})
+                total = counts['success'] + counts['failure']
+                scores[method] = (counts['success'] + 1) / (total + 2)
+        # sorted 为稳定排序，成功率相同时保持默认顺序
+        return sorted(methods, key=lambda method: -scores[method])
+
+    def record(self, domain, method, success):
+        """记录一次获取结果
+
+        Args:
+            domain (str): 域名
+            method (str): 方式名称
+            success (bool): 是否获取成功
+        """
+        with self.lock:
+            counts = self.profiles.setdefault(domain, {}).setdefault(method, {'success': 0, 'failure': 0})
+            counts['success' if success else 'failure'] += 1
+            if counts['success'] + counts['failure'] > self.decay_threshold:
+                counts['success'] //= 2
+                counts['failure'] //= 2
+
+    def get_stats(self, domain=None):
+        """获取方式计数
+
+        Args:
+            domain (str, optional): 域名，为空时返回所有域名
+
+        Returns:
+            dict: 域名的 {方式: 计数}，或 {域名: {方式: 计数}}
+        """
+        with self.lock:
+            if domain is not None:
+                return {method: dict(counts) for method, counts in self.profiles.get(domain, {}).items()}
+            return {
+                domain: {method: dict(counts) for method, counts in methods.items()}
+                for domain, methods in self.profiles.items()
+            }
+
+    def save_state(self):
+        """将各域名的方式记录写入状态文件"""
+        if not self.state_file:
+            return
+        domains = self.get_stats()
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'domains': domains
+                }, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"保存获取方式记录失败: {e}")
+
+
+class WebDriverPool:
+    """有上限的Selenium WebDriver池
+
+    驱动程序路径只通过 webdriver-manager 解析一次；浏览器按需创建，用完归还后供其他线程复用。
+    每个浏览器加载的页面数达到上限后关闭并在下次需要时重新创建，以限制浏览器内存增长。
+    """
+
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+    def __init__(self, max_size=2, max_pages=100):
+        """初始化WebDriver池
+
+        Args:
+            max_size (int): 同时存在的浏览器数量上限
+            max_pages (int): 单个浏览器加载多少个页面后回收重建
+        """
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.lock = threading.Condition()
+        self.driver_path = None
+        self.idle = []
+        self.page_counts = {}  # {id(driver): [所属代数, 已加载页面数]}
+        self.generation = 0  # shutdown 后递增，旧代的浏览器归还时直接关闭
+        self.created = 0
+        self.recycled = 0
+
+    def _chrome_options(self):
+        """构建Chrome启动参数
+
+        Returns:
+            Options: Chrome选项
+        """
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')  # 无头模式
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--window-size=1920,1080')
+        chrome_options.add_argument(f'--user-agent={self.USER_AGENT}')
+        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        chrome_options.add_argument('--disable-web-security')
+        chrome_options.add_argument('--allow-running-insecure-content')
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-logging", "enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        # DOM解析完成即返回，不等待图片等资源；正文是否就绪由调用方按内容容器判断
+        chrome_options.page_load_strategy = 'eager'
+        return chrome_options
+
+    def create_driver(self):
+        """创建一个新的浏览器（不计入池容量）
+
+        Returns:
+            webdriver.Chrome: Chrome WebDriver实例
+        """
+        with self.lock:
+            if self.driver_path is None:
+                # 使用webdriver-manager自动管理驱动程序，只解析一次
+                self.driver_path = ChromeDriverManager().install()
+            driver_path = self.driver_path
+        driver = webdriver.Chrome(service=Service(driver_path), options=self._chrome_options())
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return driver
+
+    def acquire(self, timeout=None):
+        """从池中取出一个浏览器，池中无空闲且已达上限时阻塞等待
+
+        Args:
+            timeout (float, optional): 最长等待秒数
+
+        Returns:
+            webdriver.Chrome: Chrome WebDriver实例，等待超时返回None
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self.lock:
+            while True:
+                if self.idle:
+                    return self.idle.pop()
+                if self.created < self.max_size:
+                    self.created += 1
+                    break
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.lock.wait(remaining)
+
+        # 在锁外启动浏览器，避免阻塞其他线程归还
+        try:
+            driver = self.create_driver()
+        except Exception:
+            with self.lock:
+                self.created = max(0, self.created - 1)
+                self.lock.notify()
+            raise
+        with self.lock:
+            self.page_counts[id(driver)] = [self.generation, 0]
+        return driver
+
+    def release(self, driver, pages=1, broken=False):
+        """归还浏览器
+
+        Args:
+            driver (webdriver.Chrome): 取出的浏览器
+            pages (int): 本次使用期间加载的页面数
+            broken (bool): 浏览器是否已不可用（将直接关闭）
+        """
+        with self.lock:
+            entry = self.page_counts.get(id(driver))
+            if entry is None:
+                # 已在 shutdown 中被清点的旧浏览器
+                retire = True
+            else:
+                entry[1] += pages
+                stale = entry[0] != self.generation
+                retire = broken or stale or entry[1] >= self.max_pages
+                if retire:
+                    del self.page_counts[id(driver)]
+                    if not stale:
+                        self.created -= 1
+                    if not broken and not stale:
+                        self.recycled += 1
+                else:
+                    self.idle.append(driver)
+            self.lock.notify()
+        if retire:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def lease(self, timeout=None):
+        """以上下文管理器的形式借用一个浏览器，退出时自动归还
+
+        Args:
+            timeout (float, optional): 最长等待秒数
+
+        Returns:
+            _DriverLease: 上下文管理器，进入时得到浏览器（可能为None）
+        """
+        return _DriverLease(self, timeout)
+
+    def delete_all_cookies(self):
+        """清除所有空闲浏览器的Cookie
+
+        Returns:
+            int: 清理的浏览器数量
+        """
+        with self.lock:
+            drivers = list(self.idle)
+        for driver in drivers:
+            driver.delete_all_cookies()
+        return len(drivers)
+
+    def get_stats(self):
+        """获取池的使用统计
+
+        Returns:
+            dict: 浏览器数量、空闲数量和回收次数
+        """
+        with self.lock:
+            return {'active': self.created, 'idle': len(self.idle), 'recycled': self.recycled}
+
+    def shutdown(self):
+        """关闭池中所有空闲浏览器，借出中的浏览器在归还时关闭；之后池仍可按需重新创建浏览器
+
+        Returns:
+            int: 立即关闭的浏览器数量
+        """
+        with self.lock:
+            drivers = self.idle
+            self.idle = []
+            for driver in drivers:
+                self.page_counts.pop(id(driver), None)
+            self.generation += 1
+            self.created = 0
+            self.lock.notify_all()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        return len(drivers)
+
+
+class _DriverLease:
+    """WebDriverPool.lease 返回的上下文管理器"""
+
+    def __init__(self, pool, timeout=None):
+        self.pool = pool
+        self.timeout = timeout
+        self.driver = None
+        self.pages = 1
+
+    def __enter__(self):
+        self.driver = self.pool.acquire(self.timeout)
+        return self.driver
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.driver is not None:
+            self.pool.release(self.driver, self.pages, broken=isinstance(exc, WebDriverException))
+        return False
+
+
+class HttpCache:
+    """磁盘HTTP缓存
+
+    以规范化URL为键，保存响应正文及 ETag/Last-Modified。章节页面内容不会再变化，命中后直接返回；
+    章节列表页会更新，通过条件请求重新验证，服务器返回304时使用缓存正文。
+    """
+
+    def __init__(self, cache_dir):
+        """初始化缓存
+
+        Args:
+            cache_dir (str): 缓存目录
+        """
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0}
+
+    @staticmethod
+    def normalize_url(url):
+        """规范化URL：协议和主机名小写，查询参数排序，去掉片段
+
+        Args:
+            url (str): 原始URL
+
+        Returns:
+            str: 规范化后的URL
+        """
+        parts = urlparse(url)
+        query = '&'.join(sorted(param for param in parts.query.split('&') if param))
+        return urlunparse((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.params, query, ''))
+
+    def _paths(self, url):
+        """获取URL对应的元数据文件和正文文件路径
+
+        Args:
+            url (str): URL
+
+        Returns:
+            tuple: (元数据文件路径, 正文文件路径)
+        """
+        key = hashlib.sha1(self.normalize_url(url).encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + '.json', base + '.body'
+
+    def count(self, name):
+        """累加统计计数"""
+        with self.lock:
+            self.stats[name] += 1
+
+    def load(self, url):
+        """读取缓存的响应
+
+        Args:
+            url (str): URL
+
+        Returns:
+            requests.Response: 由缓存构造的响应，无缓存时返回None
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        response = requests.Response()
+        response.status_code = meta.get('status', 200)
+        response.url = meta.get('url', url)
+        response.encoding = meta.get('encoding')
+        response.headers.update(meta.get('headers', {}))
+        response._content = body
+        return response
+
+    def get(self, url):
+        """读取不可变资源的缓存并计入命中/未命中
+
+        Args:
+            url (str): URL
+
+        Returns:
+            requests.Response: 缓存的响应，未命中返回None
+        """
+        response = self.load(url)
+        self.count('hits' if response is not None else 'misses')
+        return response
+
+    def conditional_headers(self, cached):
+        """根据缓存的响应构造条件请求头
+
+        Args:
+            cached (requests.Response): 缓存的响应
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since 请求头
+        """
+        headers = {}
+        if cached is not None:
+            if cached.headers.get('ETag'):
+                headers['If-None-Match'] = cached.headers['ETag']
+            if cached.headers.get('Last-Modified'):
+                headers['If-Modified-Since'] = cached.headers['Last-Modified']
+        return headers
+
+    def store(self, url, response):
+        """保存响应（只保存200响应）
+
+        Args:
+            url (str): 缓存键对应的URL
+            response (requests.Response): 响应对象
+        """
+        if response.status_code != 200:
+            return
+        meta_path, body_path = self._paths(url)
+        headers = {name: response.headers[name] for name in ('ETag', 'Last-Modified', 'Content-Type')
+                   if response.headers.get(name)}
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'encoding': response.encoding,
+            'headers': headers,
+            'fetched': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            # 先写临时文件再替换，避免并发读到写了一半的缓存
+            suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(body_path + suffix, 'wb') as f:
+                f.write(response.content)
+            os.replace(body_path + suffix, body_path)
+            with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(meta_path + suffix, meta_path)
+            self.count('stored')
+        except OSError as e:
+            print(f"写入HTTP缓存失败: {e}")
+
+    def reset_stats(self):
+        """清零统计计数"""
+        with self.lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+
+class DomainSessionPool:
+    """按域名划分的 requests 会话池
+
+    每个域名使用独立的 Session：Cookie 互不干扰，连接池只服务于该域名，
+    大小按并发数设置，避免所有线程争用同一个默认大小（10）的连接池而频繁丢弃连接、重新握手。
+    """
+
+    def __init__(self, base_session, pool_maxsize=10):
+        """初始化会话池
+
+        Args:
+            base_session (requests.Session): 提供默认请求头的基础会话
+            pool_maxsize (int): 每个域名连接池保持的最大连接数
+        """
+        self.base_session = base_session
+        self.pool_maxsize = pool_maxsize
+        self.lock = threading.Lock()
+        self.sessions = {}
+
+    def get(self, domain):
+        """获取域名对应的会话，不存在时创建
+
+        Args:
+            domain (str): 域名
+
+        Returns:
+            requests.Session: 该域名专用的会话
+        """
+        with self.lock:
+            session = self.sessions.get(domain)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.base_session.headers)
+                self._mount_adapter(session)
+                self.sessions[domain] = session
+            return session
+
+    def _mount_adapter(self, session):
+        """为会话挂载按当前大小设置的连接池"""
+        # 除本域名外为跳转到的少量其他主机（如章节跳转API）预留连接池
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    def resize(self, pool_maxsize):
+        """调整每个域名连接池的大小
+
+        已创建的会话（例如搜索阶段创建的会话）连接池变大时重新挂载连接池，原有的空闲连接随旧连接池关闭。
+
+        Args:
+            pool_maxsize (int): 每个域名连接池保持的最大连接数
+        """
+        with self.lock:
+            if pool_maxsize <= self.pool_maxsize:
+                return
+            self.pool_maxsize = pool_maxsize
+            for session in self.sessions.values():
+                old_adapters = {id(adapter): adapter for adapter in session.adapters.values()}.values()
+                self._mount_adapter(session)
+                for adapter in old_adapters:
+                    adapter.close()
+
+    def clear_cookies(self):
+        """清除所有域名会话的Cookie"""
+        with self.lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            session.cookies.clear()
+
+    def get_stats(self):
+        """获取各域名的连接复用统计
+
+        Returns:
+            dict: {域名: {'requests': 请求数, 'connections': 新建连接数, 'reuse_ratio': 连接复用比例}}
+        """
+        with self.lock:
+            sessions = dict(self.sessions)
+        stats = {}
+        for domain, session in sessions.items():
+            requests_count = 0
+            connections = 0
+            for adapter in {id(a): a for a in session.adapters.values()}.values():
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is not None:
+                        requests_count += pool.num_requests
+                        connections += pool.num_connections
+            reuse_ratio = 1 - connections / requests_count if requests_count else 0.0
+            stats[domain] = {'requests': requests_count, 'connections': connections, 'reuse_ratio': round(reuse_ratio, 3)}
+        return stats
+
+    def close(self):
+        """关闭所有会话的连接"""
+        with self.lock:
+            sessions = list(self.sessions.values())
+            self.sessions = {}
+        for session in sessions:
+            session.close()
+
+
+class SiteProfiles:
+    """按域名记录页面结构的站点配置
+
+    记录每个域名上生效的标题选择器、正文选择器、章节链接模式和搜索API，
+    之后的页面优先（通常也只需）尝试记录的规则；记录的规则不再匹配时，完整尝试一遍候选规则并重新记录。
+    """
+
+    def __init__(self, state_file=None):
+        """初始化站点配置
+
+        Args:
+            state_file (str, optional): 配置持久化文件路径
+        """
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        self.profiles = self._load_state()
+
+    def _load_state(self):
+        """加载持久化的站点配置
+
+        Returns:
+            dict: {域名: 站点配置}
+        """
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {domain: dict(profile) for domain, profile in data.get('domains', {}).items()}
+        except Exception as e:
+            print(f"加载站点配置失败: {e}")
+            return {}
+
+    def get(self, domain):
+        """获取域名的站点配置
+
+        Args:
+            domain (str): 域名
+
+        Returns:
+            dict: 站点配置副本（无记录时为空字典）
+        """
+        with self.lock:
+            return dict(self.profiles.get(domain, {}))
+
+    def get_fresh(self, domain, key, ttl):
+        """获取记录时间在有效期内的规则
+
+        Args:
+            domain (str): 域名
+            key (str): 配置项名称
+            ttl (float): 有效期（秒）
+
+        Returns:
+            str: 有效期内的规则，无记录或已过期时返回None
+        """
+        with self.lock:
+            profile = self.profiles.get(domain, {})
+            learned_at = profile.get('learned_at', {}).get(key, 0)
+            if key in profile and time.time() - learned_at < ttl:
+                return profile[key]
+        return None
+
+    def order(self, domain, key, candidates):
+        """将记录的规则排在候选规则最前
+
+        Args:
+            domain (str): 域名，为空时保持默认顺序
+            key (str): 配置项名称
+            candidates (list): 默认顺序的候选规则
+
+        Returns:
+            list: 排序后的候选规则
+        """
+        if not domain:
+            return list(candidates)
+        with self.lock:
+            preferred = self.profiles.get(domain, {}).get(key)
+        if preferred in candidates:
+            return [preferred] + [candidate for candidate in candidates if candidate != preferred]
+        return list(candidates)
+
+    def learn(self, domain, key, value):
+        """记录域名上生效的规则
+
+        Args:
+            domain (str): 域名，为空时不记录
+            key (str): 配置项名称
+            value (str): 生效的规则
+        """
+        if not domain:
+            return
+        with self.lock:
+            profile = self.profiles.setdefault(domain, {})
+            profile.setdefault('learned_at', {})[key] = int(time.time())
+            if profile.get(key) == value:
+                return
+            if key in profile:
+                # 原规则不再匹配，记录重新学习次数
+                profile['relearned'] = profile.get('relearned', 0) + 1
+            profile[key] = value
+            profile['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    def forget(self, domain, key):
+        """删除域名的某项规则
+
+        Args:
+            domain (str): 域名
+            key (str): 配置项名称
+        """
+        with self.lock:
+            profile = self.profiles.get(domain, {})
+            profile.pop(key, None)
+            profile.get('learned_at', {}).pop(key, None)
+
+    def save_state(self):
+        """将站点配置写入状态文件"""
+        if not self.state_file:
+            return
+        with self.lock:
+            domains = {domain: dict(profile) for domain, profile in self.profiles.items()}
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'domains': domains
+                }, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"保存站点配置失败: {e}")
+
+
+class AdCleaner:
+    """章节广告清理引擎
+
+    广告规则从 ad_rules.json 加载并只编译一次。每条规则预先提取出匹配时必然出现的字面量（触发词），
+    执行规则前先用字符串查找确认当前正文中含有触发词，不含则跳过该规则，省去绝大多数正则扫描；
+    不含大小写字母的规则（如中文规则）忽略大小写没有意义，编译时去掉 IGNORECASE 以使用更快的字面量查找。
+    由于检查的始终是前面规则处理后的正文，结果与逐条执行全部规则完全一致。
+    """
+
+    # re.IGNORECASE 下会与ASCII字母互相匹配的非ASCII字符（İ ı ſ K）
+    SPECIAL_FOLD_CHARS = re.compile('[\u0130\u0131\u017f\u212a]')
+
+    # 规则执行完后的空白整理（按顺序执行）：(规则, 替换文本, 触发词)，正文不含任一触发词时该规则不会改变正文
+    WHITESPACE_RULES = [
+        (re.compile(r'[ \t]+'), ' ', ('\t', '  ')),  # 多个空格/制表符合并为一个空格
+        (re.compile(r'\n[ \t]+'), '\n', ('\n ', '\n\t')),  # 行首空白字符
+        (re.compile(r'[ \t]+\n'), '\n', (' \n', '\t\n')),  # 行尾空白字符
+        (re.compile(r'\n{3,}'), '\n\n', ('\n\n\n',)),  # 多个换行符合并为两个
+    ]
+
+    def __init__(self, rules_file=None):
+        """初始化清理引擎
+
+        Args:
+            rules_file (str, optional): 规则文件路径，默认使用脚本目录下的 ad_rules.json
+        """
+        self.rules_file = rules_file or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ad_rules.json')
+        self.rules = []  # [(编译后的规则, 触发词或None, 是否忽略大小写)]
+        for pattern in self._load_rules():
+            try:
+                parsed = sre_parse.parse(pattern)
+            except Exception:
+                parsed = None
+            trigger = self._required_literal(parsed) if parsed is not None else None
+            ignore_case = parsed is None or not self._is_caseless(parsed)
+            if trigger and ignore_case:
+                if any(not ch.isascii() and ch.lower() != ch.upper() for ch in trigger):
+                    # 含非ASCII大小写字母的触发词无法用小写查找等价判断，该规则总是执行
+                    trigger = None
+                else:
+                    trigger = trigger.lower()
+            flags = re.IGNORECASE if ignore_case else 0
+            self.rules.append((re.compile(pattern, flags), trigger, ignore_case))
+
+    def _load_rules(self):
+        """加载广告规则
+
+        Returns:
+            list: 规则正则表达式列表
+        """
+        try:
+            with open(self.rules_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return [rule['pattern'] for rule in data.get('rules', [])]
+        except Exception as e:
+            print(f"加载广告规则失败: {e}")
+            return []
+
+    @staticmethod
+    def _is_caseless(parsed):
+        """判断正则中出现的所有字符是否都没有大小写之分
+
+        Args:
+            parsed: sre_parse 解析结果
+
+        Returns:
+            bool: 没有任何大小写字母时返回True
+        """
+        for op, value in parsed:
+            if op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL):
+                codes = [value]
+            elif op == sre_constants.IN:
+                codes = []
+                for item_op, item_value in value:
+                    if item_op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL):
+                        codes.append(item_value)
+                    elif item_op == sre_constants.RANGE:
+                        codes.extend(range(item_value[0], item_value[1] + 1))
+                    elif item_op != sre_constants.CATEGORY and item_op != sre_constants.NEGATE:
+                        return False
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+                if not AdCleaner._is_caseless(value[2]):
+                    return False
+                continue
+            elif op == sre_constants.SUBPATTERN:
+                if not AdCleaner._is_caseless(value[-1]):
+                    return False
+                continue
+            elif op == sre_constants.BRANCH:
+                if not all(AdCleaner._is_caseless(branch) for branch in value[1]):
+                    return False
+                continue
+            elif op in (sre_constants.ANY, sre_constants.AT):
+                continue
+            else:
+                return False
+            if any(chr(code).lower() != chr(code).upper() for code in codes):
+                return False
+        return True
+
+    @staticmethod
+    def _required_literal(parsed):
+        """提取正则匹配时必然出现的最长连续字面量
+
+        Args:
+            parsed: sre_parse 解析结果
+
+        Returns:
+            str: 触发词，无法提取时返回None
+        """
+        best = ''
+        current = ''
+        for op, value in parsed:
+            if op == sre_constants.LITERAL:
+                current += chr(value)
+                continue
+            if op == sre_constants.MAX_REPEAT or op == sre_constants.MIN_REPEAT:
+                min_count, max_count, item = value
+                if len(item) == 1 and item[0][0] == sre_constants.LITERAL and min_count > 0:
+                    # 例如 \n{3,}：至少出现 min_count 次，之后的内容不再连续
+                    current += chr(item[0][1]) * min_count
+                    if min_count == max_count:
+                        continue
+            best = max(best, current, key=len)
+            current = ''
+        best = max(best, current, key=len)
+        return best or None
+
+    def clean(self, content):
+        """清理章节内容中的广告信息
+
+        Args:
+            content (str): 原始章节内容
+
+        Returns:
+            str: 清理后的章节内容
+        """
+        if not content:
+            return content
+
+        cleaned_content = content
+        lowered = None  # 忽略大小写规则使用的小写正文，正文变化后重新计算
+        for regex, trigger, ignore_case in self.rules:
+            if trigger is not None:
+                if not ignore_case:
+                    if trigger not in cleaned_content:
+                        continue
+                else:
+                    if lowered is None:
+                        lowered = cleaned_content.lower()
+                        special_fold = bool(self.SPECIAL_FOLD_CHARS.search(cleaned_content))
+                    if trigger not in lowered and not special_fold:
+                        continue
+            cleaned_content, count = regex.subn('', cleaned_content)
+            if count:
+                lowered = None
+
+        for regex, replacement, triggers in self.WHITESPACE_RULES:
+            if any(trigger in cleaned_content for trigger in triggers):
+                cleaned_content = regex.sub(replacement, cleaned_content)
+
+        return cleaned_content.strip()
+
+
+class CharsetDecoder:
+    """按域名缓存字符集的响应解码器
+
+    每个域名首次解码时从页面的 <meta charset> 探测字符集（其次是Content-Type响应头，最后尝试UTF-8），
+    记录到站点配置后直接用该字符集解码原始字节，不再依赖requests的字符集自动检测。
+    GBK/GB2312统一按其超集GB18030解码。解码结果出现乱码时重新探测字符集。
+    """
+
+    # 统一按超集解码的字符集
+    CHARSET_ALIASES = {'gbk': 'gb18030', 'gb2312': 'gb18030', 'x-gbk': 'gb18030', 'gb_2312-80': 'gb18030'}
+    META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_\-]+)', re.IGNORECASE)
+    HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([A-Za-z0-9_\-]+)', re.IGNORECASE)
+    # 探测<meta charset>时只查看页面开头
+    SNIFF_BYTES = 4096
+    # 错误解码的典型产物：GBK/UTF-8互相误解码的"锟斤拷"、未初始化内存的"烫烫烫"
+    MOJIBAKE_MARKERS = ('锟斤拷', '烫烫烫')
+    LATIN1_CHARS = re.compile('[\u00c0-\u00ff]')
+    CJK_CHARS = re.compile('[\u4e00-\u9fff]')
+
+    def __init__(self, site_profiles):
+        """初始化解码器
+
+        Args:
+            site_profiles (SiteProfiles): 记录各域名字符集的站点配置
+        """
+        self.site_profiles = site_profiles
+        self.lock = threading.Lock()
+        self.stats = defaultdict(lambda: {'responses': 0, 'bytes': 0, 'decode_time': 0.0, 'mojibake': 0, 'refetched': 0})
+
+    @classmethod
+    def normalize(cls, charset):
+        """规范化字符集名称
+
+        Args:
+            charset (str): 字符集名称
+
+        Returns:
+            str: Python可用的字符集名称，无法识别时返回None
+        """
+        if not charset:
+            return None
+        charset = charset.strip().lower()
+        charset = cls.CHARSET_ALIASES.get(charset, charset)
+        try:
+            codecs.lookup(charset)
+        except LookupError:
+            return None
+        return charset
+
+    def sniff(self, response):
+        """从响应中探测字符集
+
+        Args:
+            response (requests.Response): 响应对象
+
+        Returns:
+            str: 字符集名称
+        """
+        match = self.META_CHARSET.search(response.content[:self.SNIFF_BYTES])
+        charset = self.normalize(match.group(1).decode('ascii')) if match else None
+        if charset:
+            return charset
+        match = self.HEADER_CHARSET.search(response.headers.get('Content-Type', ''))
+        charset = self.normalize(match.group(1)) if match else None
+        if charset:
+            return charset
+        try:
+            response.content.decode('utf-8')
+            return 'utf-8'
+        except UnicodeDecodeError:
+            return 'gb18030'
+
+    def is_mojibake(self, text):
+        """判断解码后的文本是否是乱码
+
+        Args:
+            text (str): 解码后的文本
+
+        Returns:
+            bool: 是否是乱码
+        """
+        if not text:
+            return False
+        if text.count('\ufffd') > max(3, len(text) // 1000):
+            return True
+        if any(marker in text for marker in self.MOJIBAKE_MARKERS):
+            return True
+        # UTF-8中文按Latin-1解码时会变成大量带重音的拉丁字母
+        if text.isascii():
+            return False
+        latin = len(self.LATIN1_CHARS.findall(text))
+        return latin > 50 and latin > len(self.CJK_CHARS.findall(text))
+
+    def decode(self, domain, response):
+        """按域名字符集解码响应正文
+
+        Args:
+            domain (str): 域名
+            response (requests.Response): 响应对象
+
+        Returns:
+            tuple: (文本, 是否是乱码)
+        """
+        start = time.perf_counter()
+        content = response.content or b''
+        charset = self.site_profiles.get(domain).get('charset')
+        if not charset:
+            charset = self.sniff(response)
+            self.site_profiles.learn(domain, 'charset', charset)
+        text = content.decode(charset, errors='replace')
+        mojibake = self.is_mojibake(text)
+        if mojibake:
+            # 记录的字符集可能已失效（网站改版换了编码），按本页重新探测
+            sniffed = self.sniff(response)
+            if sniffed != charset:
+                retry = content.decode(sniffed, errors='replace')
+                if not self.is_mojibake(retry):
+                    self.site_profiles.learn(domain, 'charset', sniffed)
+                    text, mojibake = retry, False
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            stats = self.stats[domain]
+            stats['responses'] += 1
+            stats['bytes'] += len(content)
+            stats['decode_time'] += elapsed
+            if mojibake:
+                stats['mojibake'] += 1
+        return text, mojibake
+
+    def count_refetch(self, domain):
+        """记录一次因乱码重新获取页面
+
+        Args:
+            domain (str): 域名
+        """
+        with self.lock:
+            self.stats[domain]['refetched'] += 1
+
+    def get_stats(self):
+        """获取各域名的解码统计
+
+        Returns:
+            dict: {域名: {'charset': 字符集, 'responses': 解码次数, 'bytes': 字节数,
+                   'decode_time': 解码总耗时（秒）, 'mojibake': 乱码次数, 'refetched': 乱码重新获取次数}}
+        """
+        with self.lock:
+            stats = {domain: dict(item) for domain, item in self.stats.items()}
+        for domain, item in stats.items():
+            item['charset'] = self.site_profiles.get(domain).get('charset')
+        return stats
+
+
+class BlobStore:
+    """按内容哈希保存章节正文的内容寻址存储
+
+    正文以其MD5哈希为键保存在 blobs/哈希前两位/哈希.txt 中，多个域名的相同章节只保存一份，
+    启用去重时各域名的 _chapters.json 只记录 content_hash 而不再包含正文。
+    启用压缩时正文文件按压缩格式加后缀，读取时自动识别。
+    """
+
+    def __init__(self, root, compression=None):
+        """初始化存储
+
+        Args:
+            root (str): 存储目录（小说目录下的 blobs）
+            compression (str, optional): 新写入正文文件的压缩格式（'gzip' 或 'zstd'）
+        """
+        self.root = root
+        self.compression = compression
+
+    def path(self, content_hash):
+        """获取正文文件路径
+
+        Args:
+            content_hash (str): 正文的MD5哈希
+
+        Returns:
+            str: 正文文件路径（未压缩时的路径）
+        """
+        return os.path.join(self.root, content_hash[:2], f"{content_hash}.txt")
+
+    def put(self, content, content_hash=None):
+        """保存正文，已有相同哈希的正文时不再写入
+
+        Args:
+            content (str): 章节正文
+            content_hash (str, optional): 已计算好的正文MD5哈希
+
+        Returns:
+            bool: 是否新写入了正文文件
+        """
+        content_hash = content_hash or hashlib.md5(content.encode('utf-8')).hexdigest()
+        path = self.path(content_hash)
+        if find_data_file(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再替换，并发保存同一正文或中途退出时不会留下不完整的文件
+        target = data_file_path(path, self.compression)
+        temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open_data_file(temp_path, 'wb', self.compression) as f:
+            f.write(content.encode('utf-8'))
+        os.replace(temp_path, target)
+        return True
+
+    def get(self, content_hash):
+        """读取正文
+
+        Args:
+            content_hash (str): 正文的MD5哈希
+
+        Returns:
+            str: 章节正文，不存在时返回None
+        """
+        path = find_data_file(self.path(content_hash))
+        if not path:
+            return None
+        with open_data_file(path, 'rb') as f:
+            return f.read().decode('utf-8')
+
+
+class ChapterRecordFile:
+    """按行保存的章节记录文件（_chapters.jsonl）及其偏移索引（_chapters.jsonl.idx）
+
+    每行一个章节记录，结构与 _chapters.json 数组中的元素相同。索引文件记录每个章节在记录文件中的
+    字节偏移和长度，以及标题、URL、哈希等不含正文的字段；读取时只加载索引，正文按偏移逐章读取，
+    不需要解析整个文件。索引与记录文件大小不一致时（例如写入中途退出）从记录文件重新建立。
+    """
+
+    # 索引中除偏移和长度外保存的章节字段
+    INDEX_FIELDS = ('title', 'url', 'content_hash', 'index')
+
+    def __init__(self, path):
+        """初始化记录文件
+
+        Args:
+            path (str): 记录文件路径（_chapters.jsonl）
+        """
+        self.path = path
+        self.index_path = f"{path}.idx"
+
+    def load_index(self):
+        """读取索引
+
+        Returns:
+            list: 按保存顺序排列的章节摘要 {'title', 'url', 'content_hash', 'index', 'offset', 'length'}
+                （没有URL或对齐索引的章节不含对应字段），记录文件不存在时返回空列表
+        """
+        if not os.path.exists(self.path):
+            return []
+        size = os.path.getsize(self.path)
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('size') == size:
+                return index['chapters']
+        except (OSError, ValueError, KeyError):
+            pass
+        return self._rebuild_index()
+
+    def _rebuild_index(self):
+        """逐行扫描记录文件重新建立索引（忽略不完整的最后一行）
+
+        Returns:
+            list: 章节摘要列表
+        """
+        entries = []
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entries.append(self._entry(json.loads(line), offset, len(line)))
+                except ValueError:
+                    pass
+                offset += len(line)
+        self._write_index(entries, offset)
+        return entries
+
+    def _entry(self, record, offset, length):
+        """由章节记录生成索引项"""
+        entry = {key: record[key] for key in self.INDEX_FIELDS if key in record}
+        entry.update(offset=offset, length=length)
+        return entry
+
+    def _write_index(self, entries, size):
+        """写入索引文件（先写临时文件再替换）
+
+        Args:
+            entries (list): 章节摘要列表
+            size (int): 索引对应的记录文件大小
+        """
+        with open(f"{self.index_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'size': size, 'chapters': entries}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+
+    def read(self, entry):
+        """按索引项读取一个章节记录
+
+        Args:
+            entry (dict): load_index 返回的章节摘要
+
+        Returns:
+            dict: 章节记录
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(entry['offset'])
+            return json.loads(f.read(entry['length']))
+
+    def records(self):
+        """按保存顺序逐行读取全部章节记录
+
+        Yields:
+            dict: 章节记录
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if line.endswith(b'\n'):
+                    yield json.loads(line)
+
+    def write(self, records, append=False):
+        """逐条写入章节记录并更新索引
+
+        Args:
+            records (iterable): 章节记录（dict）
+            append (bool): 是否追加到已有记录之后；否则先写临时文件，写完后替换原文件
+
+        Returns:
+            int: 写入的章节数
+        """
+        entries = self.load_index() if append else []
+        offset = entries[-1]['offset'] + entries[-1]['length'] if entries else 0
+        target = self.path if append else f"{self.path}.tmp"
+        count = 0
+        with open(target, 'ab' if append else 'wb') as f:
+            # 追加前截掉中途退出留下的不完整记录
+            f.truncate(offset)
+            for record in records:
+                line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+                f.write(line)
+                entries.append(self._entry(record, offset, len(line)))
+                offset += len(line)
+                count += 1
+        if not append:
+            os.replace(target, self.path)
+        self._write_index(entries, offset)
+        return count
+
+    def remove(self):
+        """删除记录文件和索引"""
+        for path in (self.path, self.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class JsonChapterSource:
+    """按域名保存的 _chapters.json / _chapters.jsonl 章节数据源
+
+    _chapters.json 在首次访问时整体读入内存（与原有的读取方式一致）；_chapters.jsonl 只读入偏移索引，
+    查询时按偏移逐章读取正文。启用去重保存的章节不含正文，查询时从小说目录下的 BlobStore 按哈希读取。
+    与 ChapterStore 提供相同的读取接口，比对和合成不关心数据保存在哪种存储中。
+    """
+
+    def __init__(self, novel_dir, safe_title):
+        """初始化数据源
+
+        Args:
+            novel_dir (str): 小说目录
+            safe_title (str): 文件名安全的小说名称
+        """
+        self.novel_dir = novel_dir
+        self.safe_title = safe_title
+        self.blobs = BlobStore(os.path.join(novel_dir, 'blobs'))
+        self.record_files = {}
+        self.cache = {}
+        self.by_title = None
+
+    def _record_file(self, domain_name):
+        """获取域名的按行章节记录文件（不存在时返回None）"""
+        if domain_name not in self.record_files:
+            record_file = ChapterRecordFile(os.path.join(self.novel_dir, domain_name, f"{self.safe_title}_chapters.jsonl"))
+            self.record_files[domain_name] = record_file if os.path.exists(record_file.path) else None
+        return self.record_files[domain_name]
+
+    def domains(self):
+        """获取有章节数据的域名
+
+        Returns:
+            list: 按名称排序的域名名称列表
+        """
+        if not os.path.isdir(self.novel_dir):
+            return []
+        return sorted(name for name in os.listdir(self.novel_dir)
+                      if find_data_file(os.path.join(self.novel_dir, name, f"{self.safe_title}_chapters.json"))
+                      or os.path.exists(os.path.join(self.novel_dir, name, f"{self.safe_title}_chapters.jsonl")))
+
+    def chapters(self, domain_name):
+        """获取域名的全部章节
+
+        Args:
+            domain_name (str): 域名名称
+
+        Returns:
+            list: 按保存顺序排列的章节数据（_chapters.jsonl 只返回不含正文的索引项）
+        """
+        if domain_name not in self.cache and self._record_file(domain_name):
+            self.cache[domain_name] = self._record_file(domain_name).load_index()
+        if domain_name not in self.cache:
+            json_file = find_data_file(os.path.join(self.novel_dir, domain_name, f"{self.safe_title}_chapters.json"))
+            try:
+                with open_data_file(json_file) as f:
+                    self.cache[domain_name] = json.load(f)
+            except Exception as e:
+                print(f"读取 {json_file} 失败: {e}")
+                self.cache[domain_name] = []
+        return self.cache[domain_name]
+
+    def all_aligned(self):
+        """判断章节是否都带有跨域名对齐的索引（跨域名调度保存的数据）
+
+        Returns:
+            bool: 是否都带有对齐索引
+        """
+        chapters = [chapter for domain_name in self.domains() for chapter in self.chapters(domain_name)]
+        return bool(chapters) and all('index' in chapter for chapter in chapters)
+
+    def titles(self, domain_name=None):
+        """获取章节标题顺序
+
+        Args:
+            domain_name (str, optional): 只取该域名的章节；为空时取所有域名章节的并集
+
+        Returns:
+            list: 章节标题列表（不重复）
+        """
+        if domain_name:
+            return list(dict.fromkeys(chapter['title'] for chapter in self.chapters(domain_name)))
+        if self.all_aligned():
+            chapters_by_index = {}
+            for name in self.domains():
+                for chapter in self.chapters(name):
+                    chapters_by_index.setdefault(chapter['index'], chapter)
+            return list(dict.fromkeys(chapters_by_index[index]['title'] for index in sorted(chapters_by_index)))
+        return list(dict.fromkeys(chapter['title'] for name in self.domains() for chapter in self.chapters(name)))
+
+    def lookup(self, title, with_content=True):
+        """获取章节在各域名中的数据
+
+        Args:
+            title (str): 章节标题
+            with_content (bool): 是否读取正文；为False时只返回标题、哈希等字段（不读取记录文件和 blobs）
+
+        Returns:
+            dict: {域名名称: 章节数据}，同一域名有重名章节时取第一个
+        """
+        if self.by_title is None:
+            self.by_title = defaultdict(dict)
+            for name in self.domains():
+                for chapter in self.chapters(name):
+                    self.by_title[chapter['title']].setdefault(name, chapter)
+        domain_data = {}
+        for name, chapter in self.by_title.get(title, {}).items():
+            if with_content and 'content' not in chapter:
+                if 'offset' in chapter:
+                    chapter = self._record_file(name).read(chapter)
+                if 'content' not in chapter:
+                    content = self.blobs.get(chapter['content_hash'])
+                    if content is None:
+                        continue  # 正文文件缺失
+                    chapter = dict(chapter, content=content)
+            domain_data[name] = chapter
+        return domain_data
+
+    def read_chapters(self, domain_name):
+        """按保存顺序逐章读取域名的章节（含正文），用于把数据转存到其他存储
+
+        Args:
+            domain_name (str): 域名名称
+
+        Yields:
+            dict: 章节数据（正文文件缺失的去重章节会被跳过）
+        """
+        record_file = self._record_file(domain_name)
+        for chapter in record_file.records() if record_file else self.chapters(domain_name):
+            if 'content' not in chapter:
+                content = self.blobs.get(chapter['content_hash'])
+                if content is None:
+                    continue
+                chapter = dict(chapter, content=content)
+            yield chapter
+
+    def close(self):
+        """释放读入的章节数据"""
+        self.cache.clear()
+        self.record_files.clear()
+        self.by_title = None
+
+
+class ChapterStore:
+    """SQLite章节存储
+
+    每部小说一个数据库文件，各域名的章节按 (域名, 章节索引) 保存为一行，标题上建有索引。
+    章节获取后立即写入；比对和合成逐章按标题查询，不再把所有域名的全文同时读入内存。
+    """
+
+    # 逐块读取章节时每次取出的行数
+    FETCH_SIZE = 100
+
+    def __init__(self, path):
+        """打开（或创建）章节数据库
+
+        Args:
+            path (str): 数据库文件路径
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS chapters (
+                    domain TEXT NOT NULL,
+                    chapter_index INTEGER NOT NULL,
+                    title TEXT NOT NULL,
+                    url TEXT,
+                    content TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    aligned INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (domain, chapter_index)
+                )""")
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_chapters_title ON chapters (title)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_chapters_url ON chapters (domain, url)')
+            self.conn.commit()
+
+    def _insert(self, domain_name, index, title, content, url=None, aligned=False):
+        """写入一个章节（调用方持有锁并负责提交）
+
+        同一域名已有相同URL的章节时原位更新内容；index为None时追加到该域名末尾。
+        """
+        content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+        if url:
+            row = self.conn.execute('SELECT chapter_index FROM chapters WHERE domain = ? AND url = ?',
+                                    (domain_name, url)).fetchone()
+            if row and (index is None or row[0] == index):
+                self.conn.execute('UPDATE chapters SET title = ?, content = ?, content_hash = ?, aligned = ? '
+                                  'WHERE domain = ? AND chapter_index = ?',
+                                  (title, content, content_hash, int(aligned), domain_name, row[0]))
+                return
+            if row:
+                self.conn.execute('DELETE FROM chapters WHERE domain = ? AND chapter_index = ?', (domain_name, row[0]))
+        if index is None:
+            index = self.conn.execute('SELECT COALESCE(MAX(chapter_index) + 1, 0) FROM chapters WHERE domain = ?',
+                                      (domain_name,)).fetchone()[0]
+        self.conn.execute('INSERT OR REPLACE INTO chapters (domain, chapter_index, title, url, content, content_hash, aligned) '
+                          'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                          (domain_name, index, title, url, content, content_hash, int(aligned)))
+
+    def add(self, domain_name, index, title, content, url=None, aligned=False):
+        """写入一个章节并立即提交
+
+        Args:
+            domain_name (str): 域名名称
+            index (int): 章节索引，为None时追加到末尾
+            title (str): 章节标题
+            content (str): 章节内容
+            url (str, optional): 章节URL
+            aligned (bool): 索引是否为跨域名对齐的索引
+        """
+        with self.lock:
+            self._insert(domain_name, index, title, content, url, aligned)
+            self.conn.commit()
+
+    def save(self, domain_name, rows, append=False):
+        """分批保存域名的章节
+
+        每批章节在锁外从 rows 中取出（生成器取出章节时可能读取日志、写文本文件），只在写入时持有锁，
+        保存一个域名的整本书时不会长时间阻塞其他域名的写入。
+
+        Args:
+            domain_name (str): 域名名称
+            rows (iterable): (章节索引或None, 标题, 内容, URL, 是否对齐索引)
+            append (bool): 是否保留已有章节（更新模式）；否则先清空该域名的章节
+        """
+        if not append:
+            self.clear(domain_name)
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, self.FETCH_SIZE))
+            if not batch:
+                return
+            with self.lock:
+                for index, title, content, url, aligned in batch:
+                    self._insert(domain_name, index, title, content, url, aligned)
+                self.conn.commit()
+
+    def clear(self, domain_name):
+        """删除域名的全部章节
+
+        Args:
+            domain_name (str): 域名名称
+        """
+        with self.lock:
+            self.conn.execute('DELETE FROM chapters WHERE domain = ?', (domain_name,))
+            self.conn.commit()
+
+    def next_index(self, domain_name):
+        """获取域名下一个章节的索引
+
+        Args:
+            domain_name (str): 域名名称
+
+        Returns:
+            int: 当前最大索引加一
+        """
+        with self.lock:
+            return self.conn.execute('SELECT COALESCE(MAX(chapter_index) + 1, 0) FROM chapters WHERE domain = ?',
+                                     (domain_name,)).fetchone()[0]
+
+    def domains(self):
+        """获取有章节数据的域名
+
+        Returns:
+            list: 按名称排序的域名名称列表
+        """
+        with self.lock:
+            return [row[0] for row in self.conn.execute('SELECT DISTINCT domain FROM chapters ORDER BY domain')]
+
+    @staticmethod
+    def _row_to_chapter(row):
+        """将查询结果行转换为与 _chapters.json 相同结构的章节数据（未查询正文时不含 content）"""
+        index, title, url, content, content_hash, aligned = row
+        chapter = {'title': title, 'content': content, 'content_hash': content_hash}
+        if content is None:
+            del chapter['content']
+        if url:
+            chapter['url'] = url
+        if aligned:
+            chapter['index'] = index
+        return chapter
+
+    def chapters(self, domain_name):
+        """按章节索引顺序逐块读取域名的章节
+
+        Args:
+            domain_name (str): 域名名称
+
+        Yields:
+            dict: 章节数据（与 _chapters.json 中的结构相同）
+        """
+        last_index = -1
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    'SELECT chapter_index, title, url, content, content_hash, aligned FROM chapters '
+                    'WHERE domain = ? AND chapter_index > ? ORDER BY chapter_index LIMIT ?',
+                    (domain_name, last_index, self.FETCH_SIZE)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_chapter(row)
+            last_index = rows[-1][0]
+
+    def all_aligned(self):
+        """判断章节是否都带有跨域名对齐的索引（跨域名调度保存的数据）
+
+        Returns:
+            bool: 是否都带有对齐索引
+        """
+        with self.lock:
+            total, aligned = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(aligned), 0) FROM chapters').fetchone()
+        return total > 0 and total == aligned
+
+    def titles(self, domain_name=None):
+        """获取章节标题顺序
+
+        Args:
+            domain_name (str, optional): 只取该域名的章节；为空时取所有域名章节的并集，按最小章节索引排序
+
+        Returns:
+            list: 章节标题列表（不重复）
+        """
+        with self.lock:
+            if domain_name:
+                rows = self.conn.execute('SELECT title FROM chapters WHERE domain = ? ORDER BY chapter_index',
+                                         (domain_name,))
+            else:
+                rows = self.conn.execute('SELECT title FROM chapters GROUP BY title ORDER BY MIN(chapter_index)')
+            return list(dict.fromkeys(row[0] for row in rows))
+
+    def lookup(self, title, with_content=True):
+        """按标题索引查询章节在各域名中的数据
+
+        Args:
+            title (str): 章节标题
+            with_content (bool): 是否查询正文；为False时只返回标题、哈希等字段
+
+        Returns:
+            dict: {域名名称: 章节数据}，同一域名有重名章节时取第一个
+        """
+        content_column = 'content' if with_content else 'NULL'
+        with self.lock:
+            rows = self.conn.execute(
+                f'SELECT domain, chapter_index, title, url, {content_column}, content_hash, aligned FROM chapters '
+                'WHERE title = ? ORDER BY domain, chapter_index', (title,)).fetchall()
+        result = {}
+        for row in rows:
+            if row[0] not in result:
+                result[row[0]] = self._row_to_chapter(row[1:])
+        return result
+
+    def export(self, domain_name, txt_file, json_file, compression=None):
+        """将域名的章节导出为原有的 txt 和 _chapters.json 格式（逐章写出）
+
+        Args:
+            domain_name (str): 域名名称
+            txt_file (str): 文本文件路径
+            json_file (str): JSON文件路径
+            compression (str, optional): 压缩格式（'gzip' 或 'zstd'），文件路径需带有对应后缀
+
+        Returns:
+            int: 导出的章节数
+        """
+        count = 0
+        with open_data_file(txt_file, 'w', compression) as txt, open_data_file(json_file, 'w', compression) as f:
+            f.write('[')
+            for chapter in self.chapters(domain_name):
+                txt.write(f"{chapter['title']}\n")
+                txt.write("=" * 50 + "\n")
+                txt.write(f"{chapter['content']}\n\n")
+                # 与 json.dump(..., indent=2) 的输出格式一致
+                item = json.dumps(chapter, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+                f.write(('\n  ' if count == 0 else ',\n  ') + item)
+                count += 1
+            f.write('\n]' if count else ']')
+        return count
+
+    def close(self):
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
+
+
+class CrawlJournal:
+    """章节级断点续爬日志（同时是章节记录文件）
+
+    每个 (小说, 域名) 对应一个追加写入的 JSON Lines 文件，每获取一个章节立即写入一行，
+    进程中途退出时已获取的章节不会丢失。日志在内存中只保留每个章节记录的偏移量，
+    爬取结束后按章节顺序逐条读回记录写出最终文件，内存占用与小说长度基本无关。
+    使用SQLite存储时章节同时写入章节数据库。
+    """
+
+    def __init__(self, path, store=None, domain_name=None, index_offset=0):
+        """初始化日志
+
+        Args:
+            path (str): 日志文件路径
+            store (ChapterStore, optional): 同时写入的章节数据库
+            domain_name (str, optional): 章节数据库中的域名名称
+            index_offset (int): 写入章节数据库时章节索引的偏移（更新模式下接在已有章节之后）
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.store = store
+        self.domain_name = domain_name
+        self.index_offset = index_offset
+        self.offsets = {}  # {章节URL: (记录偏移, 记录长度)}
+
+    def load(self):
+        """读取日志中已记录的章节（不含正文，正文通过 read 按需读取）
+
+        Returns:
+            dict: {章节URL: {'index': 索引, 'url': URL, 'title': 标题, 'length': 正文长度}}
+        """
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        offset = 0
+        with open(self.path, 'rb+') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # 进程中断时最后一行可能不完整，截掉后再继续追加
+                    f.truncate(offset)
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    offset += len(line)
+                    continue
+                records[record['url']] = {'index': record['index'], 'url': record['url'],
+                                          'title': record['title'], 'length': len(record['content'])}
+                self.offsets[record['url']] = (offset, len(line))
+                offset += len(line)
+        return records
+
+    def append(self, index, url, title, content):
+        """追加一个章节记录
+
+        Args:
+            index (int): 章节在章节列表中的索引
+            url (str): 章节URL
+            title (str): 章节标题
+            content (str): 章节内容
+        """
+        data = (json.dumps({'index': index, 'url': url, 'title': title, 'content': content}, ensure_ascii=False) + '\n').encode('utf-8')
+        with self.lock:
+            with open(self.path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+                f.flush()
+            self.offsets[url] = (offset, len(data))
+        if self.store is not None:
+            self.store.add(self.domain_name, self.index_offset + index, title, content, url)
+
+    def read(self, url):
+        """按偏移量读取一个章节记录
+
+        Args:
+            url (str): 章节URL
+
+        Returns:
+            dict: 章节记录 {'index', 'url', 'title', 'content'}，日志中没有该章节时返回None
+        """
+        position = self.offsets.get(url)
+        if position is None:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(position[0])
+            return json.loads(f.read(position[1]))
+
+    def reset(self):
+        """清空日志，重新开始记录"""
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.offsets.clear()
+
+    def remove(self):
+        """删除日志文件（章节已全部保存后调用）"""
+        self.reset()
+
+
+class ChapterScheduler:
+    """跨域名章节调度器
+
+    以对齐后的章节索引为键维护工作队列：每个章节默认只从一个域名获取，
+    由空闲且平均响应最快的健康域名优先领取；按验证配额抽中的章节，以及首个副本校验失败的章节，
+    才会再从其他域名获取副本。
+    每个域名有一个候选章节索引的小顶堆，领取任务时只弹出已完成、已尝试或正在获取的章节，
+    不会每次从头扫描整个工作队列；正在获取的章节失败后重新放回尚未尝试它的域名的堆中。
+    """
+
+    def __init__(self, aligned_chapters, verify_ratio=0.0, max_failures=5, latency_alpha=0.3):
+        """初始化调度器
+
+        Args:
+            aligned_chapters (list): 对齐后的章节列表，每个元素为 {域名: 章节链接信息}
+            verify_ratio (float): 验证配额，0-1之间，抽中的章节额外从另一个域名获取一份副本
+            max_failures (int): 域名连续失败多少次后标记为不健康，不再分配任务
+            latency_alpha (float): 响应时间指数移动平均的平滑系数
+        """
+        self.aligned_chapters = aligned_chapters
+        self.max_failures = max_failures
+        self.latency_alpha = latency_alpha
+        self.lock = threading.Lock()
+
+        count = len(aligned_chapters)
+        self.copies_needed = []
+        for i, sources in enumerate(aligned_chapters):
+            # 按比例均匀抽取验证章节，例如 0.1 表示每10章抽1章
+            verify = int((i + 1) * verify_ratio) > int(i * verify_ratio)
+            self.copies_needed.append(min(2 if verify else 1, len(sources)))
+        self.copies = [0] * count
+        self.in_flight = [0] * count
+        self.tried = [set() for _ in range(count)]
+        self.open_indices = {i for i in range(count) if self.copies_needed[i] > 0}
+        self.completed = 0
+        # {域名: 该域名可领取的章节索引堆}，按索引顺序生成的列表本身就是合法的堆
+        self.candidates = defaultdict(list)
+        for i, sources in enumerate(aligned_chapters):
+            if i in self.open_indices:
+                for domain in sources:
+                    self.candidates[domain].append(i)
+
+        self.latency = {}
+        self.consecutive_failures = defaultdict(int)
+        self.unhealthy = set()
+        self.stats = defaultdict(lambda: {'fetched': 0, 'failed': 0})
+
+    def rank_domains(self, domains):
+        """按平均响应时间从快到慢排序域名（尚无数据的域名优先试探）
+
+        Args:
+            domains (iterable): 域名集合
+
+        Returns:
+            list: 排序后的健康域名列表
+        """
+        with self.lock:
+            healthy = [domain for domain in domains if domain not in self.unhealthy]
+            return sorted(healthy, key=lambda domain: self.latency.get(domain, 0.0))
+
+    def next_task(self, domain):
+        """为空闲域名领取下一个章节任务
+
+        Args:
+            domain (str): 域名
+
+        Returns:
+            tuple: (章节索引, 章节链接信息)，没有可领取的任务时返回None
+        """
+        with self.lock:
+            if domain in self.unhealthy:
+                return None
+            heap = self.candidates.get(domain)
+            while heap:
+                index = heapq.heappop(heap)
+                # 已移出队列或已尝试过的章节不会再由该域名获取；已有足够副本在获取中的章节在其失败时重新放回
+                if (index in self.open_indices and domain not in self.tried[index] and
+                        self.copies[index] + self.in_flight[index] < self.copies_needed[index]):
+                    self.tried[index].add(domain)
+                    self.in_flight[index] += 1
+                    return index, self.aligned_chapters[index][domain]
+            return None
+
+    def complete(self, domain, index, valid, elapsed):
+        """记录一个章节任务的结果
+
+        Args:
+            domain (str): 域名
+            index (int): 章节索引
+            valid (bool): 获取的内容是否通过校验
+            elapsed (float): 请求耗时（秒）
+        """
+        with self.lock:
+            self.in_flight[index] -= 1
+            previous = self.latency.get(domain)
+            self.latency[domain] = elapsed if previous is None else (
+                self.latency_alpha * elapsed + (1 - self.latency_alpha) * previous)
+
+            if valid:
+                self.copies[index] += 1
+                if self.copies[index] == 1:
+                    self.completed += 1
+                self.consecutive_failures[domain] = 0
+                self.stats[domain]['fetched'] += 1
+            else:
+                self.consecutive_failures[domain] += 1
+                self.stats[domain]['failed'] += 1
+                if self.consecutive_failures[domain] >= self.max_failures:
+                    self.unhealthy.add(domain)
+
+            self._refresh(index)
+            if not valid and index in self.open_indices:
+                # 副本获取失败，章节重新回到尚未尝试它的域名的候选堆中
+                for other in self.aligned_chapters[index]:
+                    if other not in self.tried[index] and other not in self.unhealthy:
+                        heapq.heappush(self.candidates[other], index)
+
+    def _refresh(self, index):
+        """章节已满足副本数，或再无可用域名时移出工作队列（调用方需持有锁）"""
+        if index not in self.open_indices:
+            return
+        if self.copies[index] >= self.copies_needed[index]:
+            self.open_indices.discard(index)
+            return
+        remaining = [domain for domain in self.aligned_chapters[index]
+                     if domain not in self.tried[index] and domain not in self.unhealthy]
+        if not remaining and self.in_flight[index] == 0:
+            self.open_indices.discard(index)
+
+    def completed_count(self):
+        """已至少获取到一份副本的章节数
+
+        Returns:
+            int: 章节数
+        """
+        with self.lock:
+            return self.completed
+
+
+class NovelCrawler:
+    """小说爬虫类"""
+    
+    # 章节标题的选择器（按优先级排列）
+    TITLE_SELECTORS = [
+        'h1.wap_none',
+        'h1',
+        '.title',
+        '.chapter-title',
+        '.book-title',
+        'h2',
+        'h3'
+    ]
+    
+    # 章节正文容器的选择器（按优先级排列）
+    CONTENT_SELECTORS = [
+        '#chaptercontent',
+        '.content',
+        '.chapter-content',
+        '.text-content',
+        '#content',
+        '.txt',
+        '.book-content',
+        '.read-content',
+        'div[class*="content"]',
+        'div[id*="content"]'
+    ]
+    
+    # 与上面选择器等价的预编译XPath，供lxml解析引擎使用
+    if etree is not None:
+        TITLE_XPATHS = {selector: etree.XPath(css_to_xpath(selector)) for selector in TITLE_SELECTORS}
+        CONTENT_XPATHS = {selector: etree.XPath(css_to_xpath(selector)) for selector in CONTENT_SELECTORS}
+        # 流式解析时按元素判断是否匹配选择器
+        TITLE_MATCHERS = {selector: css_element_matcher(selector) for selector in TITLE_SELECTORS}
+        CONTENT_MATCHERS = {selector: css_element_matcher(selector) for selector in CONTENT_SELECTORS}
+        # 元素内的可见文本（与BeautifulSoup的get_text一致，不含脚本、样式和注释）
+        TEXT_XPATH = etree.XPath('.//text()[not(ancestor::script or ancestor::style or ancestor::template)]')
+    
+    # 流式解析每次送入解析器的字符数
+    PARTIAL_PARSE_CHUNK = 4096
+    
+    # 目录分页的最大页数和并发获取数
+    MAX_INDEX_PAGES = 100
+    INDEX_PAGE_WORKERS = 4
+    
+    # 目录分页链接：位于分页容器（class或id匹配）中，或链接文字为翻页文字
+    PAGINATION_CONTAINER_PATTERN = re.compile(r'page|pagination|fenye', re.I)
+    PAGINATION_LINK_TEXTS = {'上一页', '下一页', '首页', '尾页', '末页', '上页', '下页'}
+    
+    # 章节列表页中章节链接的href模式
+    CHAPTER_LINK_PATTERNS = [
+        r'/index/\d+/\d+\.html',  # bqgam.com 模式
+        r'/book/\d+/\d+\.html',   # 675m.com 模式
+        r'/\d+/\d+\.html',        # 通用模式
+    ]
+    
+    # 在浏览器内判断正文是否已填充：标题不再是"加载中"，且任一正文容器已有实际内容
+    CONTENT_READY_SCRIPT = """
+        if (document.title.indexOf('加载中') !== -1) { return false; }
+        var selectors = arguments[0];
+        for (var i = 0; i < selectors.length; i++) {
+            var elem = document.querySelector(selectors[i]);
+            if (elem) {
+                var text = (elem.textContent || '').trim();
+                if (text.length > 50 && text.indexOf('加载中') === -1) { return true; }
+            }
+        }
+        return false;
+    """
+    
+    def __init__(self, domains_file='all_domains.json', output_dir='novel_output', use_selenium=True, reference_sources=None):
+        """初始化爬虫
+        
+        Args:
+            domains_file (str): 域名配置文件路径
+            output_dir (str): 输出目录
+            use_selenium (bool): 是否使用Selenium
+            reference_sources (list): 基准源列表，用于内容合并时的优先级设置
+        """
+        self.domains_file = domains_file
+        self.output_dir = output_dir
+        self.domains = self.load_domains()
+        self.session = requests.Session()
+        # 每个域名独立的会话与连接池（请求头取自 self.session）
+        self.sessions = DomainSessionPool(self.session)
+        self.use_selenium = use_selenium
+        self.driver = None
+        # Selenium浏览器池：首次需要时才启动浏览器，驱动程序路径只解析一次
+        self.driver_pool = WebDriverPool()
+        self.display = CrawlDisplay()  # 添加美化显示器
+        # 按域名自适应限速，速率状态保存在域名配置文件旁
+        self.rate_limiter = DomainRateLimiter(self._state_file_path('domain_rate_state.json'))
+        # 按域名记录各章节获取方式的成功率，优先尝试成功率最高的方式
+        self.method_profiles = DomainMethodProfiles(self._state_file_path('domain_method_profiles.json'))
+        # 按域名记录生效的选择器、章节链接模式和搜索API
+        self.site_profiles = SiteProfiles(self._state_file_path('site_profiles.json'))
+        # 按域名记录的字符集直接解码响应字节，并检测乱码
+        self.charsets = CharsetDecoder(self.site_profiles)
+        # 广告清理规则（ad_rules.json）只加载、编译一次
+        self.ad_cleaner = AdCleaner()
+        
+        # 设置基准源优先级（默认值）
+        self.reference_sources = reference_sources or ['bqgam', 'biquge', '675m', 'bqg67', 'biqu10']
+        
+        # 合并策略配置
+        self.merge_config = {
+            'enable_diff_merge': True,  # 是否启用差分合并
+            'length_priority_weight': 0.6,  # 长度优先权重
+            'quality_weight': 0.4,  # 质量评估权重
+            'min_content_length': 200,  # 最小内容长度
+            'merge_threshold': 1.1,  # 合并阈值（合并后内容增长比例）
+            'similarity_threshold': 0.8  # 相似度阈值
+        }
+
+        # 爬取引擎配置
+        self.crawl_config = {
+            'engine': 'sync',  # 章节抓取引擎：sync（逐章抓取）、async（asyncio并发抓取）或 pipeline（下载与解析分离）
+            'async_concurrency': 4,  # async/pipeline引擎下每个域名同时在途的章节请求数
+            'parse_workers': 0,  # pipeline引擎的解析进程数，0表示使用CPU核心数
+            'pipeline_queue_size': 32,  # pipeline引擎中已下载、待解析页面的队列上限
+            'resume': False,  # 是否从断点续爬日志恢复，只抓取缺失的章节
+            'update': False,  # 更新模式：只抓取上次保存之后新发布的章节
+            'scheduler': 'per_domain',  # 调度方式：per_domain（每个域名各自爬取整本）或 shared（跨域名章节调度）
+            'verify_ratio': 0.0,  # shared调度下额外从第二个域名获取副本用于校验的章节比例
+            'selenium_pool_size': 2,  # Selenium浏览器池的浏览器数量上限（建议与max_workers一致）
+            'selenium_max_pages': 100,  # 单个浏览器加载多少个页面后回收重建
+            'http_cache': False,  # 是否启用 output_dir/.http_cache 磁盘HTTP缓存
+            'extractor': 'lxml',  # 章节内容解析引擎：lxml（预编译XPath）或 bs4（BeautifulSoup）
+            'partial_parse': True,  # lxml引擎下已知站点选择器时只流式解析到正文容器为止
+            'search_api_ttl': 7 * 24 * 3600  # 记录的搜索API有效期（秒），过期后重新从搜索页查找
+        }
+        self.http_cache = None
+        
+        # 章节存储配置
+        self.storage_config = {
+            'backend': 'json',  # 章节存储：json（每个域名一个 _chapters.json）、jsonl（每个域名一个按行保存的 _chapters.jsonl 和偏移索引）或 sqlite（每部小说一个 chapters.db）
+            'dedupe': False,  # json/jsonl存储下正文按哈希只在小说目录的 blobs 中保存一份，章节数据只记录哈希
+            'compression': None  # 章节文本、_chapters.json 和合成文本的压缩格式：None（沿用已保存文件的格式）、'none'、'gzip' 或 'zstd'
+        }
+        self.chapter_stores = {}
+        self.chapter_stores_lock = threading.Lock()
+        
+        # pipeline引擎的解析进程池（首次使用时创建）和各域名的分阶段统计
+        self.parse_pool = None
+        self.parse_pool_lock = threading.Lock()
+        self.pipeline_stats = {}
+        
+        # 更新模式下各小说新增的章节标题 {小说名称: 章节标题集合}
+        self.updated_chapters = {}
+        self.update_lock = threading.Lock()
+
+        # 设置请求头，模拟浏览器
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1'
+        })
+        
+        # 创建输出目录
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+    
+    def configure_merge_strategy(self, **kwargs):
+        """配置合并策略参数
+        
+        Args:
+            **kwargs: 合并策略配置参数
+                - reference_sources: 基准源列表
+                - enable_diff_merge: 是否启用差分合并
+                - length_priority_weight: 长度优先权重
+                - quality_weight: 质量评估权重
+                - min_content_length: 最小内容长度
+                - merge_threshold: 合并阈值
+                - similarity_threshold: 相似度阈值
+        """
+        if 'reference_sources' in kwargs:
+            self.reference_sources = kwargs['reference_sources']
+            
+        for key, value in kwargs.items():
+            if key in self.merge_config:
+                self.merge_config[key] = value
+                
+        print(f"合并策略已更新: {kwargs}")
+
+    def configure_crawl(self, **kwargs):
+        """配置爬取引擎参数
+
+        Args:
+            **kwargs: 爬取配置参数
+                - engine: 章节抓取引擎 ('sync'、'async' 或 'pipeline')
+                - async_concurrency: async/pipeline引擎下每个域名的并发请求数
+                - parse_workers: pipeline引擎的解析进程数（0为CPU核心数）
+                - pipeline_queue_size: pipeline引擎待解析页面队列的上限
+                - resume: 是否从断点续爬日志恢复
+                - update: 是否只抓取新发布的章节
+                - scheduler: 调度方式 ('per_domain' 或 'shared')
+                - verify_ratio: shared调度下的验证副本比例
+                - selenium_pool_size: Selenium浏览器池的浏览器数量上限
+                - selenium_max_pages: 单个浏览器回收前加载的页面数
+                - http_cache: 是否启用磁盘HTTP缓存
+                - extractor: 章节内容解析引擎 ('lxml' 或 'bs4')
+                - partial_parse: 是否按站点配置流式解析到正文容器为止
+                - search_api_ttl: 记录的搜索API有效期（秒）
+        """
+        for key, value in kwargs.items():
+            if key in self.crawl_config:
+                self.crawl_config[key] = value
+        self.driver_pool.max_size = max(1, self.crawl_config['selenium_pool_size'])
+        self.driver_pool.max_pages = max(1, self.crawl_config['selenium_max_pages'])
+        # 在发出请求前按并发数设置每个域名的连接池大小
+        self.sessions.resize(max(10, self.crawl_config['async_concurrency'], self.crawl_config['selenium_pool_size']))
+
+    def configure_storage(self, **kwargs):
+        """配置章节存储参数
+
+        Args:
+            **kwargs: 存储配置参数
+                - backend: 章节存储 ('json'、'jsonl' 或 'sqlite')
+                - dedupe: 是否按内容哈希去重保存正文（json和jsonl存储）
+                - compression: 压缩格式 (None、'none'、'gzip' 或 'zstd')，None 时沿用已保存文件的格式
+        """
+        for key, value in kwargs.items():
+            if key in self.storage_config:
+                self.storage_config[key] = value
+        if self.storage_config['compression'] == 'zstd' and zstandard is None:
+            print("未安装zstandard，改用gzip压缩")
+            self.storage_config['compression'] = 'gzip'
+
+    def _data_compression(self, path):
+        """获取保存数据文件时使用的压缩格式
+
+        未指定压缩格式时沿用该文件已保存的格式（没有已保存的文件时不压缩），
+        这样不带 --compression 的更新和重新合成不会把压缩文件改写为未压缩文件。
+
+        Args:
+            path (str): 未压缩时的文件路径
+
+        Returns:
+            str: 压缩格式（'gzip' 或 'zstd'），不压缩时返回None
+        """
+        compression = self.storage_config['compression']
+        if compression is None:
+            return saved_compression(path)
+        return None if compression == 'none' else compression
+
+    def _state_file_path(self, filename):
+        """获取与域名配置文件同目录的状态文件路径
+
+        Args:
+            filename (str): 状态文件名
+
+        Returns:
+            str: 状态文件路径
+        """
+        return os.path.join(os.path.dirname(os.path.abspath(self.domains_file)), filename)
+
+    def _http_get(self, domain, url, **kwargs):
+        """发送经过域名限速的GET请求，并将结果反馈给限速器
+
+        Args:
+            domain (str): 请求所属的域名（限速维度）
+            url (str): 请求URL
+            **kwargs: 传给 requests 的其他参数
+
+        Returns:
+            requests.Response: 响应对象
+        """
+        self.rate_limiter.acquire(domain)
+        try:
+            response = self.sessions.get(domain).get(url, **kwargs)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            self.rate_limiter.report(domain, error=e)
+            raise
+        self.rate_limiter.report(domain, response.status_code, retry_after=response.headers.get('Retry-After'))
+        return response
+
+    def _get_http_cache(self):
+        """获取磁盘HTTP缓存（未启用时返回None）
+
+        Returns:
+            HttpCache: 位于 output_dir/.http_cache 的缓存
+        """
+        if not self.crawl_config['http_cache']:
+            return None
+        cache_dir = os.path.join(self.output_dir, '.http_cache')
+        if self.http_cache is None or self.http_cache.cache_dir != cache_dir:
+            self.http_cache = HttpCache(cache_dir)
+        return self.http_cache
+
+    def _http_get_revalidated(self, domain, url, **kwargs):
+        """发送带缓存重新验证的GET请求（用于会更新的章节列表页）
+
+        有缓存时附带 If-None-Match / If-Modified-Since 请求头，服务器返回304时使用缓存正文。
+
+        Args:
+            domain (str): 请求所属的域名
+            url (str): 请求URL
+            **kwargs: 传给 requests 的其他参数
+
+        Returns:
+            requests.Response: 响应对象
+        """
+        cache = self._get_http_cache()
+        if cache is None:
+            return self._http_get(domain, url, **kwargs)
+        
+        cached = cache.load(url)
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(cache.conditional_headers(cached))
+        response = self._http_get(domain, url, headers=headers, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            cache.count('revalidated')
+            cache.count('hits')
+            return cached
+        cache.count('misses')
+        cache.store(url, response)
+        return response
+
+    def get_connection_stats(self):
+        """获取各域名连接池的复用统计
+
+        Returns:
+            dict: {域名: {'requests': 请求数, 'connections': 新建连接数, 'reuse_ratio': 连接复用比例}}
+        """
+        return self.sessions.get_stats()
+
+    def get_charset_stats(self):
+        """获取各域名的字符集与解码统计
+
+        Returns:
+            dict: {域名: {'charset': 字符集, 'responses': 解码次数, 'bytes': 字节数,
+                   'decode_time': 解码总耗时（秒）, 'mojibake': 乱码次数, 'refetched': 乱码重新获取次数}}
+        """
+        return self.charsets.get_stats()
+
+    def get_pipeline_stats(self, domain=None):
+        """获取pipeline引擎各域名的分阶段统计
+
+        Args:
+            domain (str, optional): 域名，为空时返回所有域名
+
+        Returns:
+            dict: {域名: 统计}，统计包括下载/解析页数与耗时、回退页数、队列满等待时间和总耗时
+        """
+        if domain:
+            return dict(self.pipeline_stats.get(domain, {}))
+        return {domain: dict(stats) for domain, stats in self.pipeline_stats.items()}
+
+    def get_method_stats(self, domain=None):
+        """获取各域名章节获取方式的成功/失败计数
+
+        Args:
+            domain (str, optional): 域名，为空时返回所有域名
+
+        Returns:
+            dict: {方式: {'success': 成功次数, 'failure': 失败次数}}，未指定域名时按域名分组
+        """
+        return self.method_profiles.get_stats(domain)
+
+    def load_domains(self):
+        """加载域名配置文件
+        
+        Returns:
+            list: 域名列表
+        """
+        try:
+            with open(self.domains_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return data.get('domains', [])
+        except Exception as e:
+            print(f"加载域名配置文件失败: {e}")
+            return []
+    
+    def search_novel_single_domain(self, domain, keyword):
+        """在单个域名中搜索小说
+        
+        Args:
+            domain (str): 域名
+            keyword (str): 搜索关键字
+            
+        Returns:
+            tuple: (域名, 搜索结果列表)
+        """
+        # 优先使用站点配置中有效期内的搜索API，跳过搜索页解析和hm.html请求，只需一次请求
+        api_template = self.site_profiles.get_fresh(domain, 'search_api', self.crawl_config['search_api_ttl'])
+        if api_template:
+            search_results = self._search_by_api(domain, keyword, api_template.replace('{keyword}', quote(keyword)), warmup=False)
+            if search_results is not None:
+                return domain, search_results
+            # 记录的搜索API已失效，重新从搜索页查找
+            self.site_profiles.forget(domain, 'search_api')
+        
+        try:
+            # 构建搜索URL
+            search_url = f"{domain.rstrip('/')}/s?q={quote(keyword)}"
+            print(f"尝试搜索: {search_url}")
+            
+            response = self._http_get(domain, search_url, timeout=10)
+            response.raise_for_status()
+            
+            # 解析搜索结果
+            soup = BeautifulSoup(self.charsets.decode(domain, response)[0], 'html.parser')
+            
+            # 查找搜索结果的JavaScript代码
+            scripts = soup.find_all('script')
+            for script in scripts:
+                if script.string and 'loadmore' in script.string:
+                    # 尝试获取搜索API
+                    api_match = re.search(r'\$.getJSON\("([^"]+)"', script.string)
+                    if api_match:
+                        api_url = api_match.group(1)
+                        if not api_url.startswith('http'):
+                            api_url = urljoin(domain, api_url)
+                        
+                        # 确保API URL包含搜索关键字
+                        if '?q=' in api_url and not api_url.endswith('?q='):
+                            # API URL已经包含完整的查询参数
+                            pass
+                        elif '?q=' in api_url and api_url.endswith('?q='):
+                            # API URL缺少查询关键字，添加关键字
+                            api_url += quote(keyword)
+                        else:
+                            # API URL不包含查询参数，添加完整的查询参数
+                            separator = '&' if '?' in api_url else '?'
+                            api_url += f"{separator}q={quote(keyword)}"
+                        
+                        search_results = self._search_by_api(domain, keyword, api_url)
+                        if search_results is not None:
+                            # 搜索API可用，记录为带关键字占位符的模板
+                            api_template = api_url.replace(quote(keyword), '{keyword}')
+                            if '{keyword}' in api_template:
+                                self.site_profiles.learn(domain, 'search_api', api_template)
+                            if search_results:
+                                return domain, search_results
             
-            print(f"获取章节列表: {full_url}")
+        except Exception as e:
+            print(f"搜索 {domain} 失败: {e}")
+        
+        return domain, []
+    
+    def _search_by_api(self, domain, keyword, api_url, warmup=True):
+        """调用搜索API获取搜索结果
+        
+        Args:
+            domain (str): 域名
+            keyword (str): 搜索关键字
+            api_url (str): 已填入关键字的搜索API地址
+            warmup (bool): 是否先按网站的搜索流程请求hm.html
             
-            response = self.session.get(full_url, timeout=10)
-            response.raise_for_status()
+        Returns:
+            list: 搜索结果列表（可能为空）；API请求失败或返回的不是JSON列表时返回None
+        """
+        if warmup:
+            # 先调用hm.html API（根据网站的搜索逻辑）
+            hm_url = urljoin(domain, f"/user/hm.html?q={quote(keyword)}")
+            try:
+                self._http_get(domain, hm_url, timeout=10)
+            except:
+                pass  # hm.html可能不存在，继续执行
+        
+        # 调用搜索API
+        try:
+            api_response = self._http_get(domain, api_url, timeout=10)
+            if api_response.status_code != 200:
+                return None
+            search_results = api_response.json()
+        except (requests.RequestException, ValueError):
+            return None
+        
+        if not isinstance(search_results, list):
+            return None
+        if search_results:
+            print(f"在 {domain} 找到 {len(search_results)} 个结果")
+        return search_results
+    
+    def search_novel_all_domains(self, keyword, max_workers=3):
+        """在所有域名中并行搜索小说
+        
+        Args:
+            keyword (str): 搜索关键字
+            max_workers (int): 最大并发数
+            
+        Returns:
+            dict: {域名: 搜索结果列表}
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # 提交所有搜索任务
+            future_to_domain = {
+                executor.submit(self.search_novel_single_domain, domain, keyword): domain 
+                for domain in self.domains
+            }
+            
+            # 收集结果
+            for future in as_completed(future_to_domain):
+                domain, search_results = future.result()
+                domain_name = self.get_domain_name(domain)
+                if search_results:
+                    results[domain] = search_results
+                    self.display.print_search_result(domain_name, len(search_results))
+                else:
+                    print(f"    ❌ {domain_name} - 未找到结果")
+        
+        return results
+    
+    def _select_consensus_book(self, keyword, all_search_results):
+        """在各域名的搜索结果中选出同一本书
+        
+        各域名的候选结果按规范化后的书名分组（作者不一致的视为不同的书），每组得分为各域名中
+        该书最佳候选的得分之和：书名与关键字越接近、在搜索结果中越靠前得分越高，作者与关键字一致时加分。
+        因此被更多域名收录且与关键字更匹配的书胜出，只有收录了这本书的域名参与爬取。
+        
+        Args:
+            keyword (str): 搜索关键字
+            all_search_results (dict): {域名: 搜索结果列表}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+        Returns:
+            dict: {域名: 搜索结果列表}，只包含收录了选中书籍的域名，选中的结果排在第一位
+        """
+        def normalize(text):
+            text = str(text or '').lower()
+            text = re.sub(r'[（(【\[].*?[）)】\]]', '', text)  # 去掉"（全本）"之类的标注
+            return re.sub(r'[\s\W_]+', '', text)
+        
+        normalized_keyword = normalize(keyword)
+        
+        def score(result, position):
+            title = normalize(result.get('articlename'))
+            if title == normalized_keyword:
+                relevance = 1.0
+            elif normalized_keyword and (normalized_keyword in title or title in normalized_keyword):
+                relevance = 0.8
+            else:
+                relevance = 0.5 * SequenceMatcher(None, title, normalized_keyword).ratio()
+            if normalized_keyword and normalize(result.get('author')) == normalized_keyword:
+                relevance += 0.5
+            return relevance + 0.2 / (1 + position)
+        
+        # 按书名分组，组内记录各域名的最佳候选 {书名: {作者: {域名: (得分, 位置)}}}
+        books = defaultdict(lambda: defaultdict(dict))
+        for domain, search_results in all_search_results.items():
+            for position, result in enumerate(search_results):
+                if not isinstance(result, dict) or not result.get('url_list'):
+                    continue
+                title = normalize(result.get('articlename'))
+                if not title:
+                    continue
+                candidate = (score(result, position), position)
+                carriers = books[title][normalize(result.get('author'))]
+                if domain not in carriers or candidate[0] > carriers[domain][0]:
+                    carriers[domain] = candidate
+        
+        best_book, best_carriers, best_score = None, {}, 0
+        for title, authors in books.items():
+            # 没有作者信息的候选并入同名书中域名最多的作者
+            unknown = authors.pop('', {})
+            for author, carriers in (authors.items() if authors else [('', {})]):
+                merged = dict(unknown)
+                merged.update(carriers)
+                total = sum(candidate[0] for candidate in merged.values())
+                if total > best_score:
+                    best_book, best_carriers, best_score = (title, author), merged, total
+        
+        if not best_book:
+            return all_search_results
+        
+        selected = {}
+        for domain, search_results in all_search_results.items():
+            if domain in best_carriers:
+                position = best_carriers[domain][1]
+                selected[domain] = [search_results[position]] + search_results[:position] + search_results[position + 1:]
+        
+        # 各域名统一使用同一个书名，保证保存到同一个小说目录并参与比对
+        chosen = selected[next(iter(selected))][0]
+        for domain in selected:
+            selected[domain][0] = dict(selected[domain][0], articlename=chosen.get('articlename', keyword))
+        author = f"（{chosen.get('author')}）" if chosen.get('author') else ''
+        print(f"  🎯 选定书籍: {chosen.get('articlename', keyword)}{author}，{len(selected)}/{len(all_search_results)} 个域名收录")
+        skipped = [self.get_domain_name(domain) for domain in all_search_results if domain not in selected]
+        if skipped:
+            print(f"  ⏭️  跳过未收录该书的域名: {', '.join(skipped)}")
+        return selected
+    
+    def get_chapter_list(self, domain, book_url):
+        """获取章节列表
+        
+        目录分页或分卷时，从第一页中找出其余目录页并发获取；同一章节出现多次时（如顶部的"最新章节"）
+        按URL去重，保留最后一次出现的位置，即章节在完整目录中的位置。
+        
+        Args:
+            domain (str): 域名
+            book_url (str): 小说详情页URL
             
-            # 查找章节列表 - 支持多种链接模式
-            chapters = []
-            # 尝试多种章节链接模式
-            patterns = [
-                r'/index/\d+/\d+\.html',  # bqgam.com 模式
-                r'/book/\d+/\d+\.html',   # 675m.com 模式
-                r'/\d+/\d+\.html',        # 通用模式
-            ]
+        Returns:
+            list: 章节链接列表 [{'id': 章节ID, 'title': 章节标题, 'url': 章节URL}]
+        """
+        try:
+            # 构建完整URL
+            if not book_url.startswith('http'):
+                full_url = urljoin(domain, book_url)
+            else:
+                full_url = book_url
             
-            for pattern in patterns:
-                chapter_links = soup.find_all('a', href=re.compile(pattern))
-                if chapter_links:
-                    break
+            print(f"获取章节列表: {full_url}")
             
-            for link in chapter_links:
-                href = link.get('href')
-                title = link.get_text().strip()
-                if href and title:
-                    chapters.append({
-                        'title': title,
-                        'url': href
-                    })
+            response = self._http_get_revalidated(domain, full_url, timeout=10)
+            response.raise_for_status()
+            
+            soup = BeautifulSoup(self.charsets.decode(domain, response)[0], 'html.parser')
+            pages = {full_url: soup}
+            
+            # 跟随目录分页：每轮并发获取新发现的目录页，直到没有新的目录页
+            pending = self._find_index_pages(full_url, soup) - set(pages)
+            while pending and len(pages) < self.MAX_INDEX_PAGES:
+                batch = sorted(pending, key=lambda url: self._index_page_number(full_url, url))
+                batch = batch[:self.MAX_INDEX_PAGES - len(pages)]
+                with ThreadPoolExecutor(max_workers=min(self.INDEX_PAGE_WORKERS, len(batch))) as executor:
+                    for url, page_soup in zip(batch, executor.map(lambda url: self._fetch_index_page(domain, url), batch)):
+                        pages[url] = page_soup
+                
+                pending = set()
+                for url in batch:
+                    if pages[url] is not None:
+                        pending |= self._find_index_pages(full_url, pages[url])
+                pending -= set(pages)
+            
+            if len(pages) > 1:
+                failed = sum(1 for page_soup in pages.values() if page_soup is None)
+                print(f"章节目录共 {len(pages)} 页" + (f"（{failed} 页获取失败）" if failed else ""))
+            
+            # 查找章节列表 - 优先使用该域名记录的链接模式，不匹配时尝试其他模式（以第一页为准）
+            chapter_pattern = None
+            for pattern in self.site_profiles.order(domain, 'chapter_pattern', self.CHAPTER_LINK_PATTERNS):
+                if soup.find('a', href=re.compile(pattern)):
+                    self.site_profiles.learn(domain, 'chapter_pattern', pattern)
+                    chapter_pattern = re.compile(pattern)
+                    break
+            if chapter_pattern is None:
+                print(f"找到 0 个章节")
+                return []
+            
+            # 按页码顺序汇总各页的章节，按URL去重并保留最后一次出现的位置
+            chapters_by_url = {}
+            for page_url in sorted(pages, key=lambda url: self._index_page_number(full_url, url)):
+                page_soup = pages[page_url]
+                if page_soup is None:
+                    continue
+                for link in page_soup.find_all('a', href=chapter_pattern):
+                    href = link.get('href')
+                    title = link.get_text().strip()
+                    if href and title:
+                        if not href.startswith(('http', '/')):
+                            # 相对链接转换为相对域名根目录的路径
+                            href = urlparse(urljoin(page_url, href)).path
+                        chapters_by_url.pop(href, None)
+                        chapters_by_url[href] = {
+                            'id': self._chapter_id(href),
+                            'title': title,
+                            'url': href
+                        }
+            chapters = list(chapters_by_url.values())
             
             print(f"找到 {len(chapters)} 个章节")
             return chapters
@@ -562,9 +3230,131 @@ class NovelCrawler:
             print(f"获取章节列表失败: {e}")
             return []
     
+    def _fetch_index_page(self, domain, url):
+        """获取一个目录分页
+        
+        Args:
+            domain (str): 域名
+            url (str): 目录页URL
+            
+        Returns:
+            BeautifulSoup: 解析后的目录页，失败返回None
+        """
+        try:
+            response = self._http_get_revalidated(domain, url, timeout=10)
+            response.raise_for_status()
+            return BeautifulSoup(self.charsets.decode(domain, response)[0], 'html.parser')
+        except Exception as e:
+            print(f"获取目录分页失败 {url}: {e}")
+            return None
+    
+    def _find_index_pages(self, index_url, soup):
+        """从目录页中找出同一本书的其他目录分页（分页下拉框选项和分页链接）
+        
+        Args:
+            index_url (str): 目录第一页的完整URL
+            soup (BeautifulSoup): 目录页
+            
+        Returns:
+            set: 其他目录分页的完整URL
+        """
+        candidates = [option.get('value') for option in soup.select('select option')]
+        candidates += [link.get('href') for link in soup.find_all('a', href=True) if self._is_pagination_link(link)]
+        
+        pages = set()
+        for candidate in candidates:
+            if not candidate:
+                continue
+            url = urljoin(index_url, candidate).split('#')[0]
+            if url != index_url and self._is_index_page_url(index_url, url):
+                pages.add(url)
+        return pages
+    
+    def _is_pagination_link(self, link):
+        """判断链接是否是翻页链接（位于分页容器中或链接文字为翻页文字）
+        
+        Args:
+            link (Tag): <a> 标签
+            
+        Returns:
+            bool: 是否是翻页链接
+        """
+        if link.get_text(strip=True) in self.PAGINATION_LINK_TEXTS:
+            return True
+        for parent in itertools.islice(link.parents, 3):
+            attributes = ' '.join(parent.get('class') or []) + ' ' + (parent.get('id') or '')
+            if self.PAGINATION_CONTAINER_PATTERN.search(attributes):
+                return True
+        return False
+    
+    def _is_index_page_url(self, index_url, url):
+        """判断URL是否是目录第一页的分页
+        
+        分页必须以这本书自己的路径（目录页路径去掉扩展名或末尾的index页）开头，
+        同一目录下其他书的链接（如 /book/456/ 之于 /book/123.html）不算分页。
+        支持的分页形式：/book/1/index_2.html、/book/1_2/、/book/1_2.html、/book/1/2/、/book/1/?page=2
+        
+        Args:
+            index_url (str): 目录第一页的完整URL
+            url (str): 待判断的完整URL
+            
+        Returns:
+            bool: 是否是目录分页
+        """
+        base = urlparse(index_url)
+        parsed = urlparse(url)
+        if parsed.netloc != base.netloc:
+            return False
+        if parsed.path == base.path:
+            return bool(re.search(r'(?:^|&)(?:page|p)=\d+', parsed.query))
+        
+        directory, name = base.path.rsplit('/', 1)
+        if not name or re.fullmatch(r'index\.\w+', name):
+            stem, extension = directory, '/?'  # /book/1/ 或 /book/1/index.html
+        else:
+            stem, dot, suffix = name.rpartition('.')
+            stem, extension = (f"{directory}/{stem}", re.escape(f".{suffix}")) if dot else (base.path, '/?')
+        if not stem.strip('/'):
+            return False
+        
+        stem = re.escape(stem)
+        return bool(re.fullmatch(stem + r'/index[_-]?\d+\.html', parsed.path)
+                    or re.fullmatch(stem + r'_\d+' + extension, parsed.path)
+                    or re.fullmatch(stem + r'/\d+/', parsed.path))
+    
+    def _index_page_number(self, index_url, url):
+        """获取目录分页的页码（第一页为1），用于排序
+        
+        Args:
+            index_url (str): 目录第一页的完整URL
+            url (str): 目录分页的完整URL
+            
+        Returns:
+            int: 页码
+        """
+        if url == index_url:
+            return 1
+        match = re.search(r'(?:page|p)=(\d+)', urlparse(url).query) or re.search(r'(\d+)\D*$', urlparse(url).path)
+        return int(match.group(1)) if match else self.MAX_INDEX_PAGES + 1
+    
+    def _chapter_id(self, chapter_url):
+        """从章节URL中提取章节ID（最后一段路径去掉扩展名）
+        
+        Args:
+            chapter_url (str): 章节URL
+            
+        Returns:
+            str: 章节ID
+        """
+        name = urlparse(chapter_url).path.rstrip('/').rsplit('/', 1)[-1]
+        return name.rsplit('.', 1)[0] or chapter_url
+    
     def get_chapter_content(self, domain, chapter_url, thread_driver=None):
         """获取章节内容
         
+        依次尝试 geturl API、Selenium、直接访问章节页面、备用API 等获取方式。
+        每个域名各方式的成功/失败次数会被记录，之后的章节优先使用该域名成功率最高的方式。
+        
         Args:
             domain (str): 域名
             chapter_url (str): 章节URL
@@ -580,69 +3370,39 @@ class NovelCrawler:
             else:
                 full_chapter_url = chapter_url
             
-            # 方法1: 尝试geturl API
-            try:
-                geturl_api = f"{domain.rstrip('/')}/user/geturl.html?url={full_chapter_url}"
-                response = self.session.get(geturl_api, timeout=10, allow_redirects=False)
-                
-                if response.status_code in [301, 302]:
-                    real_url = response.headers.get('Location')
-                    if real_url:
-                        content_response = self.session.get(real_url, timeout=10)
-                        if content_response.status_code == 200:
-                            title, content = self._extract_content_from_html(content_response.text)
-                            if title and content and len(content) > 50:  # 确保内容不是"加载中"
-                                return title, content
-            except:
-                pass
-            
-            # 方法2: 使用Selenium（如果启用）
-            if self.use_selenium:
-                # 优先使用线程专用的WebDriver
-                if thread_driver:
-                    title, content = self.get_chapter_content_selenium(domain, chapter_url, thread_driver)
-                    if title and content:
-                        return title, content
-                else:
-                    # 检查WebDriver状态，如果不存在则重新初始化
-                    if not self.driver:
-                        self._init_selenium()
-                    
-                    if self.driver:
-                        title, content = self.get_chapter_content_selenium(domain, chapter_url)
-                        if title and content:
-                            return title, content
+            # 章节页面内容不会变化，磁盘缓存命中时直接使用
+            title, content = self._load_cached_chapter(domain, full_chapter_url)
+            if title and content:
+                return title, content
             
-            # 方法3: 直接访问章节页面
-            try:
-                direct_response = self.session.get(full_chapter_url, timeout=10)
-                if direct_response.status_code == 200:
-                    title, content = self._extract_content_from_html(direct_response.text)
-                    if title and content and len(content) > 50:
-                        return title, content
-            except:
-                pass
+            fetchers = {
+                # 方法1: 尝试geturl API
+                'geturl': lambda: self._fetch_chapter_by_geturl(domain, full_chapter_url),
+                # 方法2: 使用Selenium（如果启用）
+                'selenium': lambda: self._fetch_chapter_by_selenium(domain, chapter_url, thread_driver),
+                # 方法3: 直接访问章节页面
+                'direct': lambda: self._fetch_chapter_page(domain, full_chapter_url),
+                # 方法4: 尝试其他可能的API端点（有些网站使用不同的API）
+                'alt_book_read': lambda: self._fetch_chapter_page(
+                    domain, f"{domain.rstrip('/')}/user/book_read.html?bid={chapter_url.split('/')[-2]}&cid={chapter_url.split('/')[-1].replace('.html', '')}",
+                    cache_key=full_chapter_url),
+                'alt_read': lambda: self._fetch_chapter_page(
+                    domain, f"{domain.rstrip('/')}/read{chapter_url}", cache_key=full_chapter_url),
+                'alt_chapter': lambda: self._fetch_chapter_page(
+                    domain, f"{domain.rstrip('/')}/chapter{chapter_url}", cache_key=full_chapter_url)
+            }
+            if not self.use_selenium:
+                del fetchers['selenium']
             
-            # 方法4: 尝试其他可能的API端点
-            try:
-                # 有些网站使用不同的API
-                alt_apis = [
-                    f"{domain.rstrip('/')}/user/book_read.html?bid={chapter_url.split('/')[-2]}&cid={chapter_url.split('/')[-1].replace('.html', '')}",
-                    f"{domain.rstrip('/')}/read{chapter_url}",
-                    f"{domain.rstrip('/')}/chapter{chapter_url}"
-                ]
-                
-                for api_url in alt_apis:
-                    try:
-                        api_response = self.session.get(api_url, timeout=10)
-                        if api_response.status_code == 200:
-                            title, content = self._extract_content_from_html(api_response.text)
-                            if title and content and len(content) > 50:
-                                return title, content
-                    except:
-                        continue
-            except:
-                pass
+            for method in self.method_profiles.order(domain, list(fetchers)):
+                try:
+                    title, content = fetchers[method]()
+                except Exception:
+                    title, content = None, None
+                success = bool(title and content)
+                self.method_profiles.record(domain, method, success)
+                if success:
+                    return title, content
             
             return None, None
             
@@ -650,71 +3410,110 @@ class NovelCrawler:
             print(f"获取章节内容失败: {e}")
             return None, None
     
-    def _init_selenium(self):
-        """初始化Selenium WebDriver"""
+    def _fetch_chapter_by_geturl(self, domain, full_chapter_url):
+        """通过 geturl API 跳转获取章节内容
+        
+        Args:
+            domain (str): 域名
+            full_chapter_url (str): 完整章节URL
+            
+        Returns:
+            tuple: (章节标题, 章节内容)
+        """
         try:
-            # 如果已有driver，先关闭
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except:
-                    pass
-                self.driver = None
+            geturl_api = f"{domain.rstrip('/')}/user/geturl.html?url={full_chapter_url}"
+            response = self._http_get(domain, geturl_api, timeout=10, allow_redirects=False)
+            
+            if response.status_code in [301, 302]:
+                real_url = response.headers.get('Location')
+                if real_url:
+                    return self._fetch_chapter_page(domain, real_url, cache_key=full_chapter_url)
+        except:
+            pass
+        return None, None
+    
+    def _fetch_chapter_by_selenium(self, domain, chapter_url, thread_driver=None):
+        """通过Selenium获取章节内容
+        
+        Args:
+            domain (str): 域名
+            chapter_url (str): 章节URL
+            thread_driver (webdriver.Chrome, optional): 线程专用的WebDriver实例
             
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')  # 无头模式
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_argument('--disable-web-security')
-            chrome_options.add_argument('--allow-running-insecure-content')
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
-            # chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            # 使用webdriver-manager自动管理驱动程序
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            print("Selenium WebDriver 初始化成功")
-            return True
-        except Exception as e:
-            print(f"Selenium WebDriver 初始化失败: {e}")
-            self.driver = None
-            return False
+        Returns:
+            tuple: (章节标题, 章节内容)
+        """
+        # 优先使用线程专用的WebDriver
+        if thread_driver:
+            try:
+                return self.get_chapter_content_selenium(domain, chapter_url, thread_driver)
+            except WebDriverException:
+                return None, None
+        
+        # 从浏览器池借用一个已启动的浏览器，用完归还（浏览器出错时异常穿过租约，由池丢弃该浏览器）
+        try:
+            with self.driver_pool.lease() as driver:
+                return self.get_chapter_content_selenium(domain, chapter_url, driver)
+        except Exception:
+            return None, None
+    
+    def _load_cached_chapter(self, domain, url):
+        """从磁盘HTTP缓存读取章节页面并提取内容
+        
+        Args:
+            domain (str): 域名
+            url (str): 完整章节URL
+            
+        Returns:
+            tuple: (章节标题, 章节内容)，未启用缓存或未命中时返回 (None, None)
+        """
+        cache = self._get_http_cache()
+        if cache is None:
+            return None, None
+        response = cache.get(url)
+        if response is not None:
+            html_text, mojibake = self.charsets.decode(domain, response)
+            if mojibake:
+                return None, None  # 缓存的是乱码页面，重新获取
+            title, content = self._extract_content_from_html(html_text, domain)
+            if title and content and len(content) > 50:
+                return title, content
+        return None, None
     
-    def _create_thread_driver(self):
-        """为当前线程创建独立的WebDriver实例
+    def _fetch_chapter_page(self, domain, url, cache_key=None):
+        """直接请求页面并提取章节内容，内容有效时写入磁盘HTTP缓存
         
+        Args:
+            domain (str): 域名
+            url (str): 页面URL
+            cache_key (str, optional): 缓存键URL，默认为页面URL（跳转获取时使用原章节URL）
+            
         Returns:
-            webdriver.Chrome: Chrome WebDriver实例，失败返回None
+            tuple: (章节标题, 章节内容)，内容无效时返回 (None, None)
         """
         try:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')  # 无头模式
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_argument('--disable-web-security')
-            chrome_options.add_argument('--allow-running-insecure-content')
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            # 使用webdriver-manager自动管理驱动程序
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            return driver
-        except Exception as e:
-            print(f"创建线程WebDriver失败: {e}")
-            return None
+            for attempt in range(2):
+                response = self._http_get(domain, url, timeout=10)
+                if response.status_code != 200:
+                    return None, None
+                html_text, mojibake = self.charsets.decode(domain, response)
+                if not mojibake:
+                    break
+                if attempt == 0:
+                    # 解码出乱码时重新获取一次（偶发的错误编码响应）
+                    self.charsets.count_refetch(domain)
+            else:
+                return None, None
+            
+            title, content = self._extract_content_from_html(html_text, domain)
+            if title and content and len(content) > 50:  # 确保内容不是"加载中"
+                cache = self._get_http_cache()
+                if cache is not None:
+                    cache.store(cache_key or url, response)
+                return title, content
+        except:
+            pass
+        return None, None
     
     def get_chapter_content_selenium(self, domain, chapter_url, thread_driver=None):
         """使用Selenium获取章节内容
@@ -726,6 +3525,9 @@ class NovelCrawler:
             
         Returns:
             tuple: (章节标题, 章节内容)
+            
+        Raises:
+            WebDriverException: 浏览器本身出错（崩溃、会话失效）时抛出，由借用方将其标记为损坏
         """
         # 使用传入的线程driver或者实例的driver
         driver = thread_driver if thread_driver else self.driver
@@ -739,33 +3541,41 @@ class NovelCrawler:
             else:
                 full_chapter_url = chapter_url
             
-            # 访问页面
+            # 访问页面（与requests共用同一域名的限速令牌桶）
+            self.rate_limiter.acquire(domain)
             driver.get(full_chapter_url)
             
-            # 等待页面加载
-            time.sleep(2)  # 减少等待时间以提高并发效率
-            
-            # 等待内容加载完成
+            # 等待正文容器被填充（在浏览器内检查DOM，不序列化整个页面）
+            timed_out = None
             try:
-                WebDriverWait(driver, 8).until(
-                    lambda d: d.title != "加载中……" and len(d.page_source) > 2000
+                WebDriverWait(driver, 8, poll_frequency=0.1).until(
+                    lambda d: d.execute_script(self.CONTENT_READY_SCRIPT, self.CONTENT_SELECTORS)
                 )
-            except TimeoutException:
-                pass  # 继续处理，不打印错误信息避免并发时输出混乱
+            except TimeoutException as e:
+                timed_out = e  # 继续处理，不打印错误信息避免并发时输出混乱
             
             # 获取页面源码
             page_source = driver.page_source
             
             # 提取标题和内容
-            title, content = self._extract_content_from_html(page_source)
+            title, content = self._extract_content_from_html(page_source, domain)
             
             if title and content and len(content) > 50:
+                self.rate_limiter.report(domain, 200)
                 return title, content
+            if timed_out is not None:
+                # 正文一直没有加载出来，与请求超时一样让该域名降速
+                self.rate_limiter.report(domain, error=timed_out)
             
             return None, None
             
+        except WebDriverException as e:
+            # 页面加载超时或浏览器出错：让该域名降速，并交给借用方处理浏览器
+            self.rate_limiter.report(domain, error=e)
+            raise
         except Exception as e:
             # 在并发模式下减少错误输出
+            self.rate_limiter.report(domain, error=e)
             return None, None
     
     def cleanup(self):
@@ -777,70 +3587,195 @@ class NovelCrawler:
                 print("WebDriver已关闭")
             except Exception as e:
                 print(f"关闭WebDriver时出错: {e}")
+        if hasattr(self, 'sessions'):
+            self.sessions.close()
+        if hasattr(self, 'chapter_stores'):
+            with self.chapter_stores_lock:
+                for store in self.chapter_stores.values():
+                    store.close()
+                self.chapter_stores.clear()
+        if getattr(self, 'parse_pool', None):
+            self.parse_pool.shutdown(cancel_futures=True)
+            self.parse_pool = None
+        if hasattr(self, 'driver_pool'):
+            closed = self.driver_pool.shutdown()
+            if closed:
+                print(f"浏览器池已关闭 {closed} 个WebDriver")
+    
+    def __del__(self):
+        """清理资源"""
+        self.cleanup()
+    
+    def _extract_content_from_html(self, html_text, domain=None):
+        """
+        从HTML中提取章节标题和内容
+        
+        默认使用lxml解析；未安装lxml或lxml解析出错时退回BeautifulSoup。
+        指定域名时优先使用该域名站点配置中记录的选择器。
+        
+        Args:
+            html_text (str): HTML文本
+            domain (str, optional): 页面所属域名
+            
+        Returns:
+            tuple: (标题, 内容)
+        """
+        if self.crawl_config['extractor'] == 'lxml' and lxml_html is not None:
+            try:
+                return self._extract_content_lxml(html_text, domain)
+            except Exception:
+                pass
+        return self._extract_content_bs4(html_text, domain)
+    
+    def _extract_content_lxml(self, html_text, domain=None):
+        """
+        使用lxml和预编译XPath提取章节标题和内容（与BeautifulSoup版本的选择规则一致）
+        
+        Args:
+            html_text (str): HTML文本
+            domain (str, optional): 页面所属域名
+            
+        Returns:
+            tuple: (标题, 内容)
+        """
+        # 检查是否是"加载中"页面
+        if "加载中" in html_text or len(html_text) < 2000:
+            return None, None
+        
+        # 已知该域名的选择器时只流式解析到标题和正文容器结束为止
+        if domain and self.crawl_config['partial_parse']:
+            result = self._extract_content_partial(html_text, domain)
+            if result is not None:
+                return result
+        
+        root = lxml_html.fromstring(html_text)
+        
+        # 提取标题 - 优先尝试站点配置中记录的选择器，再按优先级尝试其余选择器
+        title = None
+        for selector in self.site_profiles.order(domain, 'title_selector', self.TITLE_SELECTORS):
+            elems = self.TITLE_XPATHS[selector](root)
+            if elems:
+                title_text = ''.join(self.TEXT_XPATH(elems[0])).strip()
+                if title_text and title_text != "加载中……" and len(title_text) > 2:
+                    title = title_text
+                    self.site_profiles.learn(domain, 'title_selector', selector)
+                    break
+        
+        # 提取内容 - 优先尝试站点配置中记录的选择器，再按优先级尝试其余选择器
+        content = None
+        for selector in self.site_profiles.order(domain, 'content_selector', self.CONTENT_SELECTORS):
+            elems = self.CONTENT_XPATHS[selector](root)
+            if elems:
+                content_text = ''.join(self.TEXT_XPATH(elems[0])).strip()
+                if content_text and len(content_text) > 50:  # 确保有实际内容
+                    content = re.sub(r'\n\s*\n', '\n\n', content_text)
+                    self.site_profiles.learn(domain, 'content_selector', selector)
+                    break
+        
+        # 如果没有找到专门的内容区域，尝试从body中提取
+        if not content:
+            body = root.find('.//body') if root.tag != 'body' else root
+            if body is not None:
+                body_text = ''.join(self.TEXT_XPATH(body)).strip()
+                if len(body_text) > 200:
+                    content = re.sub(r'\n\s*\n', '\n\n', body_text)
+        
+        return title or "未知章节", content
     
-    def __del__(self):
-        """清理资源"""
-        self.cleanup()
+    def _extract_content_partial(self, html_text, domain):
+        """
+        按站点配置中记录的选择器流式解析页面，标题和正文容器都解析完成后立即停止，
+        不再解析其后的推荐列表、页脚和脚本
+        
+        Args:
+            html_text (str): HTML文本
+            domain (str): 页面所属域名
+            
+        Returns:
+            tuple: (标题, 内容)；没有记录的选择器或记录的选择器未取得有效内容时返回None（由调用方完整解析）
+        """
+        profile = self.site_profiles.get(domain)
+        match_title = self.TITLE_MATCHERS.get(profile.get('title_selector'))
+        match_content = self.CONTENT_MATCHERS.get(profile.get('content_selector'))
+        if not match_title or not match_content:
+            return None
+        
+        try:
+            parser = etree.HTMLPullParser(events=('start', 'end'))
+            title_elem = content_elem = None
+            title_text = content_text = None
+            
+            def process_events():
+                nonlocal title_elem, content_elem, title_text, content_text
+                for event, elem in parser.read_events():
+                    if event == 'start':
+                        # 记录文档中第一个匹配的元素（与XPath的 [1] 一致）
+                        if title_elem is None and match_title(elem):
+                            title_elem = elem
+                        if content_elem is None and match_content(elem):
+                            content_elem = elem
+                    else:
+                        if elem is title_elem and title_text is None:
+                            title_text = ''.join(self.TEXT_XPATH(elem)).strip()
+                        if elem is content_elem and content_text is None:
+                            content_text = ''.join(self.TEXT_XPATH(elem)).strip()
+            
+            for offset in range(0, len(html_text), self.PARTIAL_PARSE_CHUNK):
+                parser.feed(html_text[offset:offset + self.PARTIAL_PARSE_CHUNK])
+                process_events()
+                if title_text is not None and content_text is not None:
+                    break
+            else:
+                parser.close()
+                process_events()
+        except Exception:
+            return None
+        
+        if not title_text or title_text == "加载中……" or len(title_text) <= 2:
+            return None
+        if not content_text or len(content_text) <= 50:
+            return None
+        return title_text, re.sub(r'\n\s*\n', '\n\n', content_text)
     
-    def _extract_content_from_html(self, html_text):
+    def _extract_content_bs4(self, html_text, domain=None):
         """
-        从HTML中提取章节标题和内容
+        使用BeautifulSoup从HTML中提取章节标题和内容
         
         Args:
             html_text (str): HTML文本
+            domain (str, optional): 页面所属域名
             
         Returns:
             tuple: (标题, 内容)
         """
         try:
-            soup = BeautifulSoup(html_text, 'html.parser')
-            
-            # 检查是否是"加载中"页面
+            # 检查是否是"加载中"页面（在解析之前）
             if "加载中" in html_text or len(html_text) < 2000:
                 return None, None
             
-            # 提取标题 - 尝试多种选择器
+            soup = BeautifulSoup(html_text, 'html.parser')
+            
+            # 提取标题 - 优先尝试站点配置中记录的选择器，再按优先级尝试其余选择器
             title = None
-            title_selectors = [
-                'h1.wap_none',
-                'h1',
-                '.title',
-                '.chapter-title',
-                '.book-title',
-                'h2',
-                'h3'
-            ]
-            
-            for selector in title_selectors:
+            for selector in self.site_profiles.order(domain, 'title_selector', self.TITLE_SELECTORS):
                 title_elem = soup.select_one(selector)
                 if title_elem:
                     title_text = title_elem.get_text().strip()
                     if title_text and title_text != "加载中……" and len(title_text) > 2:
                         title = title_text
+                        self.site_profiles.learn(domain, 'title_selector', selector)
                         break
             
-            # 提取内容 - 尝试多种选择器
+            # 提取内容 - 优先尝试站点配置中记录的选择器，再按优先级尝试其余选择器
             content = None
-            content_selectors = [
-                '#chaptercontent',
-                '.content',
-                '.chapter-content',
-                '.text-content',
-                '#content',
-                '.txt',
-                '.book-content',
-                '.read-content',
-                'div[class*="content"]',
-                'div[id*="content"]'
-            ]
-            
-            for selector in content_selectors:
+            for selector in self.site_profiles.order(domain, 'content_selector', self.CONTENT_SELECTORS):
                 content_elem = soup.select_one(selector)
                 if content_elem:
                     content_text = content_elem.get_text().strip()
                     if content_text and len(content_text) > 50:  # 确保有实际内容
                         # 清理内容
                         content = re.sub(r'\n\s*\n', '\n\n', content_text)
+                        self.site_profiles.learn(domain, 'content_selector', selector)
                         break
             
             # 如果没有找到专门的内容区域，尝试从body中提取
@@ -873,52 +3808,326 @@ class NovelCrawler:
         parsed = urlparse(domain)
         return parsed.netloc.replace('www.', '').replace('.', '_')
     
-    def save_novel_by_domain(self, novel_title, domain, chapters_data):
+    def _safe_title(self, novel_title):
+        """清理小说名称中的文件名非法字符
+
+        Args:
+            novel_title (str): 小说名称
+
+        Returns:
+            str: 可用作文件名的小说名称
+        """
+        return re.sub(r'[<>:"/\\|?*]', '_', novel_title)
+    
+    def _domain_dir(self, novel_title, domain):
+        """获取（并创建）小说在某个域名下的输出目录
+
+        Args:
+            novel_title (str): 小说名称
+            domain (str): 域名
+
+        Returns:
+            str: 域名目录路径
+        """
+        domain_dir = os.path.join(self.output_dir, self._safe_title(novel_title), self.get_domain_name(domain))
+        if not os.path.exists(domain_dir):
+            os.makedirs(domain_dir, exist_ok=True)
+        return domain_dir
+    
+    def save_novel_by_domain(self, novel_title, domain, chapters_data, append=False):
         """按域名保存小说到不同文件夹
         
+        章节数据逐条写出，可以传入生成器（例如从断点日志逐章读回的章节），不需要把整本书放在内存中。
+        文本和 _chapters.json 先写到临时文件，写完后再替换原文件；更新模式下文本直接追加，
+        _chapters.json 复制已有数组后接着写入新章节。
+        启用去重（dedupe）时正文保存到小说目录下的 blobs 中，_chapters.json 只记录 content_hash。
+        启用压缩（compression）时文本、_chapters.json 和 blobs 中的正文按压缩格式保存（加 .gz/.zst 后缀），
+        切换压缩格式后旧格式的文件会被转换或替换。
+        使用jsonl存储时章节数据按行写入 _chapters.jsonl 并维护偏移索引（_chapters.jsonl.idx），不压缩，
+        以便按偏移逐章读取。
+        使用SQLite存储时章节数据保存到小说目录下的 chapters.db，不再写 _chapters.json
+        （可通过 export_chapter_store 导出）。
+        
         Args:
             novel_title (str): 小说名称
             domain (str): 域名
-            chapters_data (list): 章节数据列表
+            chapters_data (iterable): 章节数据，元素为 (标题, 内容)、(标题, 内容, URL) 或 (标题, 内容, URL, 章节索引)
+            append (bool): 是否追加到已保存的数据之后（更新模式）
         """
-        domain_name = self.get_domain_name(domain)
-        # 清理文件名中的非法字符
-        safe_title = re.sub(r'[<>:"/\\|?*]', '_', novel_title)
-        domain_dir = os.path.join(self.output_dir, safe_title, domain_name)
-        
-        # 创建域名目录
-        if not os.path.exists(domain_dir):
-            os.makedirs(domain_dir)
+        safe_title = self._safe_title(novel_title)
+        domain_dir = self._domain_dir(novel_title, domain)
         
         filename = os.path.join(domain_dir, f"{safe_title}.txt")
+        json_filename = os.path.join(domain_dir, f"{safe_title}_chapters.json")
+        compression = self._data_compression(filename)
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                for chapter_title, chapter_content in chapters_data:
-                    if chapter_title and chapter_content:
-                        f.write(f"{chapter_title}\n")
-                        f.write("=" * 50 + "\n")
-                        f.write(f"{chapter_content}\n\n")
-            
-            print(f"小说已保存到: {filename}")
-            
-            # 同时保存章节数据为JSON格式，便于后续比对
-            json_filename = os.path.join(domain_dir, f"{safe_title}_chapters.json")
-            chapters_json = []
-            for chapter_title, chapter_content in chapters_data:
-                if chapter_title and chapter_content:
-                    chapters_json.append({
-                        'title': chapter_title,
-                        'content': chapter_content,
-                        'content_hash': hashlib.md5(chapter_content.encode('utf-8')).hexdigest()
-                    })
-            
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(chapters_json, f, ensure_ascii=False, indent=2)
+            text_target = _convert_data_file(filename, compression) if append else data_file_path(filename, compression)
+            text_filename = text_target if append else f"{text_target}.tmp"
+            with open_data_file(text_filename, 'a' if append else 'w', compression) as f:
+                if self.storage_config['backend'] == 'sqlite':
+                    # 未带对齐索引的章节按保存顺序编号，更新模式下追加到已有章节之后
+                    def rows():
+                        for position, chapter in enumerate(chapters_data):
+                            chapter_title, chapter_content = chapter[0], chapter[1]
+                            if chapter_title and chapter_content:
+                                f.write(f"{chapter_title}\n")
+                                f.write("=" * 50 + "\n")
+                                f.write(f"{chapter_content}\n\n")
+                                url = chapter[2] if len(chapter) > 2 else None
+                                if len(chapter) > 3:
+                                    yield chapter[3], chapter_title, chapter_content, url, True
+                                else:
+                                    yield None if append else position, chapter_title, chapter_content, url, False
+                    if append:
+                        # 数据库中还没有该域名的章节时先转存以前按文件格式保存的章节
+                        self._import_domain_files(novel_title, domain)
+                    self._chapter_store(novel_title).save(self.get_domain_name(domain), rows(), append=append)
+                    if not append:
+                        # 该域名的章节已全部保存到数据库，删除以前按文件格式保存的旧数据
+                        _remove_data_files(json_filename)
+                        ChapterRecordFile(os.path.join(domain_dir, f"{safe_title}_chapters.jsonl")).remove()
+                else:
+                    blobs = BlobStore(os.path.join(self.output_dir, safe_title, 'blobs'), compression) if self.storage_config['dedupe'] else None
+                    stored = reused = 0
+                    
+                    def records():
+                        nonlocal stored, reused
+                        for chapter in chapters_data:
+                            chapter_title, chapter_content = chapter[0], chapter[1]
+                            if chapter_title and chapter_content:
+                                f.write(f"{chapter_title}\n")
+                                f.write("=" * 50 + "\n")
+                                f.write(f"{chapter_content}\n\n")
+                                content_hash = hashlib.md5(chapter_content.encode('utf-8')).hexdigest()
+                                if blobs:
+                                    # 正文只按哈希保存一份，章节数据中只记录引用
+                                    if blobs.put(chapter_content, content_hash):
+                                        stored += 1
+                                    else:
+                                        reused += 1
+                                    chapter_json = {'title': chapter_title, 'content_hash': content_hash}
+                                else:
+                                    chapter_json = {'title': chapter_title, 'content': chapter_content, 'content_hash': content_hash}
+                                if len(chapter) > 2:
+                                    chapter_json['url'] = chapter[2]
+                                if len(chapter) > 3:
+                                    chapter_json['index'] = chapter[3]
+                                yield chapter_json
+                    
+                    record_file = ChapterRecordFile(os.path.join(domain_dir, f"{safe_title}_chapters.jsonl"))
+                    if self.storage_config['backend'] == 'jsonl':
+                        # 按行保存章节记录并维护偏移索引；更新模式下已有数据为 _chapters.json 时先转换
+                        previous = []
+                        if append and not os.path.exists(record_file.path):
+                            previous = self._load_domain_chapters(novel_title, domain)
+                        record_file.write(itertools.chain(previous, records()), append=append and not previous)
+                        _remove_data_files(json_filename)
+                    else:
+                        # 同时保存章节数据为JSON格式（与 json.dump(indent=2) 的格式相同），便于后续比对
+                        json_target = data_file_path(json_filename, compression)
+                        with open_data_file(f"{json_target}.tmp", 'wb', compression) as json_file:
+                            count = 1 if append and self._copy_json_array_head(json_filename, json_file) else 0
+                            # 更新模式下已有数据为 _chapters.jsonl 或 chapters.db 时先复制其中的章节
+                            previous = []
+                            if append and not count:
+                                previous = record_file.records() if os.path.exists(record_file.path) else self._load_domain_chapters(novel_title, domain)
+                            for chapter_json in itertools.chain(previous, records()):
+                                item = json.dumps(chapter_json, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+                                json_file.write(((',\n  ' if count else '[\n  ') + item).encode('utf-8'))
+                                count += 1
+                            json_file.write(b'\n]' if count else b'[]')
+                        os.replace(f"{json_target}.tmp", json_target)
+                        _remove_other_data_files(json_filename, compression)
+                        record_file.remove()
+                    if blobs:
+                        print(f"正文去重: 新保存 {stored} 章，与已有正文相同 {reused} 章")
+                    if os.path.exists(self._chapter_store_path(novel_title)):
+                        # 以前用SQLite存储保存过时，删除数据库中该域名的旧章节，避免读取到过期数据
+                        self._chapter_store(novel_title).clear(self.get_domain_name(domain))
+            if not append:
+                os.replace(text_filename, text_target)
+                _remove_other_data_files(filename, compression)
+            
+            print(f"小说已保存到: {text_target}")
             
         except Exception as e:
             print(f"保存文件失败: {e}")
     
+    def _import_domain_files(self, novel_title, domain):
+        """把域名以前按 _chapters.json / _chapters.jsonl 保存的章节转存到SQLite章节数据库（更新模式追加前调用）
+        
+        数据库中已有该域名的章节时不做任何事；转存后删除原文件，避免两种存储中的数据不一致。
+        
+        Args:
+            novel_title (str): 小说名称
+            domain (str): 域名
+            
+        Returns:
+            int: 转存的章节数
+        """
+        store = self._chapter_store(novel_title)
+        domain_name = self.get_domain_name(domain)
+        safe_title = self._safe_title(novel_title)
+        source = JsonChapterSource(os.path.join(self.output_dir, safe_title), safe_title)
+        if store.next_index(domain_name) or domain_name not in source.domains():
+            return 0
+        store.save(domain_name, ((chapter.get('index', position), chapter['title'], chapter['content'],
+                                  chapter.get('url'), 'index' in chapter)
+                                 for position, chapter in enumerate(source.read_chapters(domain_name))), append=True)
+        domain_dir = os.path.join(self.output_dir, safe_title, domain_name)
+        _remove_data_files(os.path.join(domain_dir, f"{safe_title}_chapters.json"))
+        ChapterRecordFile(os.path.join(domain_dir, f"{safe_title}_chapters.jsonl")).remove()
+        return store.next_index(domain_name)
+    
+    def _copy_json_array_head(self, json_file, output):
+        """把已保存的 _chapters.json 数组去掉结尾的 ] 后分块复制到输出文件，用于更新模式追加章节
+        
+        已保存的文件可以是压缩文件，复制时逐块解压，只在内存中保留末尾一小段用于去掉结尾的 ]。
+        
+        Args:
+            json_file (str): 已保存的 _chapters.json 路径（未压缩时的路径）
+            output (file): 以二进制方式打开的输出文件
+            
+        Returns:
+            bool: 是否复制了至少一个章节（文件不存在或为空数组时为False）
+        """
+        json_file = find_data_file(json_file)
+        if not json_file:
+            return False
+        tail = b''
+        copied = 0
+        with open_data_file(json_file, 'rb') as f:
+            while True:
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    break
+                tail += chunk
+                if len(tail) > 64:
+                    output.write(tail[:-64])
+                    copied += len(tail) - 64
+                    tail = tail[-64:]
+        end = tail.rfind(b']')
+        if end < 0:
+            raise ValueError(f"{json_file} 不是完整的章节数组")
+        # 去掉结尾的 ] 及其前面的换行，后续章节以 ",\n" 接上
+        head_tail = tail[:end].rstrip()
+        if not copied and (not head_tail or head_tail.endswith(b'[')):
+            return False
+        output.write(head_tail)
+        return True
+    
+    def _load_domain_chapters(self, novel_title, domain):
+        """读取某个域名已保存的章节数据
+        
+        Args:
+            novel_title (str): 小说名称
+            domain (str): 域名
+            
+        按配置的存储方式读取：使用SQLite存储时读取 chapters.db，否则读取域名目录下的 _chapters.jsonl 或
+        _chapters.json；首选的存储中没有该域名的数据时再读取另一种存储。
+        
+        Returns:
+            list: 章节数据列表（_chapters.jsonl 只返回不含正文的索引项），没有已保存数据时返回空列表
+        """
+        domain_name = self.get_domain_name(domain)
+        has_store = os.path.exists(self._chapter_store_path(novel_title))
+        if has_store and self.storage_config['backend'] == 'sqlite':
+            chapters = list(self._chapter_store(novel_title).chapters(domain_name))
+            if chapters:
+                return chapters
+        safe_title = self._safe_title(novel_title)
+        domain_dir = os.path.join(self.output_dir, safe_title, domain_name)
+        record_file = ChapterRecordFile(os.path.join(domain_dir, f"{safe_title}_chapters.jsonl"))
+        if os.path.exists(record_file.path):
+            return record_file.load_index()
+        json_file = find_data_file(os.path.join(domain_dir, f"{safe_title}_chapters.json"))
+        if not json_file:
+            if has_store and self.storage_config['backend'] != 'sqlite':
+                return list(self._chapter_store(novel_title).chapters(domain_name))
+            return []
+        try:
+            with open_data_file(json_file) as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"读取 {json_file} 失败: {e}")
+            return []
+    
+    def _chapter_store_path(self, novel_title):
+        """获取小说的SQLite章节数据库路径
+
+        Args:
+            novel_title (str): 小说名称
+
+        Returns:
+            str: 数据库文件路径
+        """
+        return os.path.join(self.output_dir, self._safe_title(novel_title), 'chapters.db')
+    
+    def _chapter_store(self, novel_title):
+        """打开小说的SQLite章节数据库（同一小说共用一个连接）
+
+        Args:
+            novel_title (str): 小说名称
+
+        Returns:
+            ChapterStore: 章节数据库
+        """
+        path = self._chapter_store_path(novel_title)
+        with self.chapter_stores_lock:
+            if path not in self.chapter_stores:
+                self.chapter_stores[path] = ChapterStore(path)
+            return self.chapter_stores[path]
+    
+    def _open_chapter_source(self, novel_title):
+        """获取小说已保存章节的数据源
+        
+        按配置的存储方式选择：使用SQLite存储且存在 chapters.db 时读取数据库，否则读取各域名的
+        _chapters.json 或 _chapters.jsonl；没有任何域名的章节文件时（例如只用SQLite存储爬取过）读取 chapters.db。
+
+        Args:
+            novel_title (str): 小说名称
+
+        Returns:
+            JsonChapterSource | ChapterStore: 章节数据源
+        """
+        has_store = os.path.exists(self._chapter_store_path(novel_title))
+        if has_store and self.storage_config['backend'] == 'sqlite':
+            return self._chapter_store(novel_title)
+        safe_title = self._safe_title(novel_title)
+        source = JsonChapterSource(os.path.join(self.output_dir, safe_title), safe_title)
+        if has_store and not source.domains():
+            return self._chapter_store(novel_title)
+        return source
+    
+    def export_chapter_store(self, novel_title):
+        """将SQLite章节数据库导出为各域名目录下原有的 txt 和 _chapters.json 文件
+
+        Args:
+            novel_title (str): 小说名称
+
+        Returns:
+            int: 导出的域名数
+        """
+        if not os.path.exists(self._chapter_store_path(novel_title)):
+            print(f"未找到章节数据库: {self._chapter_store_path(novel_title)}")
+            return 0
+        store = self._chapter_store(novel_title)
+        safe_title = self._safe_title(novel_title)
+        domain_names = store.domains()
+        for domain_name in domain_names:
+            domain_dir = os.path.join(self.output_dir, safe_title, domain_name)
+            os.makedirs(domain_dir, exist_ok=True)
+            txt_file = os.path.join(domain_dir, f"{safe_title}.txt")
+            json_file = os.path.join(domain_dir, f"{safe_title}_chapters.json")
+            compression = self._data_compression(txt_file)
+            count = store.export(domain_name, data_file_path(txt_file, compression),
+                                 data_file_path(json_file, compression), compression)
+            _remove_other_data_files(txt_file, compression)
+            _remove_other_data_files(json_file, compression)
+            print(f"已导出 {domain_name}: {count} 章")
+        return len(domain_names)
+    
     def calculate_similarity(self, text1, text2):
         """计算两个文本的相似度
         
@@ -931,55 +4140,67 @@ class NovelCrawler:
         """
         return SequenceMatcher(None, text1, text2).ratio()
     
-    def compare_chapters(self, novel_title):
+    def compare_chapters(self, novel_title, chapter_titles=None, chapter_range=None):
         """比对不同域名的章节内容
         
+        先只读取各域名章节的哈希，哈希不同时才读取正文计算相似度（jsonl和SQLite存储按章节读取正文）。
+        
         Args:
             novel_title (str): 小说名称
+            chapter_titles (set, optional): 只比对这些章节，并将结果合并到已有的比对报告中（更新模式）
+            chapter_range (tuple, optional): (起始, 结束)，只重新比对章节顺序中第起始到第结束章（从1开始，包含两端），
+                结果按章节顺序合并到已有的比对报告中
         """
-        safe_title = re.sub(r'[<>:"/\\|?*]', '_', novel_title)
+        safe_title = self._safe_title(novel_title)
         novel_dir = os.path.join(self.output_dir, safe_title)
         if not os.path.exists(novel_dir):
             print(f"未找到小说目录: {novel_dir}")
             return
         
-        # 收集所有域名的章节数据
-        domain_chapters = {}
-        for domain_name in os.listdir(novel_dir):
-            domain_path = os.path.join(novel_dir, domain_name)
-            if os.path.isdir(domain_path):
-                json_file = os.path.join(domain_path, f"{safe_title}_chapters.json")
-                if os.path.exists(json_file):
-                    try:
-                        with open(json_file, 'r', encoding='utf-8') as f:
-                            chapters = json.load(f)
-                            domain_chapters[domain_name] = chapters
-                    except Exception as e:
-                        print(f"读取 {json_file} 失败: {e}")
-        
-        if len(domain_chapters) < 2:
+        # 各域名的章节数据（SQLite存储按标题逐章查询，jsonl存储按偏移索引逐章读取，JSON存储整体读入）
+        source = self._open_chapter_source(novel_title)
+        domain_names = source.domains()
+        if len(domain_names) < 2:
             print("需要至少两个域名的数据才能进行比对")
             return
         
         # 生成比对报告
         comparison_report = {
             'novel_title': novel_title,
-            'domains': list(domain_chapters.keys()),
+            'domains': domain_names,
             'comparison_time': time.strftime('%Y-%m-%d %H:%M:%S'),
             'chapter_comparison': []
         }
         
-        # 按章节标题分组
-        chapters_by_title = defaultdict(dict)
-        for domain_name, chapters in domain_chapters.items():
-            for chapter in chapters:
-                title = chapter['title']
-                chapters_by_title[title][domain_name] = chapter
+        # 增量比对：保留已有报告中其他章节的比对结果
+        report_file = os.path.join(novel_dir, 'comparison_report.json')
+        titles = source.titles()
+        if chapter_range is not None:
+            start, end = chapter_range
+            chapter_titles = set(titles[max(start, 1) - 1:end])
+            print(f"比对第 {start}-{end} 章（共 {len(titles)} 章，选中 {len(chapter_titles)} 章）")
+        elif chapter_titles is not None and not os.path.exists(report_file):
+            chapter_titles = None  # 没有已有报告时退化为全量比对
+        if chapter_titles is not None and os.path.exists(report_file):
+            try:
+                with open(report_file, 'r', encoding='utf-8') as f:
+                    previous_report = json.load(f)
+                comparison_report['chapter_comparison'] = [
+                    chapter for chapter in previous_report.get('chapter_comparison', [])
+                    if chapter['title'] not in chapter_titles
+                ]
+            except Exception as e:
+                print(f"读取已有比对报告失败，将重新生成: {e}")
         
-        # 比对每个章节
-        for title, domain_data in chapters_by_title.items():
+        # 逐章比对
+        for title in titles:
+            if chapter_titles is not None and title not in chapter_titles:
+                continue
+            domain_data = source.lookup(title, with_content=False)
             if len(domain_data) < 2:
                 continue  # 跳过只有一个域名的章节
+            if len({chapter_data['content_hash'] for chapter_data in domain_data.values()}) > 1:
+                domain_data = source.lookup(title)
             
             chapter_report = {
                 'title': title,
@@ -992,15 +4213,22 @@ class NovelCrawler:
             for domain_name, chapter_data in domain_data.items():
                 chapter_report['content_hashes'][domain_name] = chapter_data['content_hash']
             
-            # 计算相似度
+            # 计算相似度：哈希相同的正文直接记为完全相同，不同哈希组合只计算一次
             domain_names = list(domain_data.keys())
+            similarities = {}
             for i in range(len(domain_names)):
                 for j in range(i + 1, len(domain_names)):
                     domain1, domain2 = domain_names[i], domain_names[j]
-                    content1 = domain_data[domain1]['content']
-                    content2 = domain_data[domain2]['content']
+                    hash1 = domain_data[domain1]['content_hash']
+                    hash2 = domain_data[domain2]['content_hash']
                     
-                    similarity = self.calculate_similarity(content1, content2)
+                    if hash1 == hash2:
+                        similarity = 1.0
+                    else:
+                        key = tuple(sorted((hash1, hash2)))
+                        if key not in similarities:
+                            similarities[key] = self.calculate_similarity(domain_data[domain1]['content'], domain_data[domain2]['content'])
+                        similarity = similarities[key]
                     chapter_report['similarities'].append({
                         'domain1': domain1,
                         'domain2': domain2,
@@ -1009,8 +4237,12 @@ class NovelCrawler:
             
             comparison_report['chapter_comparison'].append(chapter_report)
         
+        # 按范围重新比对时按章节顺序排列报告
+        if chapter_range is not None:
+            positions = {title: position for position, title in enumerate(titles)}
+            comparison_report['chapter_comparison'].sort(key=lambda chapter: positions.get(chapter['title'], len(positions)))
+        
         # 保存比对报告
-        report_file = os.path.join(novel_dir, 'comparison_report.json')
         try:
             with open(report_file, 'w', encoding='utf-8') as f:
                 json.dump(comparison_report, f, ensure_ascii=False, indent=2)
@@ -1090,218 +4322,616 @@ class NovelCrawler:
             tuple: (是否成功, 小说标题)
         """
         domain_name = self.get_domain_name(domain)
-        thread_driver = None
         
         try:
-            # 为当前线程创建独立的WebDriver
-            thread_driver = self._create_thread_driver()
-            if not thread_driver:
+            # 确认浏览器池能提供WebDriver（首次会启动浏览器，之后的章节复用池中已启动的浏览器）
+            try:
+                lease = self.driver_pool.lease()
+                with lease as driver:
+                    lease.pages = 0  # 仅确认可用，不计入页面数
+            except Exception:
+                driver = None
+            if not driver:
                 if use_multi_progress:
                     self.display.update_domain_progress(domain, 0, 0, "WebDriver创建失败", 'failed')
                 return False, None
             
-            # 选择第一个搜索结果
-            first_result = search_results[0]
-            book_url = first_result.get('url_list')
-            book_title = first_result.get('articlename', keyword)
-            
-            # 如果不使用多域名进度显示，则使用原有的显示方式
-            if not use_multi_progress:
-                self.display.print_domain_start(domain_name, book_title)
-            
-            # 获取章节列表
-            chapters = self.get_chapter_list(domain, book_url)
-            if not chapters:
-                if use_multi_progress:
-                    self.display.finish_domain_progress(domain, 0, 0)
-                else:
-                    self.display.print_domain_summary(domain_name, 0, 0)
-                return False, None
-            
-            # 限制章节数量
-            if max_chapters and len(chapters) > max_chapters:
-                chapters = chapters[:max_chapters]
-                if not use_multi_progress:
-                    print(f"  📊 限制爬取前 {max_chapters} 章（共 {len(chapters)} 章可用）")
+            return self._crawl_domain_chapters(keyword, domain, search_results, max_chapters, use_multi_progress)
             
-            # 初始化进度（如果使用多域名进度显示）
+        except Exception as e:
             if use_multi_progress:
-                self.display.update_domain_progress(domain, 0, len(chapters), "开始爬取...", 'running')
-            
-            # 爬取章节内容
-            chapters_data = []
-            for i, chapter in enumerate(chapters, 1):
-                if use_multi_progress:
-                    # 更新多域名进度显示
-                    self.display.update_domain_progress(domain, i, len(chapters), chapter['title'], 'running')
-                else:
-                    # 使用原有的进度显示
-                    self.display.print_progress(i, len(chapters), chapter['title'], domain_name)
-                
-                # 使用线程专用的WebDriver
-                title, content = self.get_chapter_content(domain, chapter['url'], thread_driver)
-                
-                # 根据结果处理
-                if title and content and len(content) > 50:
-                    chapters_data.append((title, content))
-                    if not use_multi_progress:
-                        self.display.print_chapter_success(domain_name, len(content))
-                else:
-                    if not use_multi_progress:
-                        reason = "内容为空" if not content else f"内容过短({len(content) if content else 0}字)"
-                        self.display.print_chapter_failed(domain_name, reason)
-                
-                # 添加延时，避免请求过快
-                time.sleep(0.5)  # 减少延时以提高并发效率
+                self.display.update_domain_progress(domain, 0, 0, f"错误: {str(e)[:20]}", 'failed')
+            else:
+                print(f"\n{self.display.colored_text(f'❌ [{domain_name}]', 'red')} 爬取异常: {e}")
+            return False, None
+    
+    def crawl_novel_single_domain(self, keyword, domain, search_results, max_chapters=None, use_multi_progress=False):
+        """爬取单个域名的小说
+        
+        Args:
+            keyword (str): 搜索关键字
+            domain (str): 域名
+            search_results (list): 搜索结果列表
+            max_chapters (int, optional): 最大章节数限制
+            use_multi_progress (bool): 是否使用多域名进度显示
             
-            # 完成进度显示
-            if use_multi_progress:
-                self.display.finish_domain_progress(domain, len(chapters_data), len(chapters))
+        Returns:
+            tuple: (是否成功, 小说标题)
+        """
+        domain_name = self.get_domain_name(domain)
+        
+        try:
+            return self._crawl_domain_chapters(keyword, domain, search_results, max_chapters, use_multi_progress)
             
-            # 保存到文件
-            if chapters_data:
-                self.save_novel_by_domain(book_title, domain, chapters_data)
-                if not use_multi_progress:
-                    self.display.print_domain_summary(domain_name, len(chapters_data), len(chapters))
-                return True, book_title
-            else:
-                if not use_multi_progress:
-                    self.display.print_domain_summary(domain_name, 0, len(chapters))
-                return False, None
-                
         except Exception as e:
             if use_multi_progress:
                 self.display.update_domain_progress(domain, 0, 0, f"错误: {str(e)[:20]}", 'failed')
             else:
                 print(f"\n{self.display.colored_text(f'❌ [{domain_name}]', 'red')} 爬取异常: {e}")
             return False, None
-        finally:
-            # 确保关闭线程专用的WebDriver
-            if thread_driver:
-                try:
-                    thread_driver.quit()
-                except:
-                    pass
+
+    def _crawl_domain_chapters(self, keyword, domain, search_results, max_chapters=None, use_multi_progress=False, thread_driver=None):
+        """获取单个域名的章节列表并抓取、保存章节内容（普通模式与Selenium模式共用）
+        
+        Args:
+            keyword (str): 搜索关键字
+            domain (str): 域名
+            search_results (list): 搜索结果列表
+            max_chapters (int, optional): 最大章节数限制
+            use_multi_progress (bool): 是否使用多域名进度显示
+            thread_driver (webdriver.Chrome, optional): 线程专用的WebDriver实例
+            
+        Returns:
+            tuple: (是否成功, 小说标题)
+        """
+        domain_name = self.get_domain_name(domain)
+        
+        # 选择第一个搜索结果
+        first_result = search_results[0]
+        book_url = first_result.get('url_list')
+        book_title = first_result.get('articlename', keyword)
+        
+        # 如果不使用多域名进度显示，则使用原有的显示方式
+        if not use_multi_progress:
+            self.display.print_domain_start(domain_name, book_title)
+        
+        # 获取章节列表
+        chapters = self.get_chapter_list(domain, book_url)
+        if not chapters:
+            if use_multi_progress:
+                self.display.finish_domain_progress(domain, 0, 0)
+            else:
+                self.display.print_domain_summary(domain_name, 0, 0)
+            return False, None
+        
+        # 更新模式：只抓取上次保存之后新发布的章节（先筛选新章节，再限制章节数量）
+        append = False
+        if self.crawl_config['update']:
+            new_chapters = self._select_new_chapters(book_title, domain, chapters)
+            if new_chapters is not None:
+                append = True
+                if not use_multi_progress:
+                    print(f"  🆕 更新模式：共 {len(chapters)} 章，新增 {len(new_chapters)} 章")
+                chapters = new_chapters
+                if not chapters:
+                    if use_multi_progress:
+                        self.display.update_domain_progress(domain, 0, 0, "已是最新", 'success')
+                    return True, book_title
+        
+        # 限制章节数量
+        if max_chapters and len(chapters) > max_chapters:
+            if not use_multi_progress:
+                print(f"  📊 限制爬取前 {max_chapters} 章（共 {len(chapters)} 章可用）")
+            chapters = chapters[:max_chapters]
+        
+        # 初始化进度（如果使用多域名进度显示）
+        if use_multi_progress:
+            self.display.update_domain_progress(domain, 0, len(chapters), "开始爬取...", 'running')
+        
+        # 打开断点续爬日志（--resume 时跳过日志中已有的章节）
+        journal, results = self._open_journal(book_title, domain, chapters, append)
+        
+        # 爬取章节内容（Selenium模式逐章抓取，每章从浏览器池借用WebDriver）
+        if self.crawl_config['engine'] == 'async' and not thread_driver and not self.use_selenium:
+            self._fetch_chapters_async(domain, chapters, results, journal, use_multi_progress)
+        elif self.crawl_config['engine'] == 'pipeline' and not thread_driver and not self.use_selenium:
+            self._fetch_chapters_pipeline(domain, chapters, results, journal, use_multi_progress)
+        else:
+            self._fetch_chapters_sync(domain, chapters, results, journal, use_multi_progress, thread_driver)
+        fetched = [item for item in results if item]
+        
+        # 完成进度显示
+        if use_multi_progress:
+            self.display.finish_domain_progress(domain, len(fetched), len(chapters))
+        
+        # 保存到文件：按章节顺序从日志逐章读回正文写出最终文件
+        if fetched:
+            self.save_novel_by_domain(book_title, domain, self._journal_chapters(journal, [item[2] for item in fetched]), append=append)
+            if len(fetched) == len(chapters):
+                journal.remove()  # 全部章节已保存，无需续爬
+            if self.crawl_config['update'] and append:
+                # 只记录在已保存数据之后追加的章节；没有已保存数据的域名整本抓取，其章节只作为比对与合并的来源
+                self._record_updated_chapters(book_title, [item[0] for item in fetched])
+            if not use_multi_progress:
+                self.display.print_domain_summary(domain_name, len(fetched), len(chapters))
+            return True, book_title
+        else:
+            if not use_multi_progress:
+                self.display.print_domain_summary(domain_name, 0, len(chapters))
+            return False, None
     
-    def crawl_novel_single_domain(self, keyword, domain, search_results, max_chapters=None, use_multi_progress=False):
-        """爬取单个域名的小说
+    def _journal_chapters(self, journal, urls, aligned=False):
+        """按给定顺序从日志逐章读回章节，供 save_novel_by_domain 流式写出
+        
+        Args:
+            journal (CrawlJournal): 章节日志
+            urls (list): 按保存顺序排列的章节URL
+            aligned (bool): 是否附带日志中记录的对齐章节索引
+            
+        Yields:
+            tuple: (标题, 内容, URL)，aligned 为True时为 (标题, 内容, URL, 章节索引)
+        """
+        for url in urls:
+            record = journal.read(url)
+            if record:
+                if aligned:
+                    yield record['title'], record['content'], record['url'], record['index']
+                else:
+                    yield record['title'], record['content'], record['url']
+    
+    def _select_new_chapters(self, novel_title, domain, chapters):
+        """更新模式：找出章节列表中上次保存之后新发布的章节
         
+        按章节URL（旧数据没有URL时按标题）与已保存的 _chapters.json 比对，
+        取最后一个已保存章节之后的尾部作为新章节。
+        
+        Args:
+            novel_title (str): 小说名称
+            domain (str): 域名
+            chapters (list): 最新获取的章节链接列表
+            
+        Returns:
+            list: 新章节链接列表；该域名没有已保存数据时返回None
+        """
+        saved_chapters = self._load_domain_chapters(novel_title, domain)
+        if not saved_chapters:
+            return None
+        
+        # 已保存数据带有URL时只按URL比对：重名章节（如"请假条"）很常见，按标题会把新章节误判为已保存
+        saved_urls = {chapter['url'] for chapter in saved_chapters if chapter.get('url')}
+        saved_titles = {chapter['title'] for chapter in saved_chapters}
+        
+        def is_saved(chapter):
+            if saved_urls:
+                return chapter['url'] in saved_urls
+            return chapter['title'] in saved_titles
+        
+        last_saved = -1
+        for i, chapter in enumerate(chapters):
+            if is_saved(chapter):
+                last_saved = i
+        
+        return [chapter for chapter in chapters[last_saved + 1:] if not is_saved(chapter)]
+    
+    def _record_updated_chapters(self, novel_title, chapter_titles):
+        """记录更新模式下新增的章节标题，供后续增量比对与合并使用
+        
+        Args:
+            novel_title (str): 小说名称
+            chapter_titles (list): 新增章节标题列表
+        """
+        with self.update_lock:
+            self.updated_chapters.setdefault(novel_title, set()).update(chapter_titles)
+    
+    def _open_journal(self, novel_title, domain, chapters, append=False):
+        """打开域名的断点续爬日志，并用日志中已有的章节预填结果
+
+        未启用 resume 时清空旧日志，从头开始记录。使用SQLite存储时日志同时把获取到的章节写入章节数据库。
+
+        Args:
+            novel_title (str): 小说名称
+            domain (str): 域名
+            chapters (list): 章节链接列表
+            append (bool): 是否为更新模式（章节接在已保存的章节之后）
+
+        Returns:
+            tuple: (CrawlJournal, 按章节顺序排列的 (标题, 正文长度, URL) 列表，未获取的位置为None)
+        """
+        domain_dir = self._domain_dir(novel_title, domain)
+        safe_title = self._safe_title(novel_title)
+        journal_file = os.path.join(domain_dir, f"{safe_title}_journal.jsonl")
+        store = None
+        index_offset = 0
+        domain_name = self.get_domain_name(domain)
+        if self.storage_config['backend'] == 'sqlite':
+            store = self._chapter_store(novel_title)
+            if append:
+                # 以前按文件格式保存的章节先转存到数据库，新章节接在其后
+                self._import_domain_files(novel_title, domain)
+                index_offset = store.next_index(domain_name)
+            elif not self.crawl_config['resume']:
+                store.clear(domain_name)
+        journal = CrawlJournal(journal_file, store, domain_name, index_offset)
+        results = [None] * len(chapters)
+        
+        if self.crawl_config['resume']:
+            records = journal.load()
+            for i, chapter in enumerate(chapters):
+                record = records.get(chapter['url'])
+                if record:
+                    results[i] = (record['title'], record['length'], record['url'])
+            resumed = sum(1 for item in results if item)
+            if resumed:
+                print(f"  ♻️  [{self.get_domain_name(domain)}] 从断点日志恢复 {resumed}/{len(chapters)} 章")
+        else:
+            journal.reset()
+        
+        return journal, results
+    
+    def _fetch_chapters_sync(self, domain, chapters, results, journal, use_multi_progress=False, thread_driver=None):
+        """逐章抓取单个域名的章节，结果写入 results 并追加到断点日志
+
         Args:
-            keyword (str): 搜索关键字
             domain (str): 域名
-            search_results (list): 搜索结果列表
-            max_chapters (int, optional): 最大章节数限制
+            chapters (list): 章节链接列表
+            results (list): 按章节顺序排列的 (标题, 正文长度, URL) 列表，已有结果的章节会被跳过
+            journal (CrawlJournal): 断点续爬日志
             use_multi_progress (bool): 是否使用多域名进度显示
-            
-        Returns:
-            tuple: (是否成功, 小说标题)
+            thread_driver (webdriver.Chrome, optional): 线程专用的WebDriver实例
         """
         domain_name = self.get_domain_name(domain)
         
-        try:
-            # 选择第一个搜索结果
-            first_result = search_results[0]
-            book_url = first_result.get('url_list')
-            book_title = first_result.get('articlename', keyword)
-            
-            # 如果不使用多域名进度显示，则使用原有的显示方式
-            if not use_multi_progress:
-                self.display.print_domain_start(domain_name, book_title)
-            
-            # 获取章节列表
-            chapters = self.get_chapter_list(domain, book_url)
-            if not chapters:
-                if use_multi_progress:
-                    self.display.finish_domain_progress(domain, 0, 0)
-                else:
-                    self.display.print_domain_summary(domain_name, 0, 0)
-                return False, None
+        for i, chapter in enumerate(chapters, 1):
+            if use_multi_progress:
+                # 更新多域名进度显示
+                self.display.update_domain_progress(domain, i, len(chapters), chapter['title'], 'running')
+            else:
+                # 使用原有的进度显示
+                self.display.print_progress(i, len(chapters), chapter['title'], domain_name)
             
-            # 限制章节数量
-            if max_chapters and len(chapters) > max_chapters:
-                chapters = chapters[:max_chapters]
+            if results[i - 1]:
+                # 断点日志中已有该章节
                 if not use_multi_progress:
-                    print(f"  📊 限制爬取前 {max_chapters} 章（共 {len(chapters)} 章可用）")
+                    self.display.print_chapter_success(domain_name, results[i - 1][1])
+                continue
             
-            # 初始化进度（如果使用多域名进度显示）
-            if use_multi_progress:
-                self.display.update_domain_progress(domain, 0, len(chapters), "开始爬取...", 'running')
+            title, content = self.get_chapter_content(domain, chapter['url'], thread_driver)
             
-            # 爬取章节内容
-            chapters_data = []
-            for i, chapter in enumerate(chapters, 1):
+            # 根据结果处理
+            if title and content and len(content) > 50:
+                results[i - 1] = (title, len(content), chapter['url'])
+                journal.append(i - 1, chapter['url'], title, content)
+                if not use_multi_progress:
+                    self.display.print_chapter_success(domain_name, len(content))
+            else:
+                if not use_multi_progress:
+                    reason = "内容为空" if not content else f"内容过短({len(content) if content else 0}字)"
+                    self.display.print_chapter_failed(domain_name, reason)
+
+    def _fetch_chapters_async(self, domain, chapters, results, journal, use_multi_progress=False):
+        """使用asyncio引擎并发抓取单个域名的章节
+
+        每个章节仍然通过 get_chapter_content 获取（保持 geturl API → 直接访问 → 备用API 的回退顺序），
+        同一时间最多有 async_concurrency 个章节请求在途。结果按章节索引写入 results。
+
+        Args:
+            domain (str): 域名
+            chapters (list): 章节链接列表
+            results (list): 按章节顺序排列的 (标题, 正文长度, URL) 列表，已有结果的章节会被跳过
+            journal (CrawlJournal): 断点续爬日志
+            use_multi_progress (bool): 是否使用多域名进度显示
+        """
+        asyncio.run(self._fetch_chapters_async_main(domain, chapters, results, journal, use_multi_progress))
+
+    async def _fetch_chapters_async_main(self, domain, chapters, results, journal, use_multi_progress):
+        """async引擎的协程主体
+
+        Args:
+            domain (str): 域名
+            chapters (list): 章节链接列表
+            results (list): 按章节顺序排列的 (标题, 正文长度, URL) 列表
+            journal (CrawlJournal): 断点续爬日志
+            use_multi_progress (bool): 是否使用多域名进度显示
+        """
+        domain_name = self.get_domain_name(domain)
+        concurrency = max(1, int(self.crawl_config['async_concurrency']))
+        semaphore = asyncio.Semaphore(concurrency)
+        loop = asyncio.get_running_loop()
+        pending = [i for i in range(len(chapters)) if not results[i]]
+        finished = len(chapters) - len(pending)
+
+        # requests是阻塞库，在专用线程池中执行，信号量保证在途请求数不超过并发上限
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+            async def fetch_one(index, chapter):
+                nonlocal finished
+                async with semaphore:
+                    title, content = await loop.run_in_executor(
+                        executor, self.get_chapter_content, domain, chapter['url']
+                    )
+
+                finished += 1
                 if use_multi_progress:
-                    # 更新多域名进度显示
-                    self.display.update_domain_progress(domain, i, len(chapters), chapter['title'], 'running')
+                    self.display.update_domain_progress(domain, finished, len(chapters), chapter['title'], 'running')
                 else:
-                    # 使用原有的进度显示
-                    self.display.print_progress(i, len(chapters), chapter['title'], domain_name)
-                
-                title, content = self.get_chapter_content(domain, chapter['url'])
-                
-                # 根据结果处理
+                    self.display.print_progress(finished, len(chapters), chapter['title'], domain_name)
+
                 if title and content and len(content) > 50:
-                    chapters_data.append((title, content))
+                    results[index] = (title, len(content), chapter['url'])
+                    journal.append(index, chapter['url'], title, content)
                     if not use_multi_progress:
                         self.display.print_chapter_success(domain_name, len(content))
                 else:
                     if not use_multi_progress:
                         reason = "内容为空" if not content else f"内容过短({len(content) if content else 0}字)"
                         self.display.print_chapter_failed(domain_name, reason)
-                
-                # 添加延时，避免请求过快
-                time.sleep(0.8)  # 减少延时以提高并发效率
-            
-            # 完成进度显示
+
+            await asyncio.gather(*(fetch_one(i, chapters[i]) for i in pending))
+
+    def _parse_worker_count(self):
+        """获取pipeline引擎的解析进程数
+
+        Returns:
+            int: 解析进程数
+        """
+        return max(1, int(self.crawl_config['parse_workers'] or os.cpu_count() or 1))
+
+    def _get_parse_pool(self):
+        """获取pipeline引擎的解析进程池，首次调用时创建（各域名共用）
+
+        进程池在下载线程中创建，用fork启动会复制其他线程持有的锁，因此改用forkserver（不支持时用spawn）。
+
+        Returns:
+            ProcessPoolExecutor: 解析进程池
+        """
+        with self.parse_pool_lock:
+            if self.parse_pool is None:
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self.parse_pool = ProcessPoolExecutor(max_workers=self._parse_worker_count(),
+                                                      mp_context=multiprocessing.get_context(method))
+            return self.parse_pool
+
+    def _replace_parse_pool(self, broken_pool):
+        """丢弃已损坏的解析进程池（解析进程意外退出），返回新建的进程池
+
+        Args:
+            broken_pool (ProcessPoolExecutor): 已损坏的进程池
+
+        Returns:
+            ProcessPoolExecutor: 新的解析进程池
+        """
+        with self.parse_pool_lock:
+            if self.parse_pool is broken_pool:
+                self.parse_pool = None
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        return self._get_parse_pool()
+
+    def _download_chapter_page(self, domain, chapter_url):
+        """只下载章节页面、不解析（pipeline引擎的下载阶段）
+
+        按该域名成功率排序尝试 geturl 跳转和直接访问章节页；磁盘缓存命中时直接使用缓存的页面。
+
+        Args:
+            domain (str): 域名
+            chapter_url (str): 章节URL
+
+        Returns:
+            dict: {'html': 页面文本, 'method': 获取方式, 'response': 响应, 'cache_key': 缓存键URL}，
+                  缓存命中时 method 和 response 为None；下载失败返回None
+        """
+        full_chapter_url = chapter_url if chapter_url.startswith('http') else urljoin(domain, chapter_url)
+        cache = self._get_http_cache()
+        if cache is not None:
+            cached = cache.get(full_chapter_url)
+            html_text, mojibake = self.charsets.decode(domain, cached) if cached is not None else (None, True)
+            if not mojibake:
+                return {'html': html_text, 'method': None, 'response': None, 'cache_key': full_chapter_url}
+
+        for method in self.method_profiles.order(domain, ['geturl', 'direct']):
+            try:
+                url = full_chapter_url
+                if method == 'geturl':
+                    geturl_api = f"{domain.rstrip('/')}/user/geturl.html?url={full_chapter_url}"
+                    response = self._http_get(domain, geturl_api, timeout=10, allow_redirects=False)
+                    url = response.headers.get('Location') if response.status_code in [301, 302] else None
+                    if not url:
+                        self.method_profiles.record(domain, method, False)
+                        continue
+                response = self._http_get(domain, url, timeout=10)
+                if response.status_code == 200:
+                    html_text, mojibake = self.charsets.decode(domain, response)
+                    if mojibake:
+                        return None  # 乱码页面交给完整获取流程重新获取
+                    return {'html': html_text, 'method': method, 'response': response, 'cache_key': full_chapter_url}
+            except Exception:
+                pass
+            self.method_profiles.record(domain, method, False)
+        return None
+
+    def _fetch_chapters_pipeline(self, domain, chapters, results, journal, use_multi_progress=False):
+        """使用下载/解析两阶段流水线抓取单个域名的章节
+
+        下载线程只负责下载页面，下载的页面放入有界队列，由解析进程池解析提取章节内容，
+        解析不受GIL限制。队列已满时下载线程阻塞等待，避免下载速度远超解析时页面在内存中堆积。
+        下载失败或解析结果无效的章节回退到 get_chapter_content 的完整获取流程；解析进程意外退出时
+        重建进程池，受影响的章节同样回退。主循环出错时通知下载线程停止，不会阻塞在已满的队列上。
+
+        Args:
+            domain (str): 域名
+            chapters (list): 章节链接列表
+            results (list): 按章节顺序排列的 (标题, 正文长度, URL) 列表，已有结果的章节会被跳过
+            journal (CrawlJournal): 断点续爬日志
+            use_multi_progress (bool): 是否使用多域名进度显示
+        """
+        domain_name = self.get_domain_name(domain)
+        pending = [i for i in range(len(chapters)) if not results[i]]
+        finished = len(chapters) - len(pending)
+        remaining = len(pending)
+        downloaded = queue.Queue(maxsize=max(1, int(self.crawl_config['pipeline_queue_size'])))
+        parse_pool = self._get_parse_pool()
+        max_parsing = self._parse_worker_count() * 2
+        stats = {'downloaded': 0, 'download_time': 0.0, 'parsed': 0, 'parse_time': 0.0,
+                 'fallback': 0, 'queue_wait': 0.0, 'elapsed': 0.0}
+        stats_lock = threading.Lock()
+        stopped = threading.Event()
+        start = time.time()
+
+        def put(item, download_time=0.0):
+            # 队列已满时阻塞，下载阶段等待解析阶段跟上；主循环停止后放弃
+            wait_start = time.time()
+            while True:
+                if stopped.is_set():
+                    return
+                try:
+                    downloaded.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            with stats_lock:
+                stats['queue_wait'] += time.time() - wait_start
+                if download_time:
+                    stats['downloaded'] += 1
+                    stats['download_time'] += download_time
+
+        def download(index, chapter):
+            if stopped.is_set():
+                return
+            download_start = time.time()
+            try:
+                page = self._download_chapter_page(domain, chapter['url'])
+            except Exception:
+                page = None
+            if page is None:
+                fallback(index, chapter)
+            else:
+                put((index, chapter, page, None), time.time() - download_start)
+
+        def fallback(index, chapter):
+            if stopped.is_set():
+                return
+            with stats_lock:
+                stats['fallback'] += 1
+            title, content = self.get_chapter_content(domain, chapter['url'])
+            put((index, chapter, None, (title, content)))
+
+        def finish(index, chapter, title, content):
+            nonlocal finished, remaining
+            finished += 1
+            remaining -= 1
             if use_multi_progress:
-                self.display.finish_domain_progress(domain, len(chapters_data), len(chapters))
-            
-            # 保存到文件
-            if chapters_data:
-                self.save_novel_by_domain(book_title, domain, chapters_data)
-                if not use_multi_progress:
-                    self.display.print_domain_summary(domain_name, len(chapters_data), len(chapters))
-                return True, book_title
+                self.display.update_domain_progress(domain, finished, len(chapters), chapter['title'], 'running')
             else:
+                self.display.print_progress(finished, len(chapters), chapter['title'], domain_name)
+
+            if title and content and len(content) > 50:
+                results[index] = (title, len(content), chapter['url'])
+                journal.append(index, chapter['url'], title, content)
                 if not use_multi_progress:
-                    self.display.print_domain_summary(domain_name, 0, len(chapters))
-                return False, None
-                
-        except Exception as e:
-            if use_multi_progress:
-                self.display.update_domain_progress(domain, 0, 0, f"错误: {str(e)[:20]}", 'failed')
+                    self.display.print_chapter_success(domain_name, len(content))
             else:
-                print(f"\n{self.display.colored_text(f'❌ [{domain_name}]', 'red')} 爬取异常: {e}")
-            return False, None
-    
-    def crawl_novel(self, keyword, max_chapters=None, max_workers=2):
-        """爬取小说主函数（支持多域名）
+                if not use_multi_progress:
+                    reason = "内容为空" if not content else f"内容过短({len(content) if content else 0}字)"
+                    self.display.print_chapter_failed(domain_name, reason)
+
+        def handle_parsed(future, io_executor):
+            nonlocal parse_pool
+            index, chapter, page = parsing.pop(future)
+            try:
+                title, content, profile, parse_time = future.result()
+            except BrokenProcessPool:
+                if parse_pool is pool_of.get(future):
+                    parse_pool = self._replace_parse_pool(parse_pool)
+                io_executor.submit(fallback, index, chapter)
+                return
+            except Exception:
+                title, content, profile, parse_time = None, None, {}, 0.0
+            finally:
+                pool_of.pop(future, None)
+            with stats_lock:
+                stats['parsed'] += 1
+                stats['parse_time'] += parse_time
+            success = bool(title and content and len(content) > 50)
+            if page['method']:
+                self.method_profiles.record(domain, page['method'], success)
+            if not success:
+                io_executor.submit(fallback, index, chapter)
+                return
+            for key in ('title_selector', 'content_selector'):
+                if profile.get(key):
+                    self.site_profiles.learn(domain, key, profile[key])
+            cache = self._get_http_cache()
+            if cache is not None and page['response'] is not None:
+                cache.store(page['cache_key'], page['response'])
+            finish(index, chapter, title, content)
+
+        parsing = {}  # {解析任务: (章节索引, 章节, 下载的页面)}
+        pool_of = {}  # {解析任务: 提交时使用的进程池}
+        with ThreadPoolExecutor(max_workers=max(1, int(self.crawl_config['async_concurrency']))) as io_executor:
+            try:
+                for i in pending:
+                    io_executor.submit(download, i, chapters[i])
+
+                while remaining:
+                    # 解析任务未满时从队列取下载好的页面提交给解析进程
+                    if len(parsing) < max_parsing:
+                        try:
+                            index, chapter, page, parsed = downloaded.get(timeout=0.05)
+                        except queue.Empty:
+                            pass
+                        else:
+                            if page is None:
+                                finish(index, chapter, *parsed)
+                            else:
+                                try:
+                                    future = parse_pool.submit(
+                                        _parse_chapter_worker, page['html'], domain,
+                                        self.site_profiles.get(domain), dict(self.crawl_config))
+                                except BrokenProcessPool:
+                                    parse_pool = self._replace_parse_pool(parse_pool)
+                                    io_executor.submit(fallback, index, chapter)
+                                else:
+                                    parsing[future] = (index, chapter, page)
+                                    pool_of[future] = parse_pool
+                    # 收集已完成的解析结果；解析任务已满时阻塞等待
+                    if parsing:
+                        done, _ = wait(list(parsing), timeout=None if len(parsing) >= max_parsing else 0,
+                                       return_when=FIRST_COMPLETED)
+                        for future in done:
+                            handle_parsed(future, io_executor)
+            finally:
+                # 出错退出时通知下载线程停止、取消未开始的任务并清空队列，避免线程阻塞在已满的队列上
+                stopped.set()
+                io_executor.shutdown(wait=False, cancel_futures=True)
+                for future in parsing:
+                    future.cancel()
+                while True:
+                    try:
+                        downloaded.get_nowait()
+                    except queue.Empty:
+                        break
+
+        stats['elapsed'] = time.time() - start
+        self.pipeline_stats[domain] = stats
+        if not use_multi_progress and pending:
+            download_avg = stats['download_time'] / stats['downloaded'] if stats['downloaded'] else 0
+            parse_avg = stats['parse_time'] / stats['parsed'] * 1000 if stats['parsed'] else 0
+            rate = len(pending) / stats['elapsed'] if stats['elapsed'] else 0
+            print(f"  📈 [{domain_name}] 下载 {stats['downloaded']} 页（平均 {download_avg:.2f} 秒/页，"
+                  f"队列满等待 {stats['queue_wait']:.1f} 秒）| 解析 {stats['parsed']} 页（平均 {parse_avg:.1f} 毫秒/页CPU）"
+                  f"| 回退 {stats['fallback']} 页 | {rate:.1f} 章/秒")
+
+    def _crawl_all_domains(self, keyword, all_search_results, max_chapters=None, max_workers=2):
+        """每个域名独立爬取整本小说（默认调度方式）
         
         Args:
             keyword (str): 搜索关键字
+            all_search_results (dict): {域名: 搜索结果列表}
             max_chapters (int, optional): 最大章节数限制
             max_workers (int): 最大并发数
+            
+        Returns:
+            tuple: (成功的域名列表, 小说名称集合)
         """
-        # 美化显示：开始爬取
-        self.display.print_title(f"🔍 开始搜索小说: {keyword}")
-        mode = 'Selenium模式' if self.use_selenium else '普通模式'
-        print(f"  🔧 使用模式: {self.display.colored_text(mode, 'cyan')}")
-        
-        # 1. 在所有域名中搜索小说
-        print(f"\n{self.display.colored_text('📡 搜索阶段', 'yellow')}")
-        print("─" * 50)
-        
-        all_search_results = self.search_novel_all_domains(keyword)
-        if not all_search_results:
-            print(f"\n{self.display.colored_text('❌ 搜索失败', 'red')} - 所有域名都未找到相关小说")
-            return
-        
-        print(f"\n{self.display.colored_text('✅ 搜索完成', 'green')} - 在 {len(all_search_results)} 个域名中找到结果")
-        
-        # 2. 如果使用Selenium，为了避免多线程冲突，改为串行处理
-        print(f"\n{self.display.colored_text('📚 爬取阶段', 'yellow')}")
-        print("─" * 50)
-        
         successful_domains = []
         novel_titles = set()  # 收集所有小说名称
         
@@ -1342,6 +4972,232 @@ class NovelCrawler:
         # 完成进度显示
         self.display.finalize_progress_display()
         
+        return successful_domains, novel_titles
+    
+    def crawl_novel_scheduled(self, keyword, all_search_results, max_chapters=None):
+        """跨域名章节调度爬取：每个章节只从一个域名获取
+        
+        先获取各域名的章节列表并按章节标题对齐，再由 ChapterScheduler 把章节分配给
+        空闲且最快的健康域名。只有验证配额抽中的章节和校验失败的章节会从其他域名再取一份。
+        不支持更新模式和断点续爬（crawl_novel 在启用 update/resume 时改为按域名爬取）。
+        各域名只保存自己获取到的章节，章节记录带有对齐后的索引，合并时按索引还原顺序。
+        获取到的章节立即写入各域名的章节记录文件，内存中只保留章节索引和URL，最后按索引顺序读回保存。
+        
+        Args:
+            keyword (str): 搜索关键字
+            all_search_results (dict): {域名: 搜索结果列表}
+            max_chapters (int, optional): 最大章节数限制
+            
+        Returns:
+            tuple: (成功的域名列表, 小说名称集合)
+        """
+        # 1. 并行获取各域名的章节列表
+        print(f"  ⚡ 跨域名章节调度（验证配额: {self.crawl_config['verify_ratio']:.0%}）")
+        chapter_lists = {}
+        book_titles = defaultdict(int)
+        with ThreadPoolExecutor(max_workers=max(1, len(all_search_results))) as executor:
+            future_to_domain = {
+                executor.submit(self.get_chapter_list, domain, search_results[0].get('url_list')): domain
+                for domain, search_results in all_search_results.items()
+            }
+            for future in as_completed(future_to_domain):
+                domain = future_to_domain[future]
+                chapters = future.result()
+                if chapters:
+                    chapter_lists[domain] = chapters[:max_chapters] if max_chapters else chapters
+                    book_titles[all_search_results[domain][0].get('articlename', keyword)] += 1
+        
+        if not chapter_lists:
+            print(f"  {self.display.colored_text('❌ 所有域名都未获取到章节列表', 'red')}")
+            return [], set()
+        
+        # 各域名保存在同一个小说目录下，取最多域名使用的书名
+        book_title = max(book_titles.items(), key=lambda item: item[1])[0]
+        aligned_chapters = self._align_chapter_lists(chapter_lists)
+        scheduler = ChapterScheduler(aligned_chapters, self.crawl_config['verify_ratio'])
+        print(f"  📚 对齐后共 {len(aligned_chapters)} 章，参与调度的域名: {len(chapter_lists)} 个")
+        
+        # 2. 空闲域名按响应速度领取章节
+        domain_results = defaultdict(list)  # {域名: [(章节索引, URL)]}
+        total = len(aligned_chapters)
+        safe_title = self._safe_title(book_title)
+        journals = {}  # 域名获取到第一个章节时才创建章节记录文件
+        store = None
+        if self.storage_config['backend'] == 'sqlite':
+            # 获取到的章节立即写入章节数据库
+            store = self._chapter_store(book_title)
+            for domain in chapter_lists:
+                store.clear(self.get_domain_name(domain))
+        
+        def fetch(domain, index, chapter):
+            start = time.time()
+            title, content = self.get_chapter_content(domain, chapter['url'])
+            return domain, index, chapter, title, content, time.time() - start
+        
+        with ThreadPoolExecutor(max_workers=len(chapter_lists)) as executor:
+            idle_domains = set(chapter_lists)
+            in_flight = set()
+            
+            while True:
+                for domain in scheduler.rank_domains(idle_domains):
+                    task = scheduler.next_task(domain)
+                    if task:
+                        index, chapter = task
+                        idle_domains.discard(domain)
+                        in_flight.add(executor.submit(fetch, domain, index, chapter))
+                
+                # 没有在途请求且无法再分配任务：全部完成，或剩余章节已无可用域名
+                if not in_flight:
+                    break
+                
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    domain, index, chapter, title, content, elapsed = future.result()
+                    valid = self._is_valid_chapter_content(title, content)
+                    scheduler.complete(domain, index, valid, elapsed)
+                    if valid:
+                        if domain not in journals:
+                            domain_dir = self._domain_dir(book_title, domain)
+                            journals[domain] = CrawlJournal(os.path.join(domain_dir, f"{safe_title}_scheduled.jsonl"))
+                            journals[domain].reset()
+                        domain_results[domain].append((index, chapter['url']))
+                        journals[domain].append(index, chapter['url'], title, content)
+                        if store is not None:
+                            store.add(self.get_domain_name(domain), index, title, content, chapter['url'], aligned=True)
+                    idle_domains.add(domain)
+                    self.display.print_progress(scheduler.completed_count(), total, chapter['title'], 'scheduler')
+        
+        print()
+        
+        # 3. 各域名保存自己获取到的章节
+        successful_domains = []
+        for domain, fetched in domain_results.items():
+            fetched.sort()
+            chapters_data = self._journal_chapters(journals[domain], [url for _, url in fetched], aligned=True)
+            self.save_novel_by_domain(book_title, domain, chapters_data)
+            successful_domains.append(domain)
+        for journal in journals.values():
+            journal.remove()
+        
+        # 显示调度统计
+        print(f"\n  📊 调度统计: 获取 {scheduler.completed_count()}/{total} 章")
+        for domain in chapter_lists:
+            stats = scheduler.stats[domain]
+            latency = scheduler.latency.get(domain)
+            status = self.display.colored_text('不健康', 'red') if domain in scheduler.unhealthy else self.display.colored_text('正常', 'green')
+            latency_text = f"{latency:.2f}s" if latency is not None else '-'
+            print(f"    {self.get_domain_name(domain):<20} 成功 {stats['fetched']:>5}  失败 {stats['failed']:>4}  平均耗时 {latency_text:>6}  {status}")
+        
+        return successful_domains, ({book_title} if successful_domains else set())
+    
+    def _align_chapter_lists(self, chapter_lists):
+        """按章节标题对齐各域名的章节列表
+        
+        以章节最多的域名为基准顺序，其他域名按规范化后的标题匹配到基准章节；
+        标题完全对不上的域名退化为按位置对齐。
+        
+        Args:
+            chapter_lists (dict): {域名: 章节链接列表}
+            
+        Returns:
+            list: 对齐后的章节列表，每个元素为 {域名: 章节链接信息}
+        """
+        def normalize(title):
+            return re.sub(r'[\s\W_]+', '', title)
+        
+        base_domain = max(chapter_lists, key=lambda domain: len(chapter_lists[domain]))
+        base_chapters = chapter_lists[base_domain]
+        aligned = [{base_domain: chapter} for chapter in base_chapters]
+        base_index = {}
+        for i, chapter in enumerate(base_chapters):
+            base_index.setdefault(normalize(chapter['title']), i)
+        
+        for domain, chapters in chapter_lists.items():
+            if domain == base_domain:
+                continue
+            matches = [(base_index.get(normalize(chapter['title'])), chapter) for chapter in chapters]
+            if any(index is not None for index, _ in matches):
+                for index, chapter in matches:
+                    if index is not None and domain not in aligned[index]:
+                        aligned[index][domain] = chapter
+            else:
+                for index, chapter in enumerate(chapters[:len(aligned)]):
+                    aligned[index][domain] = chapter
+        
+        return aligned
+    
+    def _is_valid_chapter_content(self, title, content):
+        """校验获取到的章节内容是否有效
+        
+        Args:
+            title (str): 章节标题
+            content (str): 章节内容
+            
+        Returns:
+            bool: 是否有效
+        """
+        if not title or not content or len(content) <= 50:
+            return False
+        return not any(marker in content for marker in ('加载中', '页面不存在', '章节不存在', '正在加载'))
+    
+    def crawl_novel(self, keyword, max_chapters=None, max_workers=2):
+        """爬取小说主函数（支持多域名）
+        
+        Args:
+            keyword (str): 搜索关键字
+            max_chapters (int, optional): 最大章节数限制
+            max_workers (int): 最大并发数
+        """
+        # 美化显示：开始爬取
+        self.display.print_title(f"🔍 开始搜索小说: {keyword}")
+        mode = 'Selenium模式' if self.use_selenium else '普通模式'
+        print(f"  🔧 使用模式: {self.display.colored_text(mode, 'cyan')}")
+        if not self.use_selenium and self.crawl_config['engine'] == 'async':
+            print(f"  ⚡ 抓取引擎: {self.display.colored_text('async', 'cyan')}"
+                  f"（每个域名并发 {self.crawl_config['async_concurrency']} 个请求）")
+        elif not self.use_selenium and self.crawl_config['engine'] == 'pipeline':
+            print(f"  ⚡ 抓取引擎: {self.display.colored_text('pipeline', 'cyan')}"
+                  f"（每个域名并发 {self.crawl_config['async_concurrency']} 个下载，"
+                  f"{self._parse_worker_count()} 个解析进程）")
+        
+        # 1. 在所有域名中搜索小说
+        print(f"\n{self.display.colored_text('📡 搜索阶段', 'yellow')}")
+        print("─" * 50)
+        
+        all_search_results = self.search_novel_all_domains(keyword)
+        if not all_search_results:
+            print(f"\n{self.display.colored_text('❌ 搜索失败', 'red')} - 所有域名都未找到相关小说")
+            self.rate_limiter.save_state()
+            self.method_profiles.save_state()
+            self.site_profiles.save_state()
+            return
+        
+        print(f"\n{self.display.colored_text('✅ 搜索完成', 'green')} - 在 {len(all_search_results)} 个域名中找到结果")
+        
+        # 各域名的第一个搜索结果不一定是同一本书，先选出各域名共同收录的书
+        all_search_results = self._select_consensus_book(keyword, all_search_results)
+        
+        # 2. 如果使用Selenium，为了避免多线程冲突，改为串行处理
+        print(f"\n{self.display.colored_text('📚 爬取阶段', 'yellow')}")
+        print("─" * 50)
+        
+        self.updated_chapters = {}
+        cache = self._get_http_cache()
+        # 每个域名的连接池按该域名可能同时在途的请求数设置
+        self.sessions.resize(max(10, max_workers, self.crawl_config['async_concurrency']))
+        if cache is not None:
+            cache.reset_stats()
+        
+        if self.crawl_config['scheduler'] == 'shared' and (self.crawl_config['update'] or self.crawl_config['resume']):
+            # 跨域名调度不支持更新模式和断点续爬，退回按域名爬取，避免重新下载并覆盖已保存的数据
+            print(f"  {self.display.colored_text('⚠️  跨域名调度不支持 update/resume，改为按域名爬取', 'yellow')}")
+            successful_domains, novel_titles = self._crawl_all_domains(keyword, all_search_results, max_chapters, max_workers)
+        elif self.crawl_config['scheduler'] == 'shared' and not self.use_selenium:
+            # 跨域名章节调度：每个章节只从最快的空闲域名获取一次
+            successful_domains, novel_titles = self.crawl_novel_scheduled(keyword, all_search_results, max_chapters)
+        else:
+            successful_domains, novel_titles = self._crawl_all_domains(keyword, all_search_results, max_chapters, max_workers)
+        
         # 显示爬取总结
         self.display.print_crawl_summary(len(successful_domains))
         if successful_domains:
@@ -1352,24 +5208,58 @@ class NovelCrawler:
         if len(successful_domains) >= 2 and novel_titles:
             self.display.print_compare_start()
             for novel_title in novel_titles:
+                # 更新模式下只比对、合成新增的章节
+                chapter_titles = None
+                merged_info_file = os.path.join(self.output_dir, novel_title, 'merged_best', f'{novel_title}_merged_info.json')
+                if self.crawl_config['update'] and os.path.exists(merged_info_file):
+                    # 还没有合成版本时（例如首次以更新模式运行）进行全量比对与合成
+                    chapter_titles = self.updated_chapters.get(novel_title, set())
+                    if not chapter_titles:
+                        print(f"  ✅ {self.display.colored_text(novel_title, 'blue')} 没有新章节，已是最新")
+                        continue
+                    print(f"  🆕 新增章节: {len(chapter_titles)} 章")
+                
                 print(f"  📖 比对小说: {self.display.colored_text(novel_title, 'blue')}")
-                self.compare_chapters(novel_title)
+                self.compare_chapters(novel_title, chapter_titles)
                 
                 # 4. 合成最佳版本
                 self.display.print_merge_start()
                 print(f"  📝 合成小说: {self.display.colored_text(novel_title, 'blue')}")
-                self.merge_best_content(novel_title)
+                self.merge_best_content(novel_title, chapter_titles)
         else:
             print(f"\n{self.display.colored_text('ℹ️  提示', 'yellow')} - 只有一个域名成功，无法进行内容比对")
         
-        # 5. 清理资源
+        # 5. 报告HTTP缓存命中与连接复用情况
+        if cache is not None:
+            stats = cache.stats
+            print(f"\n{self.display.colored_text('💾 HTTP缓存', 'cyan')}: 命中 {stats['hits']}"
+                  f"（含304重新验证 {stats['revalidated']}），未命中 {stats['misses']}，新写入 {stats['stored']}")
+        
+        connection_stats = self.get_connection_stats().values()
+        total_requests = sum(item['requests'] for item in connection_stats)
+        if total_requests:
+            total_connections = sum(item['connections'] for item in connection_stats)
+            print(f"{self.display.colored_text('🔗 连接复用', 'cyan')}: {total_requests} 个请求共新建 {total_connections} 个连接"
+                  f"（复用率 {1 - total_connections / total_requests:.1%}）")
+        
+        for domain, stats in self.get_charset_stats().items():
+            if stats['responses']:
+                print(f"{self.display.colored_text('🔤 解码', 'cyan')} [{self.get_domain_name(domain)}]: {stats['charset']}，"
+                      f"{stats['responses']} 个页面平均 {stats['decode_time'] / stats['responses'] * 1000:.2f} 毫秒/页，"
+                      f"乱码 {stats['mojibake']} 次（重新获取 {stats['refetched']} 次）")
+        
+        # 6. 保存各域名的限速状态并清理资源
+        self.rate_limiter.save_state()
+        self.method_profiles.save_state()
+        self.site_profiles.save_state()
         self.cleanup()
     
-    def merge_best_content(self, novel_title):
+    def merge_best_content(self, novel_title, chapter_titles=None):
         """合成最佳版本的小说内容
         
         Args:
             novel_title (str): 小说标题
+            chapter_titles (set, optional): 只合成这些章节并追加到已有的合成版本之后（更新模式）
         """
         try:
             novel_dir = os.path.join(self.output_dir, novel_title)
@@ -1388,45 +5278,50 @@ class NovelCrawler:
             
             print(f"正在分析 {len(comparison_data)} 个章节的内容质量...")
             
-            # 收集所有域名的章节数据
-            domain_chapters = {}
-            for domain_name in os.listdir(novel_dir):
-                domain_path = os.path.join(novel_dir, domain_name)
-                if os.path.isdir(domain_path):
-                    chapters_file = os.path.join(domain_path, f'{novel_title}_chapters.json')
-                    if os.path.exists(chapters_file):
-                        with open(chapters_file, 'r', encoding='utf-8') as f:
-                            domain_chapters[domain_name] = json.load(f)
-            
-            if not domain_chapters:
+            # 各域名的章节数据（SQLite存储按标题逐章查询，jsonl存储按偏移索引逐章读取，JSON存储整体读入）
+            source = self._open_chapter_source(novel_title)
+            domain_names = source.domains()
+            if not domain_names:
                 print("未找到任何域名的章节数据")
                 return
             
-            print(f"找到 {len(domain_chapters)} 个域名的章节数据")
+            print(f"找到 {len(domain_names)} 个域名的章节数据")
             
             # 合成最佳内容
             merged_chapters = []
             chapter_stats = {'total': 0, 'merged': 0, 'skipped': 0}
             
             # 获取章节列表（以第一个域名为基准）
-            first_domain = list(domain_chapters.keys())[0]
-            base_chapters = domain_chapters[first_domain]
+            base_titles = source.titles(domain_names[0])
+            
+            # 跨域名调度保存的数据每个域名只含部分章节，按对齐索引取各域名章节的并集
+            if source.all_aligned():
+                base_titles = source.titles()
+            
+            # 增量合成：只处理新增章节，按各域名中出现的顺序排列
+            merged_info_file = os.path.join(novel_dir, 'merged_best', f'{novel_title}_merged_info.json')
+            if chapter_titles is not None and os.path.exists(merged_info_file):
+                # 已合成过的章节（例如落后的域名本次才获取到的旧章节）不再重复追加
+                with open(merged_info_file, 'r', encoding='utf-8') as f:
+                    merged_titles = {chapter['title'] for chapter in json.load(f).get('chapters', [])}
+                base_titles = list(dict.fromkeys(
+                    title for domain_name in domain_names for title in source.titles(domain_name)
+                    if title in chapter_titles and title not in merged_titles
+                ))
+                if not base_titles:
+                    print("✓ 没有需要合成的新章节")
+                    return
+            else:
+                chapter_titles = None  # 没有已有的合成版本时退化为全量合成
             
-            for chapter_info in base_chapters:
-                chapter_title = chapter_info['title']
+            for chapter_title in base_titles:
                 chapter_stats['total'] += 1
                 
                 # 收集该章节在所有域名中的内容
-                chapter_contents = []
-                for domain_name, chapters in domain_chapters.items():
-                    for ch in chapters:
-                        if ch['title'] == chapter_title:
-                            chapter_contents.append({
-                                'domain': domain_name,
-                                'content': ch['content'],
-                                'length': len(ch['content'])
-                            })
-                            break
+                chapter_contents = [
+                    {'domain': domain_name, 'content': ch['content'], 'length': len(ch['content'])}
+                    for domain_name, ch in source.lookup(chapter_title).items()
+                ]
                 
                 if not chapter_contents:
                     print(f"跳过章节: {chapter_title} (未找到内容)")
@@ -1450,7 +5345,7 @@ class NovelCrawler:
             
             # 保存合成版本
             if merged_chapters:
-                self._save_merged_novel(novel_title, merged_chapters, chapter_stats)
+                self._save_merged_novel(novel_title, merged_chapters, chapter_stats, append=chapter_titles is not None)
                 print(f"✓ 合成完成！共处理 {chapter_stats['total']} 章，成功合成 {chapter_stats['merged']} 章，跳过 {chapter_stats['skipped']} 章")
             else:
                 print("✗ 合成失败，未找到有效章节内容")
@@ -1577,92 +5472,7 @@ class NovelCrawler:
         Returns:
             str: 清理后的章节内容
         """
-        import re
-        
-        if not content:
-            return content
-        
-        # 定义需要清理的广告模式
-        ad_patterns = [
-            # 收藏本站相关
-            r'请收藏本站：[^\n]*',
-            r'收藏本站：[^\n]*',
-            r'本站地址：[^\n]*',
-            r'收藏网址：[^\n]*',
-            
-            # 笔趣阁手机版相关
-            r'笔趣阁手机版：[^\n]*',
-            r'手机版：[^\n]*',
-            r'手机站：[^\n]*',
-            r'移动版：[^\n]*',
-            
-            # 来源站点信息
-            r'来源于[^\n]*站[^\n]*',
-            r'本章来自[^\n]*',
-            r'转载请注明[^\n]*',
-            r'更新最快[^\n]*',
-            r'\(来源:.*?\)',  # 清理来源标记
-            
-            # 点击相关
-            r'『点此报错』[^\n]*',
-            r'『加入书签』[^\n]*',
-            r'『点击报错』[^\n]*',
-            r'『点击收藏』[^\n]*',
-            r'\[点此报错\][^\n]*',
-            r'\[加入书签\][^\n]*',
-            
-            # 网址链接
-            r'https?://[^\s\n]*',
-            r'www\.[^\s\n]*',
-            r'm\.[^\s\n]*\.(?:com|net|org|cn|cc)[^\s\n]*',
-            
-            # 威信平台推广相关
-            r'威信.*?平台.*?方法.*?',  # 清理威信平台推广
-            r'腾讯威博.*?扫描.*?',  # 清理腾讯威博推广
-            r'通讯录.*?查找.*?',  # 清理通讯录相关
-            r'搜寻.*?验证标记.*?',  # 清理搜寻验证相关
-            r'wang--yu----.*?',  # 清理具体威信号
-            r'忘语.*?威信.*?',  # 清理作者威信推广
-            r'实体签名书.*?',  # 清理签名书推广
-            r'神秘大奖.*?',  # 清理奖品推广
-            r'\(.*?威信.*?\)',  # 清理括号内威信相关内容
-            r'平台下面.*?公众号.*?',  # 清理平台公众号推广
-            r'等.*?正文开始上传.*?',  # 清理上传相关推广
-            r'\(.*?\)\s*\(',  # 清理连续的括号内容
-            r'----.*?',  # 清理破折号后的内容
-            
-            # 其他广告信息
-            r'\(未完待续[^\)]*\)',
-            r'未完待续[^\n]*',
-            r'最新章节[^\n]*',
-            r'更新时间[^\n]*',
-            r'字数统计[^\n]*',
-            r'阅读提示[^\n]*',
-            
-            # 特殊字符和编码
-            r'&[a-zA-Z]+;',  # HTML实体
-            r'\\u[0-9a-fA-F]{4}',  # Unicode编码
-            
-            # 多余的空行（3个以上连续换行符）
-            r'\n{3,}',
-        ]
-        
-        cleaned_content = content
-        
-        # 逐个应用清理模式
-        for pattern in ad_patterns:
-            cleaned_content = re.sub(pattern, '', cleaned_content, flags=re.IGNORECASE)
-        
-        # 清理多余的空白字符
-        cleaned_content = re.sub(r'[ \t]+', ' ', cleaned_content)  # 多个空格/制表符合并为一个空格
-        cleaned_content = re.sub(r'\n[ \t]+', '\n', cleaned_content)  # 行首空白字符
-        cleaned_content = re.sub(r'[ \t]+\n', '\n', cleaned_content)  # 行尾空白字符
-        cleaned_content = re.sub(r'\n{3,}', '\n\n', cleaned_content)  # 多个换行符合并为两个
-        
-        # 清理开头和结尾的空白字符
-        cleaned_content = cleaned_content.strip()
-        
-        return cleaned_content
+        return self.ad_cleaner.clean(content)
     
     def _select_by_length_and_quality(self, valid_contents):
         """基于长度和质量选择最佳内容
@@ -1758,13 +5568,16 @@ class NovelCrawler:
             print(f"差分合并失败: {e}")
             return None
     
-    def _save_merged_novel(self, novel_title, merged_chapters, stats):
+    def _save_merged_novel(self, novel_title, merged_chapters, stats, append=False):
         """保存合成的小说
         
+        启用压缩时合成文本按压缩格式保存，合成信息文件（不含正文）仍为普通JSON。
+        
         Args:
             novel_title (str): 小说标题
             merged_chapters (list): 合成的章节列表
             stats (dict): 统计信息
+            append (bool): 是否追加到已有的合成版本之后（更新模式）
         """
         try:
             novel_dir = os.path.join(self.output_dir, novel_title)
@@ -1774,15 +5587,37 @@ class NovelCrawler:
             if not os.path.exists(merged_dir):
                 os.makedirs(merged_dir)
             
-            # 保存合成的txt文件
             txt_file = os.path.join(merged_dir, f'{novel_title}_merged.txt')
-            with open(txt_file, 'w', encoding='utf-8') as f:
+            json_file = os.path.join(merged_dir, f'{novel_title}_merged_info.json')
+            
+            # 追加模式：章节序号接在已有合成版本之后，统计信息累加
+            previous_chapters = []
+            if append and os.path.exists(json_file):
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    previous_info = json.load(f)
+                previous_chapters = previous_info.get('chapters', [])
+                previous_stats = previous_info.get('statistics', {})
+                stats = {key: previous_stats.get(key, 0) + value for key, value in stats.items()}
+            
+            # 保存合成的txt文件（启用压缩时按压缩格式保存）；追加时重写文件头中的合成时间和章节总数，
+            # 已有章节逐块复制到新文件之后再写入新章节
+            compression = self._data_compression(txt_file)
+            text_target = data_file_path(txt_file, compression)
+            existing = find_data_file(txt_file) if previous_chapters else None
+            with open_data_file(f"{text_target}.tmp", 'w', compression) as f:
                 f.write(f"小说名称: {novel_title}\n")
                 f.write(f"合成时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"章节总数: {stats['merged']}\n")
                 f.write("=" * 50 + "\n\n")
                 
-                for i, chapter in enumerate(merged_chapters, 1):
+                if existing:
+                    with open_data_file(existing) as previous:
+                        header = list(itertools.islice(previous, 5))
+                        if not (len(header) == 5 and header[0].startswith("小说名称: ") and header[3] == "=" * 50 + "\n"):
+                            f.writelines(header)  # 没有标准文件头时原样保留
+                        shutil.copyfileobj(previous, f, 1 << 20)
+                
+                for i, chapter in enumerate(merged_chapters, len(previous_chapters) + 1):
                     f.write(f"第{i}章 {chapter['title']}\n")
                     f.write(f"(来源: {chapter['source_domain']}, 长度: {chapter['content_length']})\n")
                     f.write("-" * 30 + "\n")
@@ -1790,30 +5625,60 @@ class NovelCrawler:
                     f.write("\n\n")
             
             # 保存合成信息的JSON文件
-            json_file = os.path.join(merged_dir, f'{novel_title}_merged_info.json')
             merged_info = {
                 'novel_title': novel_title,
                 'merge_time': time.strftime('%Y-%m-%d %H:%M:%S'),
                 'statistics': stats,
-                'chapters': [{
+                'chapters': previous_chapters + [{
                     'index': i + 1,
                     'title': chapter['title'],
                     'source_domain': chapter['source_domain'],
                     'content_length': chapter['content_length']
-                } for i, chapter in enumerate(merged_chapters)]
+                } for i, chapter in enumerate(merged_chapters, len(previous_chapters))]
             }
             
+            os.replace(f"{text_target}.tmp", text_target)
+            _remove_other_data_files(txt_file, compression)
             with open(json_file, 'w', encoding='utf-8') as f:
                 json.dump(merged_info, f, ensure_ascii=False, indent=2)
             
             print(f"合成版本已保存到: {merged_dir}")
-            print(f"  - 文本文件: {txt_file}")
+            print(f"  - 文本文件: {text_target}")
             print(f"  - 信息文件: {json_file}")
             
         except Exception as e:
             print(f"保存合成版本时出错: {e}")
 
 
+# 解析进程中只用于解析的爬虫实例（不加载域名配置、不创建会话和浏览器）
+_parse_worker_crawler = None
+
+
+def _parse_chapter_worker(html_text, domain, profile, crawl_config):
+    """在解析进程中提取章节标题和内容（pipeline引擎的解析阶段）
+
+    Args:
+        html_text (str): HTML文本
+        domain (str): 页面所属域名
+        profile (dict): 主进程中该域名的站点配置
+        crawl_config (dict): 主进程的爬取配置
+
+    Returns:
+        tuple: (标题, 内容, 解析后的站点配置, 解析耗费的CPU时间)
+    """
+    global _parse_worker_crawler
+    if _parse_worker_crawler is None:
+        _parse_worker_crawler = NovelCrawler.__new__(NovelCrawler)
+        _parse_worker_crawler.site_profiles = SiteProfiles()
+    crawler = _parse_worker_crawler
+    crawler.crawl_config = crawl_config
+    crawler.site_profiles.profiles[domain] = dict(profile)
+
+    start = time.process_time()
+    title, content = crawler._extract_content_from_html(html_text, domain)
+    return title, content, crawler.site_profiles.get(domain), time.process_time() - start
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='小说爬虫脚本（支持多域名并行爬取和内容比对）')
@@ -1823,14 +5688,62 @@ def main():
     parser.add_argument('--output-dir', default='novel_output', help='输出目录')
     parser.add_argument('--max-workers', type=int, default=2, help='最大并发数')
     parser.add_argument('--compare-only', action='store_true', help='仅进行内容比对（不爬取新内容）')
+    parser.add_argument('--chapter-range', help='与 --compare-only 一起使用，只重新比对指定范围的章节，例如 100-200 或 150（从1开始）')
     parser.add_argument('--use-selenium', action='store_true', help='使用Selenium处理JavaScript')
+    parser.add_argument('--engine', choices=['sync', 'async', 'pipeline'], default='sync',
+                        help='章节抓取引擎：sync逐章抓取，async每个域名并发抓取，pipeline并发下载并在进程池中解析（仅普通模式）')
+    parser.add_argument('--concurrency', type=int, default=4, help='async/pipeline引擎下每个域名同时在途的章节请求数')
+    parser.add_argument('--parse-workers', type=int, default=0, help='pipeline引擎的解析进程数，默认使用CPU核心数')
+    parser.add_argument('--resume', action='store_true', help='从断点续爬日志恢复，只抓取尚未获取的章节')
+    parser.add_argument('--update', action='store_true', help='更新模式：只抓取上次保存之后新发布的章节并增量比对、合并')
+    parser.add_argument('--scheduler', choices=['per_domain', 'shared'], default='per_domain',
+                        help='调度方式：per_domain每个域名各自爬取整本，shared每个章节只从最快的空闲域名获取一次（仅普通模式）')
+    parser.add_argument('--verify-ratio', type=float, default=0.0, help='shared调度下额外从第二个域名获取副本用于校验的章节比例（0-1）')
+    parser.add_argument('--selenium-max-pages', type=int, default=100, help='Selenium模式下单个浏览器加载多少个页面后回收重建')
+    parser.add_argument('--http-cache', action='store_true', help='启用输出目录下的磁盘HTTP缓存，重复运行时不再重新下载已获取的章节')
+    parser.add_argument('--storage', choices=['json', 'jsonl', 'sqlite'], default='json',
+                        help='章节存储：json每个域名一个_chapters.json，jsonl每个域名一个按行保存的_chapters.jsonl和偏移索引（比对与合成按偏移逐章读取），'
+                             'sqlite每部小说一个chapters.db（获取后立即写入，比对与合成逐章读取）')
+    parser.add_argument('--dedupe', action='store_true', help='json/jsonl存储下相同的章节正文只在小说目录的blobs中保存一份，章节数据只记录内容哈希')
+    parser.add_argument('--compression', choices=['none', 'gzip', 'zstd'],
+                        help='章节文本、_chapters.json和合成文本的压缩格式（zstd需要安装zstandard，读取时自动识别）；'
+                             '不指定时沿用已保存文件的格式，新文件不压缩')
+    parser.add_argument('--export-json', action='store_true', help='将输出目录中各小说的chapters.db导出为原有的txt和_chapters.json文件')
     
     args = parser.parse_args()
     
+    if args.scheduler == 'shared' and (args.update or args.resume):
+        parser.error("--scheduler shared 不支持 --update 和 --resume")
+    
+    chapter_range = None
+    if args.chapter_range:
+        if not args.compare_only:
+            parser.error("--chapter-range 需要与 --compare-only 一起使用")
+        match = re.fullmatch(r'\s*(\d+)\s*(?:-\s*(\d+)\s*)?', args.chapter_range)
+        if not match or int(match.group(1)) < 1 or int(match.group(2) or match.group(1)) < int(match.group(1)):
+            parser.error(f"无效的章节范围: {args.chapter_range}（格式: 起始-结束，例如 100-200）")
+        chapter_range = (int(match.group(1)), int(match.group(2) or match.group(1)))
+    
     # 创建爬虫实例
     crawler = NovelCrawler(args.domains_file, args.output_dir, args.use_selenium)
+    crawler.configure_crawl(engine=args.engine, async_concurrency=args.concurrency, resume=args.resume,
+                            update=args.update, scheduler=args.scheduler, verify_ratio=args.verify_ratio,
+                            selenium_pool_size=args.max_workers, selenium_max_pages=args.selenium_max_pages,
+                            http_cache=args.http_cache, parse_workers=args.parse_workers)
+    crawler.configure_storage(backend=args.storage, dedupe=args.dedupe,
+                              compression=args.compression)
     
-    if args.compare_only:
+    if args.export_json:
+        # 导出SQLite章节数据库
+        if os.path.exists(args.output_dir):
+            for novel_name in os.listdir(args.output_dir):
+                if os.path.exists(os.path.join(args.output_dir, novel_name, 'chapters.db')):
+                    print(f"导出小说: {novel_name}")
+                    crawler.export_chapter_store(novel_name)
+        else:
+            print(f"输出目录不存在: {args.output_dir}")
+        crawler.cleanup()
+    elif args.compare_only:
         # 仅进行内容比对
         print(f"开始比对小说内容...")
         # 查找输出目录中的所有小说
@@ -1839,12 +5752,15 @@ def main():
                 novel_path = os.path.join(args.output_dir, novel_name)
                 if os.path.isdir(novel_path):
                     print(f"比对小说: {novel_name}")
-                    crawler.compare_chapters(novel_name)
+                    crawler.compare_chapters(novel_name, chapter_range=chapter_range)
         else:
             print(f"输出目录不存在: {args.output_dir}")
     else:
         # 开始爬取
-        crawler.crawl_novel(args.keyword, args.max_chapters, args.max_workers)
+        try:
+            crawler.crawl_novel(args.keyword, args.max_chapters, args.max_workers)
+        finally:
+            crawler.cleanup()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file